@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Measure the per-render cost of the libraries tags with and without memoization.
+
+Usage: python benchmarks/libs_tags.py [iterations]
+'''
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ember.settings')
+
+from django.template import Context, Template
+
+from ember.templatetags import ember as ember_tags
+
+TEMPLATE = Template('''
+    {% load ember %}
+    {% ember_preload %}
+    {% emberpie_js defer=True %}
+''')
+
+
+def render_memoized():
+    TEMPLATE.render(Context())
+
+
+def render_unmemoized():
+    ember_tags._rendered.clear()
+    TEMPLATE.render(Context())
+
+
+def main(iterations=10000):
+    results = {}
+    for name, func in (('unmemoized', render_unmemoized), ('memoized', render_memoized)):
+        func()  # Warm up
+        results[name] = min(timeit.repeat(func, number=iterations, repeat=3)) / iterations * 1e6
+        print('%-12s %8.2f µs/render' % (name, results[name]))
+    print('%-12s %8.2f µs/render' % ('saved', results['unmemoized'] - results['memoized']))
+    return results
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Measure the parse and render times of the template tags hot paths.
+
+Each case is measured with 1, 100 and 1000 blocks per page.
+Parse times are measured with the parsed blocks memoized (warm) and cleared before each parse (cold).
+The JSON encoding of preloaded data is measured with 1k, 10k and 100k rows
+for each installed encoder backend.
+Results are written as JSON to be compared across commits.
+
+Usage:
+    python benchmarks/run.py [-o results.json] [-n iterations] [-c previous.json] [case ...]
+'''
+from __future__ import print_function, unicode_literals
+
+import datetime
+import decimal
+import json
+import optparse
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ember.settings')
+
+import django
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context, Template
+from django.utils import translation
+
+from ember import encoding
+from ember.templatetags import ember as ember_tags
+
+#: Number of blocks per page
+SCALES = (1, 100, 1000)
+
+#: Number of encoded rows
+ROWS = (1000, 10000, 100000)
+
+HANDLEBARS = '''
+{% handlebars "template-{i}" %}
+    <h1>{{title}}</h1>
+    {{#each item in items}}<p>{{item.name}}</p>{{/each}}
+{% endhandlebars %}'''
+
+HANDLEBARS_TRANS = '''
+{% handlebars "template-{i}" %}
+    <h1>{% trans "Welcome" %} {{title}}</h1>
+    <p>{% blocktrans %}You have no message{% endblocktrans %}</p>
+{% endhandlebars %}'''
+
+LINKTO = '''
+{% linkto "post" post.id %}<b>{{ label }}</b>{% endlinkto %}'''
+
+EMBER = '''
+{% ember #each item in items %}{% ember item.name %}{% ember /each %}'''
+
+LIBS = '''
+{% emberpie_js defer=True %}'''
+
+#: Benchmarked cases: ``(name, block source)``
+CASES = (
+    ('handlebars', HANDLEBARS),
+    ('handlebars-trans', HANDLEBARS_TRANS),
+    ('linkto', LINKTO),
+    ('ember', EMBER),
+    ('libs', LIBS),
+)
+
+
+def make_rows(count):
+    '''``values()`` like rows'''
+    created = datetime.datetime(2013, 7, 14, 12, 30)
+    return [{
+        'id': i,
+        'title': 'Post <%d> & co' % i,
+        'price': decimal.Decimal('9.99'),
+        'published': True,
+        'created': created,
+    } for i in range(count)]
+
+
+def page_source(block, blocks):
+    '''The source of a page containing ``blocks`` times the ``block`` source'''
+    return '{% load i18n ember %}' + ''.join(block.replace('{i}', str(i)) for i in range(blocks))
+
+
+def measure(func, iterations):
+    '''The best time of a single ``func`` call (in seconds)'''
+    func()  # Warm up
+    return min(timeit.repeat(func, number=iterations, repeat=3)) / iterations
+
+
+def run_case(name, block, blocks, iterations):
+    source = page_source(block, blocks)
+    template = Template(source)
+    context = {'label': 'Read more'}
+    # Keep the total work roughly constant between scales
+    iterations = max(1, iterations // blocks)
+
+    def parse_cold():
+        ember_tags._parsed.clear()
+        return Template(source)
+
+    return {
+        'case': name,
+        'blocks': blocks,
+        'parse': measure(lambda: Template(source), iterations),
+        'parse_cold': measure(parse_cold, iterations),
+        'render': measure(lambda: template.render(Context(context)), iterations),
+    }
+
+
+def run_encoding(backend, rows, iterations):
+    encoder = encoding.get_encoder(backend)
+    data = make_rows(rows)
+
+    def encode():
+        return ''.join(encoding.escape(chunk) for chunk in encoding.iterencode_list(data, encoder=encoder))
+
+    return {
+        'case': 'json-%s' % backend,
+        'rows': rows,
+        'encode': measure(encode, max(1, iterations * 10 // rows)),
+    }
+
+
+def backends():
+    '''The installed JSON encoder backends'''
+    for backend in encoding.BACKENDS:
+        try:
+            encoding.get_encoder(backend)
+        except ImproperlyConfigured:
+            continue
+        yield backend
+
+
+def revision():
+    '''The current git revision if any'''
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.STDOUT)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf-8').strip()
+
+
+def run(cases, iterations):
+    results = []
+    with translation.override('fr'):
+        for name, block in CASES:
+            if cases and name not in cases:
+                continue
+            for blocks in SCALES:
+                result = run_case(name, block, blocks, iterations)
+                results.append(result)
+                print('%-18s %5d blocks  parse %10.2f us  cold parse %10.2f us  render %10.2f us' % (
+                    name, blocks, result['parse'] * 1e6, result['parse_cold'] * 1e6, result['render'] * 1e6
+                ), file=sys.stderr)
+    for backend in backends():
+        name = 'json-%s' % backend
+        if cases and name not in cases:
+            continue
+        for rows in ROWS:
+            result = run_encoding(backend, rows, iterations)
+            results.append(result)
+            print('%-18s %6d rows  encode %10.2f us' % (name, rows, result['encode'] * 1e6), file=sys.stderr)
+    return {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'results': results,
+    }
+
+
+def compare(results, previous):
+    '''Print the ratio between the current and the ``previous`` results'''
+    indexed = dict((scale(r), r) for r in previous['results'])
+    print('Compared to %s:' % (previous.get('revision') or 'previous results'), file=sys.stderr)
+    for result in results['results']:
+        before = indexed.get(scale(result))
+        if not before:
+            continue
+        if 'rows' in result:
+            print('%-18s %6d rows  encode %6.2fx' % (
+                result['case'], result['rows'], result['encode'] / before['encode'],
+            ), file=sys.stderr)
+        else:
+            # Results older than the cold parse measure only have the parse time
+            print('%-18s %5d blocks  parse %6.2fx  cold parse %6.2fx  render %6.2fx' % (
+                result['case'], result['blocks'], result['parse'] / before['parse'],
+                result['parse_cold'] / before.get('parse_cold', before['parse']), result['render'] / before['render'],
+            ), file=sys.stderr)
+
+
+def scale(result):
+    '''The ``(case, scale)`` identifying a result'''
+    return result['case'], result.get('blocks', result.get('rows'))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] [case ...]')
+    parser.add_option('-o', '--output', help='Write the JSON results into this file instead of stdout')
+    parser.add_option('-n', '--iterations', type='int', default=1000,
+                      help='Number of rendered blocks per measure [default: %default]')
+    parser.add_option('-c', '--compare', help='Compare results with a previous JSON results file')
+    options, cases = parser.parse_args()
+
+    results = run(cases, options.iterations)
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            output_file.write(output)
+    else:
+        print(output)
+    if options.compare:
+        with open(options.compare) as previous:
+            compare(results, json.load(previous))
+
+
+if __name__ == '__main__':
+    main()
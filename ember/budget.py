@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+'''
+Payload size budgets of the Ember templates and libraries included into pages.
+
+``settings.EMBER_TEMPLATE_BUDGET`` limits the size of each template
+and ``settings.EMBER_RESPONSE_BUDGET`` the size of the inline templates
+plus the libraries script tags of a response (both in bytes).
+Templates are measured by their source, raw or precompiled, without the ``<script>`` wrapper
+(see :func:`template_size`).
+Budgets are checked by the :class:`ember.middleware.PayloadBudgetMiddleware`
+and the ``ember_check_budget`` command.
+'''
+from __future__ import unicode_literals
+
+import logging
+import re
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+from ember import libs
+from ember.conf import settings
+
+logger = logging.getLogger(__name__)
+
+#: Inline templates, either raw (``text/x-handlebars``) or precompiled
+RE_TEMPLATE = re.compile(
+    r'<script type="text/x-handlebars"(?: data-template-name="(?P<name>[^"]*)")?>(?P<source>.*?)</script>'
+    r'|<script type="text/javascript">\s*Ember\.TEMPLATES\["(?P<precompiled>(?:[^"\\]|\\.)*)"\]'
+    r' = Ember\.Handlebars\.template\((?P<template>.*?)\);\s*</script>',
+    re.DOTALL
+)
+
+RE_SCRIPT_SRC = re.compile(r'<script[^>]* src="(?P<src>[^"]+)"[^>]*></script>')
+
+# Static files sizes indexed by path
+_sizes = {}
+
+
+class PayloadBudgetExceeded(Exception):
+    '''Raised when a budget is exceeded and ``settings.EMBER_BUDGET_ACTION`` is ``'fail'``'''
+    pass
+
+
+def static_size(path):
+    '''The size of a static file or ``None`` if not found'''
+    if path not in _sizes:
+        absolute_path = finders.find(path)
+        if absolute_path:
+            with open(absolute_path, 'rb') as static_file:
+                _sizes[path] = len(static_file.read())
+        elif staticfiles_storage.exists(path):
+            _sizes[path] = staticfiles_storage.size(path)
+        else:
+            _sizes[path] = None
+    return _sizes[path]
+
+
+def _size(text):
+    return len(text.encode('utf-8'))
+
+
+def template_size(source):
+    '''
+    The size of a template source, raw or precompiled, without its ``<script>`` wrapper.
+
+    Used by both the middleware and the ``ember_check_budget`` command
+    so a template is checked against the same budget the same way.
+    '''
+    return _size(source.strip())
+
+
+def measure(content):
+    '''
+    Measure the Ember payload of a page.
+
+    :returns: a ``(templates, scripts)`` tuple of ``(name, bytes)`` lists:
+              the inline templates (see :func:`template_size`) and the libraries files.
+    '''
+    templates = []
+    for match in RE_TEMPLATE.finditer(content):
+        if match.group('precompiled') is not None:
+            name, source = match.group('precompiled'), match.group('template')
+        else:
+            name, source = match.group('name') or 'application', match.group('source')
+        templates.append((name, template_size(source)))
+
+    scripts = []
+    prefix = staticfiles_storage.url(libs.LIBS_PATH + '/')
+    for match in RE_SCRIPT_SRC.finditer(content):
+        src = match.group('src')
+        if src.startswith(prefix):
+            path = libs.LIBS_PATH + '/' + src[len(prefix):].split('?')[0]
+            scripts.append((path, static_size(path) or 0))
+    return templates, scripts
+
+
+def check_templates(templates):
+    '''
+    Check the ``(name, bytes)`` templates against ``settings.EMBER_TEMPLATE_BUDGET``.
+
+    :returns: the list of the exceeded budgets messages.
+    '''
+    template_budget = settings.EMBER_TEMPLATE_BUDGET
+    if template_budget is None:
+        return []
+    return ['Template "%s" is %s bytes (budget: %s bytes)' % (name, size, template_budget)
+            for name, size in templates if size > template_budget]
+
+
+def check_response(templates, scripts):
+    '''
+    Check a response payload (see :func:`measure`) against both budgets.
+
+    :returns: the list of the exceeded budgets messages.
+    '''
+    errors = check_templates(templates)
+    response_budget = settings.EMBER_RESPONSE_BUDGET
+    total = sum(size for name, size in templates + scripts)
+    if response_budget is not None and total > response_budget:
+        largest = sorted(templates + scripts, key=lambda item: -item[1])[:5]
+        errors.append('Ember payload is %s bytes (budget: %s bytes), largest: %s' % (
+            total, response_budget, ', '.join('"%s" (%s bytes)' % item for item in largest)
+        ))
+    return errors
+
+
+def enforce(errors, source=None):
+    '''Log or raise (depending on ``settings.EMBER_BUDGET_ACTION``) the exceeded budgets'''
+    if not errors:
+        return
+    message = '%s: %s' % (source, '; '.join(errors)) if source else '; '.join(errors)
+    if settings.EMBER_BUDGET_ACTION == 'fail':
+        raise PayloadBudgetExceeded(message)
+    logger.warning(message)
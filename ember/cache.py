@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+'''
+Django cache framework integration.
+
+Rendered Handlebars blocks and precompiled templates are stored
+in the cache named by ``settings.EMBER_CACHE``.
+Keys are content-addressed so entries never need to be invalidated.
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import threading
+
+from django.core.cache import get_cache
+
+from ember.conf import settings
+
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+_backends = {}
+
+
+def get_backend():
+    '''The cache backend used by Django Ember or ``None`` if caching is disabled'''
+    alias = settings.EMBER_CACHE
+    if not alias:
+        return None
+    if alias not in _backends:
+        _backends[alias] = get_cache(alias)
+    return _backends[alias]
+
+
+def make_key(*parts):
+    '''Build a cache key from the hash of the given parts'''
+    digest = hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+    return 'ember:%s' % digest
+
+
+def _count(counter, value=1):
+    with _lock:
+        _stats[counter] += value
+
+
+def get_many(keys):
+    '''Fetch many keys at once, counting hits and misses'''
+    backend = get_backend()
+    if backend is None:
+        return {}
+    found = backend.get_many(keys)
+    _count('hits', len(found))
+    _count('misses', len(keys) - len(found))
+    return found
+
+
+def set_many(data):
+    backend = get_backend()
+    if backend is not None:
+        backend.set_many(data, settings.EMBER_CACHE_TIMEOUT)
+
+
+def get_or_render(key, render):
+    '''
+    Fetch the value stored under ``key``.
+
+    On cache miss, ``render`` is called and its result is stored.
+    If caching is disabled, ``render`` is always called.
+    '''
+    backend = get_backend()
+    if backend is None:
+        return render()
+    value = backend.get(key)
+    if value is None:
+        _count('misses')
+        value = render()
+        backend.set(key, value, settings.EMBER_CACHE_TIMEOUT)
+    else:
+        _count('hits')
+    return value
+
+
+def stats():
+    '''The cache hits and misses counters for the current process'''
+    with _lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _lock:
+        for counter in _stats:
+            _stats[counter] = 0
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+'''
+Extract ``{% handlebars %}`` templates from the Django templates
+and bundle them into static, long-cacheable, Javascript files (one per language).
+'''
+from __future__ import unicode_literals
+
+import codecs
+import json
+import logging
+import os
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.template import Context, Template, TemplateSyntaxError
+from django.template.loader import find_template_loader
+from django.utils import translation
+
+from ember import compiler, registry
+from ember.conf import settings
+from ember.utils import content_hash, hashed_name, save_file, load_json
+
+logger = logging.getLogger(__name__)
+
+# Loaded manifests indexed by name
+_manifests = {}
+
+# Loaded collected templates indexed by file name
+_sources = {}
+
+
+def template_dirs():
+    '''List the templates directories of the configured template loaders'''
+    dirs = []
+    for loader_name in settings.TEMPLATE_LOADERS:
+        loader = find_template_loader(loader_name)
+        if loader is None:
+            continue
+        # The cached loader wraps other loaders
+        for loader in getattr(loader, 'loaders', [loader]):
+            if not hasattr(loader, 'get_template_sources'):
+                continue
+            for directory in loader.get_template_sources(''):
+                if directory not in dirs and os.path.isdir(directory):
+                    dirs.append(directory)
+    return dirs
+
+
+def template_files():
+    '''
+    Iterate over the ``(name, path)`` of all templates files.
+
+    When the same template name exists in many directories,
+    only the one found first by the loaders is yielded.
+    '''
+    seen = set()
+    for directory in template_dirs():
+        for root, dirnames, filenames in os.walk(directory):
+            for filename in sorted(filenames):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, '/')
+                if name not in seen:
+                    seen.add(name)
+                    yield name, path
+
+
+def handlebars_nodes():
+    '''Iterate over the ``(template name, node)`` of all the ``{% handlebars %}`` blocks'''
+    from ember.templatetags.ember import HandlebarsNode
+
+    for name, path in template_files():
+        try:
+            with codecs.open(path, encoding=settings.FILE_CHARSET) as template_file:
+                template = Template(template_file.read(), name=name)
+        except (TemplateSyntaxError, UnicodeDecodeError) as e:
+            logger.debug('Skipping template %s: %s', name, e)
+            continue
+        for node in template.nodelist.get_nodes_by_type(HandlebarsNode):
+            yield name, node
+
+
+def bundle_languages():
+    '''The languages codes a bundle is built for'''
+    if settings.USE_I18N:
+        return [code for code, name in settings.LANGUAGES]
+    return [settings.LANGUAGE_CODE]
+
+
+def collect_templates(languages=None, skipped=None):
+    '''
+    Render all the ``{% handlebars %}`` blocks sources once per language.
+
+    Blocks depending on the request context (neither static nor only depending on the active language)
+    can not be rendered ahead of time so they are not collected.
+
+    :param languages: the languages codes to render (default to :func:`bundle_languages`).
+    :param skipped: a list the ``(template name, template id)`` of the blocks not collected are appended to.
+    :returns: a dictionnary of ``(template id, source)`` lists sorted by template id,
+              indexed by language code.
+    '''
+    nodes = []
+    for name, node in handlebars_nodes():
+        if node.static or node.cacheable:
+            nodes.append((name, node))
+        else:
+            logger.debug('Template "%s" from %s depends on the request context', node.name, name)
+            if skipped is not None:
+                skipped.append((name, node.name))
+    collected = {}
+    for language in languages or bundle_languages():
+        with translation.override(language):
+            collected[language] = _render_templates(nodes)
+    return collected
+
+
+def _render_templates(nodes):
+    templates = {}
+    context = Context()
+    for name, node in nodes:
+        source = node.render_source(context)
+        if node.name in templates and templates[node.name] != source:
+            logger.warning('Template "%s" from %s conflicts with a previous definition', node.name, name)
+            continue
+        templates[node.name] = source
+    return sorted(templates.items())
+
+
+def precompile_templates(collected):
+    '''
+    Precompile the templates of all the languages in a single batch.
+
+    :param collected: the templates indexed by language (see :func:`collect_templates`).
+    :returns: the ``{source: precompiled function}`` dictionnary.
+    '''
+    sources = sorted(set(source for templates in collected.values() for template_id, source in templates))
+    return dict(zip(sources, compiler.precompile_many(sources)))
+
+
+def _precompiled(templates, compiled=None):
+    '''
+    The precompiled functions of the ``templates`` sources,
+    read from the ``compiled`` dictionnary (see :func:`precompile_templates`) if given.
+    '''
+    sources = [source for template_id, source in templates]
+    if compiled is None:
+        return compiler.precompile_many(sources)
+    return [compiled[source] for source in sources]
+
+
+def build_bundle(templates, precompile=False, compiled=None):
+    '''
+    Build the Javascript registering ``templates`` into ``Ember.TEMPLATES``.
+
+    :param compiled: the precompiled sources (see :func:`precompile_templates`), precompiled on demand if missing.
+    '''
+    if precompile:
+        templates = list(zip([template_id for template_id, source in templates], _precompiled(templates, compiled)))
+    return register_script(templates, precompile)
+
+
+def register_script(templates, precompiled=False):
+    '''
+    The Javascript registering the ``(template id, source)`` ``templates`` into ``Ember.TEMPLATES``.
+
+    :param precompiled: whether the sources are precompiled template functions.
+    '''
+    if precompiled:
+        lines = ['Ember.TEMPLATES[%s] = Ember.Handlebars.template(%s);' % (json.dumps(template_id), function)
+                 for template_id, function in templates]
+    else:
+        lines = ['Ember.TEMPLATES[%s] = Ember.Handlebars.compile(%s);' % (json.dumps(template_id), json.dumps(source))
+                 for template_id, source in templates]
+    return '\n'.join(lines) + '\n'
+
+
+def build_sources(templates, precompile=False, compiled=None):
+    '''
+    Build the collected ``templates`` data served by the ``ember.urls`` views::
+
+        {"precompiled": false, "templates": {"posts": {"hash": "...", "source": "...", "requires": [...]}}}
+
+    Each template has its content hash (see :func:`hash_templates`),
+    its source (precompiled if ``precompile`` is true, see :func:`build_bundle` for ``compiled``)
+    and the collected templates it directly depends on (see :mod:`ember.registry`).
+    Templates must have been parsed so the registry knows their dependencies.
+    '''
+    names = set(template_id for template_id, source in templates)
+    hashes = hash_templates(templates)
+    if precompile:
+        sources = _precompiled(templates, compiled)
+    else:
+        sources = [source for template_id, source in templates]
+    return {
+        'precompiled': precompile,
+        'templates': dict((template_id, {
+            'hash': hashes[template_id],
+            'source': source,
+            'requires': sorted(registry.dependencies(template_id) & names),
+        }) for (template_id, _), source in zip(templates, sources)),
+    }
+
+
+def closure(templates, names):
+    '''
+    The template ``names`` and all the templates they transitively depend on
+    among the collected ``templates`` (see :func:`build_sources`).
+    '''
+    required = set()
+    pending = [name for name in names if name in templates]
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(templates[name]['requires'])
+    return required
+
+
+def hash_templates(templates):
+    '''
+    The ``{template id: content hash}`` dictionnary of the ``(template id, source)`` ``templates``.
+
+    A template hash changes with its source so clients can keep the unchanged templates across deploys.
+    '''
+    return dict((template_id, content_hash(source)) for template_id, source in templates)
+
+
+def manifest_name():
+    return os.path.splitext(settings.EMBER_TEMPLATES_BUNDLE)[0] + '.json'
+
+
+def save_bundles(contents, hashes=None, sources=None, storage=None):
+    '''
+    Save the bundles ``contents`` (indexed by language code) under their hashed names
+    and register them into the manifest with the templates ``hashes`` (indexed by language code,
+    see :func:`hash_templates`).
+
+    The collected templates ``sources`` (indexed by language code, see :func:`build_sources`)
+    are saved as JSON files under their hashed names and registered into the manifest too.
+
+    The bundles of the other languages already in the manifest are kept.
+
+    :returns: the bundles hashed names indexed by language code.
+    '''
+    storage = storage or staticfiles_storage
+    root, ext = os.path.splitext(settings.EMBER_TEMPLATES_BUNDLE)
+    names = {}
+    for language, content in contents.items():
+        names[language] = hashed_name('%s.%s%s' % (root, language, ext), content)
+        save_file(storage, names[language], content)
+    sources_names = {}
+    for language, data in (sources or {}).items():
+        content = json.dumps(data, sort_keys=True)
+        sources_names[language] = hashed_name('%s.%s.json' % (root, language), content)
+        save_file(storage, sources_names[language], content)
+    manifest = load_json(storage, manifest_name())
+    manifest.setdefault('bundles', {}).update(names)
+    manifest.setdefault('hashes', {}).update(hashes or {})
+    manifest.setdefault('sources', {}).update(sources_names)
+    save_file(storage, manifest_name(), json.dumps(manifest))
+    _manifests.clear()
+    _sources.clear()
+    return names
+
+
+def load_manifest(storage=None):
+    '''Load the templates bundles manifest (only once per process)'''
+    name = manifest_name()
+    if name not in _manifests:
+        _manifests[name] = load_json(storage or staticfiles_storage, name)
+    return _manifests[name]
+
+
+def _for_language(entries, language):
+    '''The ``entries`` value for ``language`` with fallbacks (see :func:`bundle_name`)'''
+    language = (language or translation.get_language() or settings.LANGUAGE_CODE).lower()
+    for code in (language, language.split('-')[0], settings.LANGUAGE_CODE.lower()):
+        if code in entries:
+            return entries[code]
+    return None
+
+
+def bundle_name(language=None, storage=None):
+    '''
+    The templates bundle hashed name for ``language`` (default to the active language).
+
+    Fallback on the generic language then on ``settings.LANGUAGE_CODE`` bundles.
+
+    :returns: the bundle name or ``None`` if templates have not been collected.
+    '''
+    return _for_language(load_manifest(storage).get('bundles', {}), language)
+
+
+def template_hashes(language=None, storage=None):
+    '''
+    The ``{template id: content hash}`` dictionnary of the templates collected for ``language``
+    (default to the active language), with the same fallbacks as :func:`bundle_name`.
+
+    :returns: the hashes or ``None`` if templates have not been collected.
+    '''
+    return _for_language(load_manifest(storage).get('hashes', {}), language)
+
+
+def collected_sources(language=None, storage=None):
+    '''
+    The collected templates data (see :func:`build_sources`) for ``language``
+    (default to the active language), with the same fallbacks as :func:`bundle_name`.
+
+    Loaded only once per process.
+
+    :returns: the collected templates data or ``None`` if templates have not been collected.
+    '''
+    name = _for_language(load_manifest(storage).get('sources', {}), language)
+    if name is None:
+        return None
+    if name not in _sources:
+        _sources[name] = load_json(storage or staticfiles_storage, name)
+    return _sources[name]
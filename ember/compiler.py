@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+'''
+Server-side Handlebars templates precompilation.
+
+Templates are precompiled by the bundled ``handlebars.js`` and ``ember.js``
+running inside a local Javascript runtime (``settings.EMBER_JS_RUNTIME``).
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+
+from subprocess import Popen, PIPE
+
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from django.utils import six
+
+from ember import cache
+from ember.conf import settings
+from ember.utils import LRUCache
+
+PRECOMPILER = os.path.join(os.path.dirname(__file__), 'js', 'precompiler.js')
+LIBS_DIR = os.path.join(os.path.dirname(__file__), 'static', 'js', 'libs')
+
+#: The libraries loaded by the precompiler
+PRECOMPILER_LIBS = ('handlebars.js', 'ember.js')
+
+# The precompiler version digest, see version()
+_version = []
+
+# Precompiled templates indexed by source hash
+_precompiled = LRUCache(settings.EMBER_PRECOMPILE_CACHE_SIZE)
+
+
+@receiver(setting_changed)
+def _resize_precompiled(setting, **kwargs):
+    if setting == 'EMBER_PRECOMPILE_CACHE_SIZE':
+        _precompiled.clear()
+        _precompiled.maxsize = settings.EMBER_PRECOMPILE_CACHE_SIZE
+
+
+class PrecompilationError(Exception):
+    '''Raised when the Javascript runtime fails to precompile templates'''
+    pass
+
+
+def source_hash(source):
+    '''Compute the hash identifying a template source'''
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+def version():
+    '''
+    The digest of the precompiler and the libraries it loads (computed once per process).
+
+    Precompiled functions depend on the Handlebars and Ember versions,
+    so it is part of the cache keys of the precompiled templates.
+    '''
+    if not _version:
+        digest = hashlib.sha1()
+        for path in [PRECOMPILER] + [os.path.join(LIBS_DIR, name) for name in PRECOMPILER_LIBS]:
+            with open(path, 'rb') as script:
+                digest.update(script.read())
+        _version.append(digest.hexdigest())
+    return _version[0]
+
+
+def runtime_command():
+    '''The command line running the precompiler script'''
+    runtime = settings.EMBER_JS_RUNTIME
+    if isinstance(runtime, six.string_types):
+        runtime = runtime.split()
+    return list(runtime) + [PRECOMPILER, LIBS_DIR]
+
+
+def precompile_many(sources):
+    '''
+    Precompile a list of Handlebars template sources.
+
+    Only the sources neither precompiled by this process
+    (the last ``settings.EMBER_PRECOMPILE_CACHE_SIZE`` ones) nor found in cache
+    for the precompiler :func:`version` are sent to the Javascript runtime, in a single batch.
+
+    :returns: the list of precompiled template functions, in the same order.
+    '''
+    hashes = [source_hash(source) for source in sources]
+    compiled = {}
+    missing = {}
+    for h, source in zip(hashes, sources):
+        function = _precompiled.get(h)
+        if function is None:
+            missing[h] = source
+        else:
+            compiled[h] = function
+
+    if missing:
+        keys = dict((cache.make_key('precompiled', version(), h), h) for h in missing)
+        for key, function in cache.get_many(list(keys.keys())).items():
+            compiled[keys[key]] = function
+            _precompiled.set(keys[key], function)
+            del missing[keys[key]]
+
+    if missing:
+        missing_hashes = list(missing.keys())
+        payload = json.dumps([missing[h] for h in missing_hashes])
+        try:
+            process = Popen(runtime_command(), stdin=PIPE, stdout=PIPE, stderr=PIPE)
+        except OSError as e:
+            raise PrecompilationError('Unable to run "%s": %s' % (settings.EMBER_JS_RUNTIME, e))
+        out, err = process.communicate(payload.encode('utf-8'))
+        if process.returncode != 0:
+            raise PrecompilationError(err.decode('utf-8'))
+        for h, function in zip(missing_hashes, json.loads(out.decode('utf-8'))):
+            compiled[h] = function
+            _precompiled.set(h, function)
+        cache.set_many(dict((cache.make_key('precompiled', version(), h), compiled[h]) for h in missing_hashes))
+
+    return [compiled[h] for h in hashes]
+
+
+def precompile(source):
+    '''Precompile a single Handlebars template source'''
+    return precompile_many([source])[0]
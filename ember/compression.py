@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+'''
+Precompressed (gzip and brotli) variants of the static Javascript files.
+
+Brotli variants are only written if the ``brotli`` module is installed.
+'''
+from __future__ import unicode_literals
+
+import re
+import struct
+import zlib
+
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Match a zero quality value (the coding is not acceptable)
+RE_ZERO_QUALITY = re.compile(r'^q=0(\.0*)?$')
+
+
+#: Gzip header: magic number, deflate method, no flag, a zero mtime
+#: (keeping the output reproducible, ``GzipFile`` only accepts it from Python 2.7),
+#: maximum compression and unknown OS
+GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x02\xff'
+
+
+def gzip_compress(content):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+    body = compressor.compress(content) + compressor.flush()
+    trailer = struct.pack('<II', zlib.crc32(content) & 0xffffffff, len(content) & 0xffffffff)
+    return GZIP_HEADER + body + trailer
+
+
+def brotli_compress(content):
+    return brotli.compress(content)
+
+
+#: Supported ``(content coding, file extension, compress function)`` by order of preference
+ENCODINGS = [('gzip', '.gz', gzip_compress)]
+if brotli is not None:
+    ENCODINGS.insert(0, ('br', '.br', brotli_compress))
+
+
+def compress_file(storage, name):
+    '''
+    Write the compressed variants of the ``name`` file beside it.
+
+    :returns: the written files names.
+    '''
+    with storage.open(name) as original:
+        content = original.read()
+    names = []
+    for encoding, extension, compress in ENCODINGS:
+        compressed_name = name + extension
+        if storage.exists(compressed_name):
+            storage.delete(compressed_name)
+        storage.save(compressed_name, ContentFile(compress(content)))
+        names.append(compressed_name)
+    return names
+
+
+def compress_files(storage, names):
+    '''Write the compressed variants of all the ``names`` files'''
+    compressed = []
+    for name in names:
+        compressed.extend(compress_file(storage, name))
+    return compressed
+
+
+def accepted_encodings(request):
+    '''The content codings accepted by the client'''
+    encodings = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if coding and not RE_ZERO_QUALITY.match(params.replace(' ', '')):
+            encodings.add(coding)
+    if '*' in encodings:
+        encodings.update(encoding for encoding, extension, compress in ENCODINGS)
+    return encodings
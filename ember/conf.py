@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings as _settings
+
+# Default configuration values for Django Ember
+# All values used by Django Ember needs to appears here.
+DEFAULTS = {
+    'EMBER_PRECOMPILE': False,
+    'EMBER_JS_RUNTIME': 'node',
+    'EMBER_CACHE': None,
+    'EMBER_CACHE_TIMEOUT': 60 * 60 * 24 * 30,
+    'EMBER_INLINE_TEMPLATES': True,
+    'EMBER_TEMPLATES_BUNDLE': 'js/templates.js',
+    'EMBER_BUNDLE_LIBS': False,
+    'EMBER_PRECOMPRESS': False,
+    'EMBER_MINIFY': False,
+    'EMBER_PARSE_CACHE_SIZE': 512,
+    'EMBER_PRECOMPILE_CACHE_SIZE': 1024,
+    'EMBER_JSON_ENCODER': None,
+    'EMBER_JSON_CHUNK_SIZE': 1000,
+    'EMBER_INSTRUMENTATION': False,
+    'EMBER_TEMPLATE_BUDGET': None,
+    'EMBER_RESPONSE_BUDGET': None,
+    'EMBER_BUDGET_ACTION': 'warn',
+}
+
+
+class EmberSettings(object):
+    '''
+    Lazy Django settings wrapper for Django Ember
+    '''
+    def __init__(self, wrapped_settings):
+        self.wrapped_settings = wrapped_settings
+
+    def __getattr__(self, name):
+        if hasattr(self.wrapped_settings, name):
+            return getattr(self.wrapped_settings, name)
+        elif name in DEFAULTS:
+            return DEFAULTS[name]
+        else:
+            raise AttributeError("'%s' setting not found" % name)
+
+settings = EmberSettings(_settings)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+'''
+JSON encoding of the data embedded into pages.
+
+The encoder backend is set by ``settings.EMBER_JSON_ENCODER``:
+either a backend name (``orjson``, ``simplejson`` or ``json``)
+or the dotted path of a ``dumps(obj)`` callable.
+By default, the first installed backend is used, falling back on the standard library.
+
+Values not handled by the backends (dates, decimals...) are encoded by ``DjangoJSONEncoder``.
+'''
+from __future__ import absolute_import, unicode_literals
+
+import itertools
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.importlib import import_module
+
+from ember.conf import settings
+
+#: Backends tried in order when ``settings.EMBER_JSON_ENCODER`` is not set
+BACKENDS = ('orjson', 'simplejson', 'json')
+
+#: Characters escaped so the JSON can be inlined into a ``<script>`` element
+JSON_ESCAPES = (
+    ('&', '\\u0026'),
+    ('<', '\\u003c'),
+    ('>', '\\u003e'),
+    ('\u2028', '\\u2028'),
+    ('\u2029', '\\u2029'),
+)
+
+_default = DjangoJSONEncoder().default
+
+# Encoders indexed by setting value
+_encoders = {}
+
+
+def _orjson():
+    import orjson
+
+    def dumps(obj):
+        # Encode the datetimes as DjangoJSONEncoder does, like the other backends
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME).decode('utf-8')
+    return dumps
+
+
+def _simplejson():
+    import simplejson
+
+    def dumps(obj):
+        return simplejson.dumps(obj, default=_default, separators=(',', ':'))
+    return dumps
+
+
+def _json():
+    def dumps(obj):
+        return json.dumps(obj, default=_default, separators=(',', ':'))
+    return dumps
+
+
+_builders = {
+    'orjson': _orjson,
+    'simplejson': _simplejson,
+    'json': _json,
+}
+
+
+def _load(name):
+    if name is None:
+        for backend in BACKENDS:
+            try:
+                return _builders[backend]()
+            except ImportError:
+                continue
+    if name in _builders:
+        try:
+            return _builders[name]()
+        except ImportError:
+            raise ImproperlyConfigured('The "%s" JSON encoder is not installed' % name)
+    module, _, attr = name.rpartition('.')
+    try:
+        return getattr(import_module(module), attr)
+    except (ImportError, AttributeError, ValueError):
+        raise ImproperlyConfigured('Unable to import the JSON encoder "%s"' % name)
+
+
+def get_encoder(name=None):
+    '''
+    The ``dumps(obj)`` callable of an encoder backend.
+
+    :param name: the backend name or dotted path (default to ``settings.EMBER_JSON_ENCODER``).
+    '''
+    name = name or settings.EMBER_JSON_ENCODER
+    if name not in _encoders:
+        _encoders[name] = _load(name)
+    return _encoders[name]
+
+
+def dumps(obj):
+    '''Encode ``obj`` with the configured backend'''
+    return get_encoder()(obj)
+
+
+def iterencode_list(items, chunk_size=None, convert=None, encoder=None):
+    '''
+    Encode the ``items`` iterable as a JSON array, ``chunk_size`` items at once
+    (default to ``settings.EMBER_JSON_CHUNK_SIZE``).
+
+    :param convert: a function converting each chunk (a list) into encodable values.
+    :param encoder: the ``dumps(obj)`` callable (default to the configured backend).
+    :returns: a generator of JSON text chunks.
+    '''
+    encoder = encoder or get_encoder()
+    chunk_size = chunk_size or settings.EMBER_JSON_CHUNK_SIZE
+    items = iter(items)
+    separator = '['
+    while True:
+        chunk = list(itertools.islice(items, chunk_size))
+        if not chunk:
+            break
+        if convert:
+            chunk = convert(chunk)
+        yield separator + encoder(chunk).strip()[1:-1]
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+def escape(content):
+    '''Escape a JSON string to be safely inlined into a ``<script>`` element'''
+    for char, escaped in JSON_ESCAPES:
+        content = content.replace(char, escaped)
+    return content
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+'''
+Render-time instrumentation of the template tags.
+
+When ``settings.EMBER_INSTRUMENTATION`` is enabled, the renders count, cumulative time
+and output bytes are recorded per tag and name (the ``{% handlebars %}`` template id,
+the ``{% linkto %}`` route, the library or stack, the preloaded resource).
+
+Each render sends the :data:`ember.signals.tag_rendered` signal
+(once its last chunk is produced for a streamed ``{% handlebars %}`` block)
+and is logged on the ``ember.instrumentation`` logger at the ``DEBUG`` level.
+
+Times are inclusive: a tag rendered inside a ``{% handlebars %}`` block is counted by both.
+'''
+from __future__ import unicode_literals
+
+import logging
+import threading
+
+from functools import wraps
+from timeit import default_timer
+
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+from ember.conf import settings
+from ember.signals import tag_rendered
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# Counters indexed by (tag, name)
+_stats = {}
+_enabled = [settings.EMBER_INSTRUMENTATION]
+
+
+@receiver(setting_changed)
+def _toggle(setting, **kwargs):
+    if setting == 'EMBER_INSTRUMENTATION':
+        _enabled[0] = settings.EMBER_INSTRUMENTATION
+
+
+def enabled():
+    return _enabled[0]
+
+
+def record(tag, name, duration, size):
+    '''Record a tag rendering and send the ``tag_rendered`` signal'''
+    with _lock:
+        counters = _stats.setdefault((tag, name), {'count': 0, 'time': 0.0, 'bytes': 0})
+        counters['count'] += 1
+        counters['time'] += duration
+        counters['bytes'] += size
+    tag_rendered.send(sender=tag, tag=tag, name=name, duration=duration, size=size)
+
+
+def measure(tag, name, render, *args):
+    '''Call ``render(*args)`` and record its duration and output size if instrumentation is enabled'''
+    if not _enabled[0]:
+        return render(*args)
+    start = default_timer()
+    output = render(*args)
+    record(tag, name, default_timer() - start, len(output.encode('utf-8')))
+    return output
+
+
+def measure_stream(tag, name, chunks):
+    '''
+    Yield the ``chunks`` and record the time spent producing them
+    and their total size once exhausted if instrumentation is enabled
+    '''
+    if not _enabled[0]:
+        for chunk in chunks:
+            yield chunk
+        return
+    chunks = iter(chunks)
+    duration, size = 0.0, 0
+    while True:
+        start = default_timer()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            break
+        finally:
+            duration += default_timer() - start
+        size += len(chunk.encode('utf-8'))
+        yield chunk
+    record(tag, name, duration, size)
+
+
+def instrumented(tag, name=None):
+    '''
+    Decorate a node ``render()`` method to record its renders.
+
+    :param name: a function returning the recorded name from the node.
+    '''
+    def decorator(render):
+        @wraps(render)
+        def wrapper(node, context):
+            if not _enabled[0]:
+                return render(node, context)
+            return measure(tag, name(node) if name else None, render, node, context)
+        return wrapper
+    return decorator
+
+
+def stats():
+    '''
+    The recorded counters for the current process,
+    as a list of ``{tag, name, count, time, bytes}`` dicts sorted by decreasing output size.
+    '''
+    with _lock:
+        items = [dict(counters, tag=tag, name=name) for (tag, name), counters in _stats.items()]
+    return sorted(items, key=lambda item: (-item['bytes'], -item['time']))
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
+
+
+@receiver(tag_rendered)
+def log_render(sender, tag, name, duration, size, **kwargs):
+    '''The logging hook'''
+    logger.debug('%s "%s" rendered in %.2f ms (%s bytes)', tag, name or '', duration * 1000, size)
@@ -0,0 +1,38 @@
+/**
+ * Precompile Ember Handlebars templates outside of a browser.
+ *
+ * Usage: node precompiler.js <libs directory>
+ *
+ * Reads a JSON array of template sources on stdin and writes
+ * a JSON array of precompiled template functions on stdout.
+ */
+var fs = require('fs'),
+    path = require('path'),
+    vm = require('vm');
+
+var libs = process.argv[2];
+
+// Ember only needs a jQuery lookalike to load its views package.
+function jQuery() {
+    return {jquery: '1.10.0'};
+}
+jQuery.event = {fixHooks: {}};
+jQuery.ajax = function() {};
+
+var sandbox = {jQuery: jQuery, console: console, ENV: {}};
+sandbox.window = sandbox;
+
+var context = vm.createContext(sandbox);
+
+['handlebars.js', 'ember.js'].forEach(function(filename) {
+    var source = fs.readFileSync(path.join(libs, filename), 'utf8');
+    vm.runInContext(source, context, filename);
+});
+
+var sources = JSON.parse(fs.readFileSync(0, 'utf8'));
+
+var compiled = sources.map(function(source) {
+    return sandbox.Ember.Handlebars.precompile(source).toString();
+});
+
+process.stdout.write(JSON.stringify(compiled));
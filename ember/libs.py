@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+'''
+Concatenated and fingerprinted Javascript libraries bundles.
+
+Each stack (``ember_full`` and ``emberpie``) is bundled with and without jQuery,
+minified and unminified, by the ``collectstatic`` command.
+'''
+from __future__ import unicode_literals
+
+import codecs
+import json
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+
+from djangojs.conf import settings as djangojs_settings
+
+from ember.utils import hashed_name, save_file, load_json
+
+#: Libraries of each stack, in loading order
+STACKS = {
+    'ember_full': ('handlebars', 'ember'),
+    'emberpie': ('handlebars', 'ember', 'ember-data', 'tastypie_adapter'),
+}
+
+LIBS_PATH = 'js/libs'
+MANIFEST = 'js/libs/bundles.json'
+
+# Loaded manifests indexed by name
+_manifests = {}
+
+
+def bundle_key(stack, jquery, minified):
+    '''The manifest key identifying a bundle'''
+    return '%s%s%s' % (stack, '' if jquery else '-nojquery', '.min' if minified else '')
+
+
+def lib_path(lib, minified):
+    '''The static path of a library'''
+    return '%s/%s%s.js' % (LIBS_PATH, lib, '.min' if minified else '')
+
+
+def lib_paths(stack, jquery, minified):
+    '''The static paths of the libraries of a stack, in loading order'''
+    paths = [lib_path(lib, minified) for lib in STACKS[stack]]
+    if jquery:
+        paths.insert(0, lib_path('jquery-%s' % djangojs_settings.JQUERY_VERSION, minified))
+    return paths
+
+
+def build_bundle(stack, jquery, minified):
+    '''Concatenate the libraries of a stack'''
+    contents = []
+    for path in lib_paths(stack, jquery, minified):
+        absolute_path = finders.find(path)
+        if not absolute_path:
+            raise ImproperlyConfigured('Static file "%s" not found' % path)
+        with codecs.open(absolute_path, encoding='utf-8') as lib:
+            contents.append(lib.read())
+    # Libraries may not end with a semicolon
+    return ';\n'.join(contents) + ';\n'
+
+
+def save_bundles(storage=None):
+    '''
+    Build and save all the stacks bundles under their hashed names
+    and register them into the manifest.
+
+    :returns: the bundles hashed names indexed by key.
+    '''
+    storage = storage or staticfiles_storage
+    names = {}
+    for stack in STACKS:
+        for jquery in (True, False):
+            for minified in (True, False):
+                key = bundle_key(stack, jquery, minified)
+                content = build_bundle(stack, jquery, minified)
+                names[key] = hashed_name('%s/%s.js' % (LIBS_PATH, key), content)
+                save_file(storage, names[key], content)
+    save_file(storage, MANIFEST, json.dumps(names))
+    _manifests.clear()
+    return names
+
+
+def bundle_name(stack, jquery, minified, storage=None):
+    '''
+    The hashed name of a stack bundle.
+
+    :returns: the bundle name or ``None`` if bundles have not been built.
+    '''
+    if MANIFEST not in _manifests:
+        _manifests[MANIFEST] = load_json(storage or staticfiles_storage, MANIFEST)
+    return _manifests[MANIFEST].get(bundle_key(stack, jquery, minified))
+
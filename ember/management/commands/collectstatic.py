@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+'''
+Extend ``collectstatic`` to build the Javascript libraries bundles
+and their precompressed variants.
+'''
+from __future__ import unicode_literals
+
+from django.contrib.staticfiles.management.commands import collectstatic
+
+from ember import collector, compression, libs
+from ember.conf import settings
+
+
+class Command(collectstatic.Command):
+    '''
+    Collect static files then build the Javascript libraries bundles
+    if ``settings.EMBER_BUNDLE_LIBS`` is enabled.
+
+    If ``settings.EMBER_PRECOMPRESS`` is enabled, the Javascript libraries,
+    their bundles and the templates bundles are precompressed.
+    '''
+    def collect(self):
+        collected = super(Command, self).collect()
+        if settings.EMBER_BUNDLE_LIBS and not self.dry_run:
+            for name in sorted(libs.save_bundles(self.storage).values()):
+                self.log("Bundled '%s'" % name, level=1)
+                collected['modified'].append(name)
+        if settings.EMBER_PRECOMPRESS and not self.dry_run:
+            for name in compression.compress_files(self.storage, self.compressible_files()):
+                self.log("Compressed '%s'" % name, level=1)
+                collected['modified'].append(name)
+        return collected
+
+    def compressible_files(self):
+        names = ['%s/%s' % (libs.LIBS_PATH, name) for name in self.storage.listdir(libs.LIBS_PATH)[1]
+                 if name.endswith('.js')]
+        names.extend(name for name in collector.load_manifest(self.storage).get('bundles', {}).values()
+                     if self.storage.exists(name))
+        return sorted(names)
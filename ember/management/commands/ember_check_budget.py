@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+'''
+Check the ``{% handlebars %}`` templates sizes against ``settings.EMBER_TEMPLATE_BUDGET``.
+
+Templates are measured as the pages include them: precompiled if ``settings.EMBER_PRECOMPILE`` is enabled.
+'''
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+from django.core.management.base import CommandError, NoArgsCommand
+
+from ember import budget, collector, registry
+from ember.conf import settings
+
+
+class Command(NoArgsCommand):
+    help = 'Report the {% handlebars %} templates sizes and check them against the budget'
+    option_list = NoArgsCommand.option_list + (
+        make_option('--language', '-l', action='append', dest='languages', default=None,
+            help='Only check the templates for this language (default to all settings.LANGUAGES). '
+                 'Use multiple times to check more.'),
+    )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+
+        collected = collector.collect_templates(options.get('languages'))
+        # A single Javascript runtime call for all the languages
+        compiled = collector.precompile_templates(collected) if settings.EMBER_PRECOMPILE else None
+
+        errors = []
+        for language, templates in sorted(collected.items()):
+            if compiled is not None:
+                templates = [(template_id, compiled[source]) for template_id, source in templates]
+            sizes = dict((template_id, budget.template_size(source)) for template_id, source in templates)
+            if verbosity > 1:
+                # Templates have been parsed so the registry knows their dependencies
+                for template_id, size in sorted(sizes.items(), key=lambda item: -item[1]):
+                    required = registry.closure([template_id]) & set(sizes)
+                    self.stdout.write('Template "%s" (%s): %s bytes, %s bytes with its dependencies\n'
+                                      % (template_id, language, size, sum(sizes[name] for name in required)))
+            if verbosity > 0:
+                self.stdout.write('%s templates (%s): %s bytes\n' % (len(sizes), language, sum(sizes.values())))
+            errors.extend('%s (%s)' % (error, language) for error in budget.check_templates(sorted(sizes.items())))
+
+        for error in errors:
+            self.stderr.write('%s\n' % error)
+        if errors and settings.EMBER_BUDGET_ACTION == 'fail':
+            raise CommandError('%s templates budgets exceeded' % len(errors))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+'''
+Collect all ``{% handlebars %}`` templates into static Javascript bundles (one per language).
+'''
+from __future__ import unicode_literals
+
+from optparse import make_option
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import NoArgsCommand
+
+from ember import collector, compression, minifier, registry
+from ember.conf import settings
+
+
+class Command(NoArgsCommand):
+    help = 'Collect all {% handlebars %} templates into static Javascript bundles (one per language)'
+    option_list = NoArgsCommand.option_list + (
+        make_option('--language', '-l', action='append', dest='languages', default=None,
+            help='Only build the bundle for this language (default to all settings.LANGUAGES). '
+                 'Use multiple times to build more.'),
+        make_option('--precompile', action='store_true', dest='precompile', default=None,
+            help='Precompile the collected templates (default to settings.EMBER_PRECOMPILE)'),
+    )
+
+    def handle_noargs(self, **options):
+        verbosity = int(options.get('verbosity', 1))
+
+        precompile = options.get('precompile')
+        if precompile is None:
+            precompile = settings.EMBER_PRECOMPILE
+
+        skipped = []
+        collected = collector.collect_templates(options.get('languages'), skipped)
+        for name, template_id in skipped:
+            self.stderr.write('Template "%s" from %s depends on the request context and is not collected\n'
+                              % (template_id, name))
+
+        # Templates have been parsed so the registry knows all of them
+        names = set(template_id for templates in collected.values() for template_id, source in templates)
+        for name, kind, reference in registry.dangling(names):
+            self.stderr.write('Template "%s" references an unknown %s: "%s"\n' % (name, kind, reference))
+
+        # Precompile all languages templates once, in a single batch
+        compiled = collector.precompile_templates(collected) if precompile else None
+
+        contents = dict((language, collector.build_bundle(templates, precompile, compiled))
+                        for language, templates in collected.items())
+        hashes = dict((language, collector.hash_templates(templates)) for language, templates in collected.items())
+        sources = dict((language, collector.build_sources(templates, precompile, compiled))
+                       for language, templates in collected.items())
+        names = collector.save_bundles(contents, hashes, sources)
+        if settings.EMBER_PRECOMPRESS:
+            compression.compress_files(staticfiles_storage, names.values())
+
+        saved_bytes = minifier.saved_bytes()
+        for language, templates in sorted(collected.items()):
+            if verbosity > 1:
+                for template_id, source in templates:
+                    if template_id in saved_bytes:
+                        self.stdout.write('Collected template "%s" (%s), %s bytes saved by minification\n'
+                                          % (template_id, language, saved_bytes[template_id]))
+                    else:
+                        self.stdout.write('Collected template "%s" (%s)\n' % (template_id, language))
+            if verbosity > 0:
+                self.stdout.write('%s templates collected into %s\n' % (len(templates), names[language]))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+'''
+Django Ember middlewares.
+'''
+from __future__ import unicode_literals
+
+from django.utils.encoding import force_text
+
+from ember import budget
+from ember.conf import settings
+
+
+class PayloadBudgetMiddleware(object):
+    '''
+    Check the Ember payload of the HTML responses against the budgets
+    (see :mod:`ember.budget`) and add the ``X-Ember-Payload`` header (in bytes).
+
+    Streamed responses are not checked.
+    '''
+    def process_response(self, request, response):
+        if settings.EMBER_TEMPLATE_BUDGET is None and settings.EMBER_RESPONSE_BUDGET is None:
+            return response
+        if getattr(response, 'streaming', False) or 'html' not in response.get('Content-Type', ''):
+            return response
+
+        templates, scripts = budget.measure(force_text(response.content, errors='replace'))
+        response['X-Ember-Payload'] = str(sum(size for name, size in templates + scripts))
+        budget.enforce(budget.check_response(templates, scripts), request.path)
+        return response
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+'''
+Handlebars templates minification.
+
+Handlebars comments are stripped and whitespace runs are collapsed into a single space,
+except inside mustaches (``{{ }}`` and ``{{{ }}}``), quoted attributes values
+and ``<pre>``, ``<textarea>``, ``<script>`` and ``<style>`` elements.
+'''
+from __future__ import unicode_literals
+
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Block comments ({{!-- --}}) may contain mustaches so they are matched first
+RE_COMMENT = re.compile(r'\{\{!--.*?--\}\}|\{\{!.*?\}\}', re.DOTALL)
+
+# Content where whitespace is significant.
+# Attributes values may contain mustaches with quoted arguments.
+RE_PROTECTED = re.compile(
+    r'\{\{\{.*?\}\}\}|\{\{.*?\}\}|<(pre|textarea|script|style)\b.*?</\1\s*>'
+    r'|=\s*"(?:\{\{[^}]*\}\}|\{(?!\{)|[^"{])*"|=\s*\'(?:\{\{[^}]*\}\}|\{(?!\{)|[^\'{])*\'',
+    re.DOTALL | re.IGNORECASE
+)
+
+RE_WHITESPACE = re.compile(r'\s+')
+
+_lock = threading.Lock()
+_saved = {}
+
+
+def _collapse(text):
+    return RE_WHITESPACE.sub(' ', text)
+
+
+def minify(source, name=None):
+    '''
+    Minify a Handlebars template source.
+
+    :param name: the template name the saved bytes are reported for.
+    '''
+    source_without_comments = RE_COMMENT.sub('', source)
+    output = []
+    position = 0
+    for match in RE_PROTECTED.finditer(source_without_comments):
+        output.append(_collapse(source_without_comments[position:match.start()]))
+        output.append(match.group(0))
+        position = match.end()
+    output.append(_collapse(source_without_comments[position:]))
+    minified = ''.join(output).strip()
+
+    if name is not None:
+        saved = len(source.encode('utf-8')) - len(minified.encode('utf-8'))
+        with _lock:
+            _saved[name] = saved
+        logger.debug('Template "%s" minified: %s bytes saved', name, saved)
+    return minified
+
+
+def saved_bytes():
+    '''The bytes saved by minification indexed by template name, for the current process'''
+    with _lock:
+        return dict(_saved)
+
+
+def reset_saved_bytes():
+    with _lock:
+        _saved.clear()
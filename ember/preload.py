@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+'''
+Server-side serialization of Tastypie resources to seed the Ember Data store.
+
+Lists are serialized in the shape of the Tastypie list endpoint
+(``{"meta": {...}, "objects": [...]}``) expected by ``DS.DjangoTastypieSerializer``
+and encoded by the :mod:`ember.encoding` backend.
+The resource objects list is paginated like the endpoint first page,
+so the client can request the next pages from ``meta.next``.
+
+``values()`` querysets rows are streamed by chunks without being dehydrated by the resource:
+only the values of the fields exposed by the resource are kept
+and the primary and foreign keys are converted to the resources URIs.
+
+Tastypie is an optional dependency, only required to preload data.
+'''
+from __future__ import absolute_import, unicode_literals
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.query import QuerySet
+from django.utils import six
+from django.utils.importlib import import_module
+
+from ember import encoding
+
+try:
+    from django.db.models.query import ValuesQuerySet
+except ImportError:     # Django >= 1.9
+    from django.db.models.query import ValuesIterable
+    ValuesQuerySet = None
+
+try:
+    from tastypie.exceptions import ImmediateHttpResponse
+    from tastypie.resources import Resource
+except ImportError:     # Tastypie is optional
+    ImmediateHttpResponse = Resource = None
+
+
+def get_resource(resource):
+    '''
+    A Tastypie resource instance from an instance, a class or a class dotted path.
+    '''
+    if Resource is None:
+        raise ImproperlyConfigured('Preloading data requires django-tastypie')
+    if isinstance(resource, six.string_types):
+        module, _, name = resource.rpartition('.')
+        try:
+            resource = getattr(import_module(module), name)
+        except (ImportError, AttributeError, ValueError):
+            raise ImproperlyConfigured('Unable to import the resource "%s"' % resource)
+    if isinstance(resource, type) and issubclass(resource, Resource):
+        resource = resource()
+    if not isinstance(resource, Resource):
+        raise ImproperlyConfigured('%r is not a Tastypie resource' % resource)
+    return resource
+
+
+def is_values(objects):
+    '''Whether ``objects`` is a ``values()`` queryset'''
+    if ValuesQuerySet is not None:
+        return isinstance(objects, ValuesQuerySet)
+    return isinstance(objects, QuerySet) and objects._iterable_class is ValuesIterable
+
+
+#: A primary key reversed once in the resources URIs
+PK_PLACEHOLDER = '987654321987654321'
+
+
+def row_fields(resource):
+    '''
+    The ``(field name, row keys, dehydrate)`` of the resource fields
+    whose values may be read from ``values()`` rows.
+
+    The resource URI is built from the primary key column,
+    to-one related fields are read from the foreign key column
+    and dehydrated to the related resource URI, to-many related fields are never read.
+    '''
+    fields = []
+    model = resource._meta.object_class
+    if 'resource_uri' in resource.fields and resource._meta.detail_uri_name == 'pk' and hasattr(model, '_meta'):
+        fields.append(('resource_uri', (model._meta.pk.attname,), related_uri(resource)))
+    for name, field in sorted(resource.fields.items()):
+        if not isinstance(field.attribute, six.string_types) or getattr(field, 'is_m2m', False):
+            continue
+        if not getattr(field, 'is_related', False):
+            fields.append((name, (field.attribute,), None))
+            continue
+        related = field.get_related_resource(None)
+        # Rows only hold the related primary key
+        if related._meta.detail_uri_name == 'pk':
+            # values() without fields names the column after the foreign key attname
+            fields.append((name, (field.attribute, '%s_id' % field.attribute), related_uri(related)))
+    return fields
+
+
+def related_uri(resource):
+    '''A function converting a primary key to the resource URI'''
+    # Reversing an URL per row is slow: integer keys are formatted into an URI reversed once
+    template = resource.get_resource_uri(resource._meta.object_class(pk=PK_PLACEHOLDER))
+    head, _, tail = template.partition(PK_PLACEHOLDER)
+    formatted = template.count(PK_PLACEHOLDER) == 1
+    uris = {None: None}
+
+    def dehydrate(pk):
+        if formatted and isinstance(pk, six.integer_types):
+            return '%s%d%s' % (head, pk, tail)
+        if pk not in uris:
+            uris[pk] = resource.get_resource_uri(resource._meta.object_class(pk=pk))
+        return uris[pk]
+    return dehydrate
+
+
+def list_meta(count):
+    '''The meta of a list containing all its ``count`` objects'''
+    return {
+        'limit': count,
+        'next': None,
+        'offset': 0,
+        'previous': None,
+        'total_count': count,
+    }
+
+
+def paginate(resource, objects):
+    '''
+    The first page of ``objects`` as returned by the resource paginator
+    (``resource._meta.limit`` objects at most).
+
+    :returns: a ``(objects, meta)`` tuple.
+    '''
+    paginator = resource._meta.paginator_class(
+        {}, objects, resource_uri=resource.get_resource_uri(), limit=resource._meta.limit,
+        max_limit=resource._meta.max_limit, collection_name=resource._meta.collection_name
+    )
+    page = paginator.page()
+    meta = page['meta']
+    # Without limit the paginator does not link the pages
+    meta.setdefault('next', None)
+    meta.setdefault('previous', None)
+    return page[resource._meta.collection_name], meta
+
+
+def serialize(resource, objects=None, request=None):
+    '''
+    Serialize ``objects`` as the resource list endpoint would.
+
+    :param objects: the objects to serialize (default to the first page of the resource objects list).
+    :param request: the request used for authorization and dehydration.
+    :returns: a generator of JSON text chunks or ``None``
+              if the request is not authorized to read the list.
+    '''
+    resource = get_resource(resource)
+    base_bundle = resource.build_bundle(request=request)
+    request = base_bundle.request
+    paginated = objects is None
+    if paginated:
+        objects = resource.get_object_list(request)
+    try:
+        objects = resource.authorized_read_list(objects, base_bundle)
+    except ImmediateHttpResponse:
+        return None
+    meta = None
+    if paginated:
+        objects, meta = paginate(resource, objects)
+    if is_values(objects):
+        return _serialize_rows(resource, objects, meta)
+    return _serialize_bundles(resource, objects, request, meta)
+
+
+def _serialize_bundles(resource, objects, request, meta=None):
+    bundles = [resource.full_dehydrate(resource.build_bundle(obj=obj, request=request), for_list=True)
+               for obj in objects]
+    data = resource.alter_list_data_to_serialize(request, {
+        'meta': meta or list_meta(len(bundles)),
+        resource._meta.collection_name: bundles,
+    })
+    yield encoding.dumps(resource._meta.serializer.to_simple(data, {}))
+
+
+def _serialize_rows(resource, rows, meta=None):
+    fields = row_fields(resource)
+    counter = []
+
+    def convert(chunk):
+        counter.append(len(chunk))
+        objects = []
+        for row in chunk:
+            # Never leak the columns the resource does not expose
+            obj = {}
+            for name, keys, dehydrate in fields:
+                for key in keys:
+                    if key in row:
+                        obj[name] = dehydrate(row[key]) if dehydrate else row[key]
+                        break
+            objects.append(obj)
+        return objects
+
+    yield '{%s:' % encoding.dumps(resource._meta.collection_name)
+    for chunk in encoding.iterencode_list(rows.iterator(), convert=convert):
+        yield chunk
+    yield ',"meta":%s}' % encoding.dumps(meta or list_meta(sum(counter)))
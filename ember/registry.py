@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+'''
+Parse-time registry of the ``{% handlebars %}`` templates and their dependencies.
+
+Each parsed block registers the templates it references
+(``{{partial}}``, ``{{template}}`` and ``{{render}}`` helpers)
+and the routes its links point at (``{% linkto %}`` tags and ``{{#linkTo}}`` helpers),
+replacing the references registered by a previous parsing of the same template.
+'''
+from __future__ import unicode_literals
+
+import re
+import threading
+
+#: Reference kinds resolved to a template
+TEMPLATE_KINDS = ('partial', 'template', 'render')
+
+# A quoted or bare template or route name
+NAME = r'''(?:["']([^"']+)["']|([\w./-]+))'''
+
+RE_HELPER = re.compile(r'\{\{\s*(partial|template|render)\s+' + NAME)
+RE_LINKTO = re.compile(r'\{\{\s*#linkTo\s+' + NAME)
+
+_lock = threading.Lock()
+# References sets indexed by template name
+_references = {}
+
+
+def parse_references(source):
+    '''Extract the ``(kind, name)`` references of a Handlebars template source'''
+    references = set((kind, quoted or bare) for kind, quoted, bare in RE_HELPER.findall(source))
+    references.update(('linkto', quoted or bare) for quoted, bare in RE_LINKTO.findall(source))
+    return references
+
+
+def register(name, references):
+    '''Register the template ``name`` and its ``(kind, name)`` references, replacing the previous ones'''
+    with _lock:
+        _references[name] = set(references)
+
+
+def clear():
+    with _lock:
+        _references.clear()
+
+
+def templates():
+    '''The registered templates names'''
+    with _lock:
+        return set(_references)
+
+
+def references(name):
+    '''The ``(kind, name)`` references of the template ``name``'''
+    with _lock:
+        return set(_references.get(name, ()))
+
+
+def candidates(kind, name):
+    '''The template names a reference may resolve to, by order of preference'''
+    name = name.replace('.', '/')
+    if kind == 'partial':
+        # Ember looks for an underscored partial first
+        head, _, tail = name.rpartition('/')
+        return ['%s_%s' % (head + '/' if head else '', tail), name]
+    return [name]
+
+
+def resolve(kind, name, known=None):
+    '''The template name a reference resolves to or ``None``'''
+    known = templates() if known is None else known
+    for candidate in candidates(kind, name):
+        if candidate in known:
+            return candidate
+    return None
+
+
+def dependencies(name, links=False):
+    '''
+    The templates names directly required by the template ``name``.
+
+    :param links: include the templates of the routes linked to.
+    '''
+    known = templates()
+    resolved = set()
+    for kind, reference in references(name):
+        if kind in TEMPLATE_KINDS or links:
+            template_name = resolve(kind, reference, known)
+            if template_name:
+                resolved.add(template_name)
+    return resolved
+
+
+def closure(names, links=False):
+    '''The templates ``names`` and all the templates they transitively depend on'''
+    required = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            pending.extend(dependencies(name, links))
+    return required
+
+
+def dangling(names=None, links=False):
+    '''
+    The templates references not resolved to any registered template.
+
+    :param names: only check these templates (default to all the registered ones).
+    :param links: check the routes linked to too.
+    :returns: a sorted list of ``(template name, kind, reference)``.
+    '''
+    known = templates()
+    with _lock:
+        items = [(name, set(refs)) for name, refs in _references.items() if names is None or name in names]
+    return sorted((name, kind, reference) for name, refs in items for kind, reference in refs
+                  if (kind in TEMPLATE_KINDS or links) and resolve(kind, reference, known) is None)
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+'''
+Django Ember signals.
+'''
+from __future__ import unicode_literals
+
+from django.dispatch import Signal
+
+#: Sent after an instrumented tag rendering (see :mod:`ember.instrumentation`).
+#: The sender is the tag name.
+tag_rendered = Signal(providing_args=['tag', 'name', 'duration', 'size'])
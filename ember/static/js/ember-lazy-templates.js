@@ -0,0 +1,96 @@
+/**
+ * Lazy Handlebars templates loading for Django Ember.
+ *
+ * Templates missing from Ember.TEMPLATES are fetched on demand
+ * from the ember.urls views.
+ *
+ *     App = Ember.Application.create({
+ *         resolver: Ember.LazyTemplates.Resolver
+ *     });
+ *
+ * Routes can also fetch their whole templates group before being entered:
+ *
+ *     App.PostsRoute = Ember.Route.extend(Ember.LazyTemplates.RouteMixin, {
+ *         templatesGroup: 'posts'
+ *     });
+ */
+(function(Ember, $) {
+    'use strict';
+
+    var LazyTemplates = Ember.LazyTemplates = Ember.Namespace.create({
+        /**
+         * URLs patterns, set by the {% ember_lazy_templates_js %} tag.
+         */
+        templatesUrl: '/ember/templates/{names}.js',
+        groupUrl: '/ember/groups/{group}.js',
+
+        // Already requested URLs
+        requested: {},
+
+        /**
+         * Fetch and execute a templates script (only once per URL).
+         * Return a promise.
+         */
+        fetch: function(url, async) {
+            if (!this.requested[url]) {
+                this.requested[url] = $.ajax({
+                    url: url,
+                    dataType: 'script',
+                    cache: true,
+                    async: async !== false
+                });
+            }
+            return this.requested[url];
+        },
+
+        /**
+         * Load the missing templates among names.
+         */
+        load: function(names, async) {
+            var missing = $.grep(names, function(name) {
+                return !Ember.TEMPLATES[name];
+            });
+            if (!missing.length) {
+                return $.Deferred().resolve().promise();
+            }
+            return this.fetch(this.templatesUrl.replace('{names}', missing.join(',')), async);
+        },
+
+        /**
+         * Load all the templates of a route group.
+         */
+        loadGroup: function(group, async) {
+            return this.fetch(this.groupUrl.replace('{group}', group), async);
+        }
+    });
+
+    /**
+     * A resolver synchronously fetching the templates missing from Ember.TEMPLATES.
+     */
+    LazyTemplates.Resolver = Ember.DefaultResolver.extend({
+        resolveTemplate: function(parsedName) {
+            var template = this._super(parsedName);
+            if (!template) {
+                LazyTemplates.load([parsedName.fullNameWithoutType.replace(/\./g, '/')], false);
+                template = this._super(parsedName);
+            }
+            return template;
+        }
+    });
+
+    /**
+     * Fetch the route templates group before entering the route.
+     */
+    LazyTemplates.RouteMixin = Ember.Mixin.create({
+        templatesGroup: null,
+
+        beforeModel: function() {
+            var group = this.get('templatesGroup');
+            if (group) {
+                // Missing groups should not prevent the transition
+                return LazyTemplates.loadGroup(group).then(null, function() {});
+            }
+        }
+    });
+
+}(Ember, jQuery));
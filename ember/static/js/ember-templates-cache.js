@@ -0,0 +1,209 @@
+/**
+ * Content-hashed Handlebars templates cache for Django Ember.
+ *
+ * The {% ember_templates_manifest %} tag gives the content hash of each template:
+ * templates whose hash did not change are loaded from localStorage,
+ * the others are fetched from the ember.urls sources view then stored.
+ *
+ * The application should wait for the templates before booting:
+ *
+ *     App.deferReadiness();
+ *     Ember.TemplatesCache.load().then(function() {
+ *         App.advanceReadiness();
+ *     });
+ */
+(function(Ember, $) {
+    'use strict';
+
+    var ROOT = 'ember-templates:';
+
+    Ember.TemplatesCache = Ember.Namespace.create({
+        /**
+         * Templates hashes indexed by name and sources URLs,
+         * set by the {% ember_templates_manifest %} tag.
+         */
+        manifest: {},
+        precompiled: false,
+        sourcesUrl: '/ember/sources/{names}.json',
+        allSourcesUrl: '/ember/sources.json',
+
+        /**
+         * Sources URLs are split so none of them is longer.
+         */
+        maxURLLength: 2000,
+
+        /**
+         * Stored templates keys prefix.
+         * Precompiled templates depend on the Handlebars version so it is part of the prefix.
+         */
+        prefix: ROOT + Ember.Handlebars.VERSION + ':',
+
+        // The pending or done loading promise
+        loading: null,
+
+        /**
+         * Load all the manifest templates into Ember.TEMPLATES (only once).
+         * Return a promise.
+         */
+        load: function() {
+            if (!this.loading) {
+                this.loading = this.refresh();
+            }
+            return this.loading;
+        },
+
+        /**
+         * Register the stored templates still up to date,
+         * then fetch, register and store the others.
+         * Return a promise.
+         */
+        refresh: function() {
+            var self = this,
+                stale = [];
+
+            this.prune();
+            $.each(this.get('manifest'), function(name, hash) {
+                var entry = self.read(name);
+                if (!self.isFresh(entry, hash) || !self.register(name, entry)) {
+                    stale.push(name);
+                }
+            });
+            if (!stale.length) {
+                return $.Deferred().resolve().promise();
+            }
+            return $.when.apply($, $.map(this.urlsFor(stale), function(url) {
+                return $.ajax({url: url, dataType: 'json', cache: true}).then(function(data) {
+                    $.each(data.templates, function(name, entry) {
+                        entry.precompiled = data.precompiled;
+                        if (self.register(name, entry)) {
+                            self.write(name, entry);
+                        }
+                    });
+                });
+            }));
+        },
+
+        /**
+         * Whether a stored entry matches the manifest hash.
+         */
+        isFresh: function(entry, hash) {
+            return !!entry && entry.hash === hash && entry.precompiled === this.get('precompiled');
+        },
+
+        /**
+         * The URLs of the names templates sources:
+         * all the sources if most templates are requested,
+         * the names split so that no URL is longer than maxURLLength otherwise.
+         */
+        urlsFor: function(names) {
+            var pattern = this.get('sourcesUrl'),
+                base = pattern.length - '{names}'.length,
+                maxLength = this.get('maxURLLength'),
+                urls = [],
+                chunk = [],
+                length = base;
+
+            if (names.length * 2 > Ember.keys(this.get('manifest')).length) {
+                return [this.get('allSourcesUrl')];
+            }
+            $.each(names, function(i, name) {
+                var size = encodeURIComponent(name).length + 1;
+                if (chunk.length && length + size > maxLength) {
+                    urls.push(pattern.replace('{names}', chunk.join(',')));
+                    chunk = [];
+                    length = base;
+                }
+                chunk.push(name);
+                length += size;
+            });
+            if (chunk.length) {
+                urls.push(pattern.replace('{names}', chunk.join(',')));
+            }
+            return urls;
+        },
+
+        /**
+         * Compile a template entry into Ember.TEMPLATES.
+         * Return false if the entry is not a valid template.
+         */
+        register: function(name, entry) {
+            try {
+                if (entry.precompiled) {
+                    /*jshint evil:true */
+                    Ember.TEMPLATES[name] = Ember.Handlebars.template(new Function('return ' + entry.source)());
+                } else {
+                    Ember.TEMPLATES[name] = Ember.Handlebars.compile(entry.source);
+                }
+            } catch (e) {
+                return false;
+            }
+            return true;
+        },
+
+        /**
+         * The localStorage or null if not available.
+         */
+        storage: function() {
+            try {
+                return window.localStorage || null;
+            } catch (e) {
+                // Disabled storage throws on access
+                return null;
+            }
+        },
+
+        /**
+         * The stored entry of a template or null.
+         */
+        read: function(name) {
+            var storage = this.storage();
+            if (!storage) {
+                return null;
+            }
+            try {
+                return JSON.parse(storage.getItem(this.get('prefix') + name));
+            } catch (e) {
+                return null;
+            }
+        },
+
+        write: function(name, entry) {
+            var storage = this.storage();
+            if (!storage) {
+                return;
+            }
+            try {
+                storage.setItem(this.get('prefix') + name, JSON.stringify({
+                    hash: entry.hash,
+                    source: entry.source,
+                    precompiled: entry.precompiled
+                }));
+            } catch (e) {
+                // The storage is full: the template is only kept for this page
+            }
+        },
+
+        /**
+         * Remove the stored templates no longer in the manifest
+         * or stored for another Handlebars version.
+         */
+        prune: function() {
+            var storage = this.storage(),
+                prefix = this.get('prefix'),
+                manifest = this.get('manifest'),
+                key, i;
+
+            if (!storage) {
+                return;
+            }
+            for (i = storage.length - 1; i >= 0; i--) {
+                key = storage.key(i);
+                if (key && key.indexOf(ROOT) === 0
+                        && !(key.indexOf(prefix) === 0 && manifest.hasOwnProperty(key.slice(prefix.length)))) {
+                    storage.removeItem(key);
+                }
+            }
+        }
+    });
+
+}(Ember, jQuery));
@@ -7,7 +7,11 @@ DS.DjangoTastypieSerializer = DS.JSONSerializer.extend({
 
     this.configure({
       meta: 'meta',
-      since: 'next'
+      since: 'next',
+      // Query parameter selecting the fields of the `fields` option
+      fieldsParam: 'fields',
+      // Send the lists requests with the validators of the previous response
+      conditional: false
     });
   },
 
@@ -113,18 +117,80 @@ DS.DjangoTastypieSerializer = DS.JSONSerializer.extend({
   },
 
   /**
-   Tastypie default does not support sideloading
+   Tastypie default does not support sideloading:
+   related records are embedded into their parent instead
+   (see extractRecordRepresentation)
    */
   sideload: function(loader, type, json, root) {
 
   },
 
+  /**
+    Load the related records embedded by Tastypie (`full=True` fields)
+    into the store and replace them by their ids.
+    Relationships mapped as embedded are left to Ember Data
+  */
+  extractRecordRepresentation: function(loader, type, data, shouldSideload) {
+    var self = this,
+        hash = null;
+
+    type.eachRelationship(function(name, relationship) {
+      var key = self.keyFor(relationship),
+          value, ids;
+
+      if (self.embeddedType(type, name)) { return; }
+
+      value = self._relationshipValue(data, key);
+
+      if (relationship.kind === 'belongsTo' && self._isEmbedded(value)) {
+        hash = hash || Ember.merge({}, data);
+        hash[key] = self._extractEmbedded(loader, relationship.type, value);
+
+      } else if (relationship.kind === 'hasMany' && Ember.isArray(value) && value.some(self._isEmbedded)) {
+        hash = hash || Ember.merge({}, data);
+        ids = value.map(function(item) {
+          return self._isEmbedded(item) ? self._extractEmbedded(loader, relationship.type, item) : item;
+        });
+        hash[key] = ids;
+      }
+    });
+
+    return this._super(loader, type, hash || data, shouldSideload);
+  },
+
+  _isEmbedded: function(value) {
+    return !!value && typeof value === 'object' && !Ember.isArray(value);
+  },
+
+  _extractEmbedded: function(loader, type, data) {
+    var id = data.id;
+
+    if (Ember.isNone(id)) {
+      id = this._deurlify(data.resource_uri);
+      data = Ember.merge(Ember.merge({}, data), {id: id});
+    }
+    this.extractRecordRepresentation(loader, type, data, true);
+    return id;
+  },
+
+  /**
+    The value of a relationship, stored either under its key (`author_id`)
+    or, as Tastypie does by default, under its name (`author`)
+  */
+  _relationshipValue: function(hash, key) {
+    if (hash[key] === undefined && key.slice(-3) === '_id') {
+      return hash[key.slice(0, -3)];
+    }
+    return hash[key];
+  },
+
   /**
     ASSOCIATIONS: DESERIALIZATION
     Transforms the association fields from Resource URI django-tastypie format
   */
   _deurlify: function(value) {
-    if (typeof value === "string") {
+    // Ids of embedded records are not URIs
+    if (typeof value === "string" && value.indexOf('/') !== -1) {
       return value.split('/').reverse()[1];
     } else {
       return value;
@@ -147,7 +213,7 @@ DS.DjangoTastypieSerializer = DS.JSONSerializer.extend({
   },
 
   extractBelongsTo: function(type, hash, key) {
-    var value = hash[key];
+    var value = this._relationshipValue(hash, key);
 
     if (!!value) {
       value = this._deurlify(value);
@@ -178,8 +244,10 @@ DS.DjangoTastypieAdapter = DS.RESTAdapter.extend({
   namespace: "api/v1",
 
   /**
-    Bulk commits are not supported at this time by the adapter.
-    Changing this setting will not work
+    When enabled, the dirty records of each type are sent in a single
+    PATCH request to the list endpoint (`objects` and `deleted_objects`).
+    PATCH actions must be enabled in the Resource and `always_return_data`
+    must be set for the created records to get their ids
   */
   bulkCommit: false,
 
@@ -191,6 +259,28 @@ DS.DjangoTastypieAdapter = DS.RESTAdapter.extend({
   */
   since: 'next',
 
+  /**
+    When enabled, findAll and findQuery follow the `meta.next` URLs
+    until all the objects are fetched. Each page is loaded as soon
+    as it arrives so the record arrays are rendered progressively.
+    It can be enabled per type:
+    `DS.DjangoTastypieAdapter.configure(App.Post, {paginate: true})`
+  */
+  paginate: false,
+
+  /**
+    Number of objects requested per page when paginating.
+    It can be set per type with the `pageSize` configuration option.
+    The Resource `limit` is used when null
+  */
+  pageSize: null,
+
+  /**
+    Maximum length of the set endpoint URLs used by findMany.
+    Larger requests are split into many requests
+  */
+  maxURLLength: 2000,
+
   /**
     Serializer object to manage JSON transformations
   */
@@ -274,30 +364,529 @@ DS.DjangoTastypieAdapter = DS.RESTAdapter.extend({
     }).then(null, rejectionHandler);
   },
 
-  findMany: function(store, type, ids) {
-    var url,
+  /**
+    Group the created, updated and deleted records by type
+    and send them with `patchRecords` when `bulkCommit` is enabled
+  */
+  save: function(store, commitDetails) {
+    var adapter = this,
+        groups = Ember.Map.create();
+
+    if (get(this, 'bulkCommit') === false) {
+      return this._super(store, commitDetails);
+    }
+
+    ['created', 'updated', 'deleted'].forEach(function(kind) {
+      this.groupByType(commitDetails[kind]).forEach(function(type, set) {
+        var group = groups.get(type);
+
+        if (!group) {
+          group = {created: [], updated: [], deleted: []};
+          groups.set(type, group);
+        }
+
+        set.forEach(function(record) {
+          if (adapter.shouldSave(record)) { group[kind].push(record); }
+        });
+      });
+    }, this);
+
+    groups.forEach(function(type, group) {
+      if (group.created.length || group.updated.length || group.deleted.length) {
+        adapter.patchRecords(store, type, group.created, group.updated, group.deleted);
+      }
+    });
+  },
+
+  /**
+    Create, update and delete records of a type in a single PATCH request.
+    Updated records are identified by their `resource_uri`.
+    Returned objects are in the same order than the sent ones
+  */
+  patchRecords: function(store, type, created, updated, deleted) {
+    var serializer = get(this, 'serializer'),
         root = this.rootForType(type),
+        adapter = this,
+        data = {objects: [], deleted_objects: []};
+
+    created.forEach(function(record) {
+      data.objects.push(record.serialize());
+    });
+
+    updated.forEach(function(record) {
+      var hash = record.serialize();
+      hash.resource_uri = serializer.getItemUrl({type: type}, get(record, 'id'));
+      data.objects.push(hash);
+    });
+
+    deleted.forEach(function(record) {
+      data.deleted_objects.push(serializer.getItemUrl({type: type}, get(record, 'id')));
+    });
+
+    function didPatch(json) {
+      var objects = (json && json.objects) || [];
+
+      if (created.length) {
+        adapter.didCreateRecords(store, type, created, objects.length ? {objects: objects.slice(0, created.length)} : null);
+      }
+      if (updated.length) {
+        adapter.didUpdateRecords(store, type, updated, objects.length ? {objects: objects.slice(created.length)} : null);
+      }
+      if (deleted.length) {
+        adapter.didDeleteRecords(store, type, deleted);
+      }
+    }
+
+    return this.ajax(this.buildURL(root), "PATCH", {
+      data: data
+    }).then(didPatch, function(xhr) {
+      // Tastypie answers "202 Accepted" without body unless always_return_data is set
+      if (xhr && xhr.status === 202) {
+        // The created records would be saved without ids
+        created.forEach(function(record) {
+          adapter.didError(store, type, record, xhr);
+        });
+        created = [];
+        return didPatch(null);
+      }
+      created.concat(updated, deleted).forEach(function(record) {
+        adapter.didError(store, type, record, xhr);
+      });
+      throw xhr;
+    }).then(null, rejectionHandler);
+  },
+
+  /**
+    Load the record from the preloaded list of its type if it is there.
+    Records loaded with selected fields are fetched in full
+  */
+  find: function(store, type, id) {
+    var partial = this.isPartial(type, id);
+
+    if (partial) {
+      delete this.partialIds(type)[id];
+    }
+    if (this.loadPreloaded(store, type) && !partial && store.recordIsLoaded(type, id)) {
+      return Ember.RSVP.resolve();
+    }
+    return this._super(store, type, id);
+  },
+
+  findAll: function(store, type, since) {
+    var url = this.buildURL(this.rootForType(type)),
+        data = this.fieldsQuery(type, this.sinceQuery(since)),
+        preloaded = this.loadPreloaded(store, type),
+        adapter = this,
+        next;
+
+    if (preloaded) {
+      // The preloaded list is the first page of the list
+      next = this.nextFor(type, preloaded);
+      if (next && this.shouldPaginate(type)) {
+        return this.fetchPages(store, type, store.all(type), {}, next);
+      }
+      store.didUpdateAll(type);
+      return Ember.RSVP.resolve();
+    }
+
+    if (this.shouldPaginate(type)) {
+      return this.fetchPages(store, type, store.all(type), {});
+    }
+
+    return this.fetchList(type, url, data).then(function(json) {
+      if (json) {
+        adapter.didFindAll(store, type, json);
+      } else {
+        store.didUpdateAll(type);
+      }
+    }).then(null, rejectionHandler);
+  },
+
+  findQuery: function(store, type, query, recordArray) {
+    var url = this.buildURL(this.rootForType(type)),
+        data = this.fieldsQuery(type, query),
+        adapter = this;
+
+    if (this.shouldPaginate(type)) {
+      return this.fetchPages(store, type, recordArray, query);
+    }
+
+    return this.fetchList(type, url, data).then(function(json) {
+      if (json) {
+        adapter.didFindQuery(store, type, json, recordArray);
+      } else {
+        recordArray.load(adapter.freshReferences(store, type, url, data));
+      }
+    }).then(null, rejectionHandler);
+  },
+
+  shouldPaginate: function(type) {
+    var paginate = get(this, 'serializer').configOption(type, 'paginate');
+    return Ember.isNone(paginate) ? get(this, 'paginate') : paginate;
+  },
+
+  pageSizeFor: function(type) {
+    var pageSize = get(this, 'serializer').configOption(type, 'pageSize');
+    return Ember.isNone(pageSize) ? get(this, 'pageSize') : pageSize;
+  },
+
+  /**
+    Fetch all the pages of a list, following the `meta.next` URLs.
+    The walk starts from the `from` next URL if the first page is already loaded.
+    Only one walk is running for a record array: a new one cancels the previous
+  */
+  fetchPages: function(store, type, recordArray, query, from) {
+    var pageSize = this.pageSizeFor(type),
+        cursors = this._pageCursors || (this._pageCursors = Ember.Map.create()),
+        cursor = {cancelled: false},
         adapter = this;
 
-    ids = this.serializeIds(ids);
+    this.cancelPages(recordArray);
+    cursors.set(recordArray, cursor);
+    set(recordArray, 'isUpdating', true);
+
+    query = this.fieldsQuery(type, query);
+    if (pageSize) { query.limit = pageSize; }
+
+    function done() {
+      if (cursors.get(recordArray) === cursor) {
+        cursors.remove(recordArray);
+        set(recordArray, 'isUpdating', false);
+      }
+    }
+
+    function fetchPage(url, data, first) {
+      return adapter.fetchList(type, url, data).then(function(json) {
+        var next, fresh;
+
+        if (cursor.cancelled) { return; }
+
+        if (json) {
+          adapter.didFindPage(store, type, json, recordArray, first);
+          next = adapter.nextFor(type, json);
+        } else {
+          // Not modified: the records are already loaded
+          fresh = adapter.freshList(url, data);
+          adapter.didFindFreshPage(store, type, fresh.ids, recordArray, first);
+          next = fresh.next;
+        }
+
+        if (next) {
+          return fetchPage(adapter.nextURL(next), null, false);
+        }
+        done();
+      });
+    }
+
+    var walk = from ? fetchPage(this.nextURL(from), null, false)
+                    : fetchPage(this.buildURL(this.rootForType(type)), query, true);
+
+    return walk.then(null, function(reason) {
+      done();
+      throw reason;
+    }).then(null, rejectionHandler);
+  },
+
+  /**
+    Stop following the next pages of a record array.
+    The records already loaded are kept
+  */
+  cancelPages: function(recordArray) {
+    var cursors = this._pageCursors,
+        cursor = cursors && cursors.get(recordArray);
+
+    if (cursor) {
+      cursor.cancelled = true;
+      cursors.remove(recordArray);
+      set(recordArray, 'isUpdating', false);
+    }
+  },
 
-    // FindMany array through subset of resources
-    if (ids instanceof Array) {
-      ids = "set/" + ids.join(";") + '/';
+  /**
+    Load a page of a list. Query results are appended to their record array,
+    the records of a findAll are already in the live `store.all()` array
+  */
+  didFindPage: function(store, type, payload, recordArray, first) {
+    var loader = DS.loaderFor(store);
+
+    if (recordArray instanceof DS.AdapterPopulatedRecordArray) {
+      loader.populateArray = function(references) {
+        if (first) {
+          recordArray.load(references);
+        } else {
+          get(recordArray, 'content').pushObjects(references);
+        }
+      };
     }
 
-    url = this.buildURL(root);
-    url += ids;
+    get(this, 'serializer').extractMany(loader, payload, type);
+  },
+
+  didFindFreshPage: function(store, type, ids, recordArray, first) {
+    var references;
 
-    this.ajax(url, "GET", {
-      success: function(json) {
-        this.didFindMany(store, type, json);
+    if (recordArray instanceof DS.AdapterPopulatedRecordArray) {
+      references = ids.map(function(id) {
+        return store.referenceForId(type, id);
+      });
+      if (first) {
+        recordArray.load(references);
+      } else {
+        get(recordArray, 'content').pushObjects(references);
       }
+    }
+  },
+
+  /**
+    The `meta.next` URL of a list response
+  */
+  nextFor: function(type, json) {
+    var serializer = get(this, 'serializer'),
+        meta = serializer.configOption(type, 'meta'),
+        data = meta && json[meta] ? json[meta] : json;
+
+    return data[serializer.configOption(type, 'since')];
+  },
+
+  /**
+    The `meta.next` URLs are absolute paths on the API server
+  */
+  nextURL: function(next) {
+    if (!!this.serverDomain && next.charAt(0) === '/') {
+      return this.removeTrailingSlash(this.serverDomain) + next;
+    }
+    return next;
+  },
+
+  /**
+    The lists inlined into the page by the `{% ember_preload_data %}` tag,
+    indexed by resource name
+  */
+  readPreloaded: function() {
+    var preloaded = {};
+
+    Ember.$('script[type="application/json"][data-tastypie-preload]').each(function() {
+      preloaded[this.getAttribute('data-tastypie-preload')] = JSON.parse(this.text);
     });
+    return preloaded;
+  },
+
+  /**
+    Load the preloaded list of a type into the store, only once.
+    Return the loaded list or null if there was none
+  */
+  loadPreloaded: function(store, type) {
+    var preloaded = this._preloaded || (this._preloaded = this.readPreloaded()),
+        root = this.rootForType(type),
+        payload = preloaded[root];
+
+    if (!payload) { return null; }
+
+    delete preloaded[root];
+    get(this, 'serializer').extractMany(DS.loaderFor(store), payload, type);
+    return payload;
+  },
+
+  /**
+    Add the fields selected for a type to the query parameters.
+    Fields are selected per type with the `fields` configuration option:
+    `DS.DjangoTastypieAdapter.configure(App.Post, {fields: ['title', 'author']})`
+    The primary key is always selected
+  */
+  fieldsQuery: function(type, query) {
+    var serializer = get(this, 'serializer'),
+        fields = serializer.configOption(type, 'fields'),
+        param = serializer.configOption(type, 'fieldsParam'),
+        primaryKey = serializer._primaryKey(type);
+
+    query = Ember.merge({}, query);
+    if (fields && fields.length && param) {
+      fields = Ember.A(fields.slice());
+      if (!fields.contains(primaryKey)) { fields.unshift(primaryKey); }
+      query[param] = fields.join(',');
+    }
+    return query;
+  },
+
+  /**
+    GET a list of objects of a type.
+    When the `conditional` option is enabled, the validators of the previous
+    response (`ETag` and `Last-Modified`) are sent with `If-None-Match`
+    and `If-Modified-Since`: a 304 response resolves with null
+    as the store is fresh (see `freshList`)
+  */
+  fetchList: function(type, url, data) {
+    var serializer = get(this, 'serializer'),
+        lists = this._freshLists || (this._freshLists = {}),
+        key = this.listKey(url, data),
+        fresh = lists[key],
+        headers = {},
+        adapter = this,
+        xhr;
+
+    if (!serializer.configOption(type, 'conditional')) {
+      return this.ajax(url, "GET", {data: data}).then(function(json) {
+        adapter.didFetchFields(type, data, json);
+        return json;
+      });
+    }
+
+    if (fresh && fresh.etag) { headers['If-None-Match'] = fresh.etag; }
+    if (fresh && fresh.lastModified) { headers['If-Modified-Since'] = fresh.lastModified; }
+
+    // Through `ajax` so that its overrides still apply
     return this.ajax(url, "GET", {
+      data: data,
+      headers: headers,
+      // Keep the jqXHR to read the response status and validators
+      beforeSend: function(jqXHR, settings) {
+        var beforeSend = Ember.$.ajaxSettings.beforeSend;
+
+        xhr = jqXHR;
+        return beforeSend ? beforeSend.call(this, jqXHR, settings) : undefined;
+      }
     }).then(function(json) {
-      adapter.didFindMany(store, type, json);
-    }).then(null, rejectionHandler);
+      var etag = xhr && xhr.getResponseHeader('ETag'),
+          lastModified = xhr && xhr.getResponseHeader('Last-Modified');
+
+      if (xhr && xhr.status === 304) {
+        return null;
+      }
+      if (etag || lastModified) {
+        lists[key] = {
+          etag: etag,
+          lastModified: lastModified,
+          ids: (json.objects || []).map(function(hash) {
+            return serializer.extractId(type, hash);
+          }),
+          next: adapter.nextFor(type, json)
+        };
+      }
+      adapter.didFetchFields(type, data, json);
+      return json;
+    });
+  },
+
+  /**
+    Track the records of a list fetched with selected fields as partial:
+    they are fetched in full when found by id
+  */
+  didFetchFields: function(type, data, json) {
+    var serializer = get(this, 'serializer'),
+        param = serializer.configOption(type, 'fieldsParam'),
+        partial;
+
+    if (!json || !data || !param || !data[param]) { return; }
+
+    partial = this.partialIds(type);
+    (json.objects || []).forEach(function(hash) {
+      partial[serializer.extractId(type, hash)] = true;
+    });
+  },
+
+  partialIds: function(type) {
+    var partial = this._partialIds || (this._partialIds = Ember.Map.create());
+
+    if (!partial.get(type)) {
+      partial.set(type, {});
+    }
+    return partial.get(type);
+  },
+
+  isPartial: function(type, id) {
+    var partial = this._partialIds && this._partialIds.get(type);
+    return !!(partial && partial[id]);
+  },
+
+  /**
+    The ids and the next URL of the last response to a list request
+  */
+  freshList: function(url, data) {
+    return (this._freshLists || {})[this.listKey(url, data)];
+  },
+
+  freshReferences: function(store, type, url, data) {
+    return this.freshList(url, data).ids.map(function(id) {
+      return store.referenceForId(type, id);
+    });
+  },
+
+  listKey: function(url, data) {
+    return data ? url + '?' + Ember.$.param(data) : url;
+  },
+
+  /**
+    Coalesce the findMany requests of a type issued in the same run loop
+    into requests to the Tastypie set endpoint (`/resource/set/1;2;3/`).
+    The returned promise resolves once all the coalesced requests completed
+  */
+  findMany: function(store, type, ids) {
+    var pending = this._pendingFindMany || (this._pendingFindMany = Ember.Map.create()),
+        group = pending.get(type);
+
+    if (!group) {
+      group = {store: store, ids: [], deferred: Ember.RSVP.defer()};
+      pending.set(type, group);
+    }
+    group.ids.push.apply(group.ids, this.serializeIds(ids));
+
+    Ember.run.scheduleOnce('actions', this, this.flushFindMany);
+    return group.deferred.promise.then(null, rejectionHandler);
+  },
+
+  flushFindMany: function() {
+    var pending = this._pendingFindMany,
+        adapter = this;
+
+    this._pendingFindMany = null;
+    if (!pending) { return; }
+
+    pending.forEach(function(type, group) {
+      var data = adapter.fieldsQuery(type),
+          requests;
+
+      requests = adapter.setURLs(type, group.ids, Ember.$.param(data).length).map(function(url) {
+        return adapter.ajax(url, "GET", {data: data}).then(function(json) {
+          adapter.didFetchFields(type, data, json);
+          adapter.didFindMany(group.store, type, json);
+        });
+      });
+      Ember.RSVP.all(requests).then(group.deferred.resolve, group.deferred.reject);
+    });
+  },
+
+  /**
+    Split the set endpoint URLs for the given ids so that
+    none of them is longer than `maxURLLength`
+    (including `reserved` characters for the query string)
+  */
+  setURLs: function(type, ids, reserved) {
+    var base = this.buildURL(this.rootForType(type)) + 'set/',
+        maxLength = get(this, 'maxURLLength') - (reserved ? reserved + 1 : 0),
+        urls = [],
+        chunk = [],
+        length = base.length,
+        seen = {};
+
+    ids.forEach(function(id) {
+      var size = String(id).length + 1;
+
+      if (seen[id]) { return; }
+      seen[id] = true;
+
+      if (chunk.length && length + size > maxLength) {
+        urls.push(base + chunk.join(';') + '/');
+        chunk = [];
+        length = base.length;
+      }
+      chunk.push(id);
+      length += size;
+    });
+
+    if (chunk.length) {
+      urls.push(base + chunk.join(';') + '/');
+    }
+    return urls;
   },
 
   buildURL: function(record, suffix) {
@@ -354,3 +943,19 @@ DS.DjangoTastypieAdapter = DS.RESTAdapter.extend({
     return name;
   }
 });
+
+
+/**
+  Fetch in full the records loaded with selected fields when they are found by id
+*/
+DS.Store.reopen({
+  findById: function(type, id) {
+    var record = this._super(type, id),
+        adapter = this.adapterForType(type);
+
+    if (adapter.isPartial && adapter.isPartial(type, id) && get(record, 'isLoaded') && !get(record, 'isDirty')) {
+      record.reload();
+    }
+    return record;
+  }
+});
@@ -1 +1 @@
-function rejectionHandler(e){throw Ember.Logger.error(e,e.message),e}var get=Ember.get,set=Ember.set;DS.DjangoTastypieSerializer=DS.JSONSerializer.extend({init:function(){this._super(),this.configure({meta:"meta",since:"next"})},getItemUrl:function(e,t){var n;return n=get(this,"adapter").rootForType(e.type),["",get(this,"namespace"),n,t,""].join("/")},keyForBelongsTo:function(e,t){return this.keyForAttributeName(e,t)+"_id"},addBelongsTo:function(e,t,n,r){var i,s=get(t,r.key),o=this.embeddedType(t.constructor,n);o==="always"?e[n]=s.serialize():(i=get(s,this.primaryKey(s)),Ember.isNone(i)||(e[n]=this.getItemUrl(r,i)))},addHasMany:function(e,t,n,r){var i=this,s=[],o=null,u=this.embeddedType(t.constructor,n);n=this.keyForHasMany(r.type,n),value=t.get(n)||[],value.forEach(function(e){u==="always"?s.push(e.serialize()):(o=get(e,i.primaryKey(e)),Ember.isNone(o)||s.push(i.getItemUrl(r,o)))}),e[n]=s},extract:function(e,t,n,r){this.extractMeta(e,n,t),this.sideload(e,n,t),t&&(r&&e.updateId(r,t),this.extractRecordRepresentation(e,n,t))},extractMany:function(e,t,n,r){this.sideload(e,n,t),this.extractMeta(e,n,t);if(t.objects){var i=t.objects,s=[];r&&(r=r.toArray());for(var o=0;o<i.length;o++){r&&e.updateId(r[o],i[o]);var u=this.extractRecordRepresentation(e,n,i[o]);s.push(u)}e.populateArray(s)}},extractMeta:function(e,t,n){var r=this.configOption(t,"meta"),i=n,s;r&&n[r]&&(i=n[r]),this.metadataMapping.forEach(function(n,r){(s=i[n])&&e.metaForType(t,r,s)})},sideload:function(e,t,n,r){},_deurlify:function(e){return typeof e=="string"?e.split("/").reverse()[1]:e},extractHasMany:function(e,t,n){var r,i=this;return r=t[n],!r||r.forEach(function(e,t,n){n[t]=i._deurlify(e)}),r},extractBelongsTo:function(e,t,n){var r=t[n];return!r||(r=this._deurlify(r)),r}});var get=Ember.get,set=Ember.set;DS.DjangoTastypieAdapter=DS.RESTAdapter.extend({serverDomain:null,namespace:"api/v1",bulkCommit:!1,since:"next",serializer:DS.DjangoTastypieSerializer,init:function(){var e,t;this._super(),t=get(this,"namespace"),Em.assert("tastypie namespace parameter is mandatory.",!!t),e=get(this,"serializer"),set(e,"adapter",this),set(e,"namespace",t)},createRecord:function(e,t,n){var r,i=this.rootForType(t),s=this;return r=n.serialize(),this.ajax(this.buildURL(i),"POST",{data:r}).then(function(r){s.didCreateRecord(e,t,n,r)},function(r){throw s.didError(e,t,n,r),r}).then(null,rejectionHandler)},updateRecord:function(e,t,n){var r,i,s=this.rootForType(t),o=this;return r=get(n,"id"),i=n.serialize(),this.ajax(this.buildURL(s,r),"PUT",{data:i}).then(function(r){o.didUpdateRecord(e,t,n,r)},function(r){throw o.didError(e,t,n,r),r}).then(null,rejectionHandler)},deleteRecord:function(e,t,n){var r,i=this.rootForType(t),s=this;return r=get(n,"id"),this.ajax(this.buildURL(i,r),"DELETE").then(function(r){s.didDeleteRecord(e,t,n,r)},function(r){throw s.didError(e,t,n,r),r}).then(null,rejectionHandler)},findMany:function(e,t,n){var r,i=this.rootForType(t),s=this;return n=this.serializeIds(n),n instanceof Array&&(n="set/"+n.join(";")+"/"),r=this.buildURL(i),r+=n,this.ajax(r,"GET",{success:function(n){this.didFindMany(e,t,n)}}),this.ajax(r,"GET",{}).then(function(n){s.didFindMany(e,t,n)}).then(null,rejectionHandler)},buildURL:function(e,t){var n=this._super(e,t);return n.charAt(n.length-1)!=="/"&&(n+="/"),!this.serverDomain||(n=this.removeTrailingSlash(this.serverDomain)+n),n},sinceQuery:function(e){var t,n;return n={},!e||(t=e.match(/offset=(\d+)/),t=!t||!t[1]?null:t[1],n.offset=t),t?n:null},removeTrailingSlash:function(e){return e.charAt(e.length-1)==="/"?e.slice(0,-1):e},pluralize:function(e){return e}});
+var get=Ember.get,set=Ember.set;DS.DjangoTastypieSerializer=DS.JSONSerializer.extend({init:function(){this._super();this.configure({meta:'meta',since:'next',fieldsParam:'fields',conditional:false});},getItemUrl:function(b,c){var a;a=get(this,'adapter').rootForType(b.type);return["",get(this,'namespace'),a,c,""].join('/');},keyForBelongsTo:function(a,b){return this.keyForAttributeName(a,b)+"_id";},addBelongsTo:function(f,e,b,d){var c,a=get(e,d.key),g=this.embeddedType(e.constructor,b);if(g==='always'){f[b]=a.serialize();}else{c=get(a,this.primaryKey(a));if(!Ember.isNone(c)){f[b]=this.getItemUrl(d,c);}}},addHasMany:function(g,f,a,e){var d=this,b=[],c=null,h=this.embeddedType(f.constructor,a);a=this.keyForHasMany(e.type,a);value=f.get(a)||[];value.forEach(function(a){if(h==='always'){b.push(a.serialize());}else{c=get(a,d.primaryKey(a));if(!Ember.isNone(c)){b.push(d.getItemUrl(e,c));}}});g[a]=b;},extract:function(b,a,c,d){this.extractMeta(b,c,a);this.sideload(b,c,a);if(a){if(d){b.updateId(d,a);}this.extractRecordRepresentation(b,c,a);}},extractMany:function(b,d,e,a){this.sideload(b,e,d);this.extractMeta(b,e,d);if(d.objects){var f=d.objects,g=[];if(a){a=a.toArray();}for(var c=0; c<f.length; c++){if(a){b.updateId(a[c],f[c]);}var h=this.extractRecordRepresentation(b,e,f[c]);g.push(h);}b.populateArray(g);}},extractMeta:function(f,d,b){var a=this.configOption(d,'meta'),e=b,c;if(a&&b[a]){e=b[a];}this.metadataMapping.forEach(function(a,b){if(c=e[a]){f.metaForType(d,b,c);}});},sideload:function(c,a,d,b){},extractRecordRepresentation:function(e,d,c,f){var a=this,b=null;d.eachRelationship(function(j,g){var h=a.keyFor(g),f,i;if(a.embeddedType(d,j)){return;}f=a._relationshipValue(c,h);if(g.kind==='belongsTo'&&a._isEmbedded(f)){b=b||Ember.merge({},c);b[h]=a._extractEmbedded(e,g.type,f);}else if(g.kind==='hasMany'&&Ember.isArray(f)&&f.some(a._isEmbedded)){b=b||Ember.merge({},c);i=f.map(function(b){return a._isEmbedded(b)?a._extractEmbedded(e,g.type,b):b;});b[h]=i;}});return this._super(e,d,b||c,f);},_isEmbedded:function(a){return!!a&&typeof a==='object'&&!Ember.isArray(a);},_extractEmbedded:function(d,c,a){var b=a.id;if(Ember.isNone(b)){b=this._deurlify(a.resource_uri);a=Ember.merge(Ember.merge({},a),{id:b});}this.extractRecordRepresentation(d,c,a,true);return b;},_relationshipValue:function(b,a){if(b[a]===undefined&&a.slice(-3)==='_id'){return b[a.slice(0,-3)];}return b[a];},_deurlify:function(a){if(typeof a==="string"&&a.indexOf('/')!==-1){return a.split('/').reverse()[1];}else{return a;}},extractHasMany:function(e,d,c){var a,b=this;a=d[c];if(!!a){a.forEach(function(a,c,d){d[c]=b._deurlify(a);});}return a;},extractBelongsTo:function(d,c,b){var a=this._relationshipValue(c,b);if(!!a){a=this._deurlify(a);}return a;}});var get=Ember.get,set=Ember.set;function rejectionHandler(a){Ember.Logger.error(a,a.message);throw a;}DS.DjangoTastypieAdapter=DS.RESTAdapter.extend({serverDomain:null,namespace:"api/v1",bulkCommit:false,since:'next',paginate:false,pageSize:null,maxURLLength:2000,serializer:DS.DjangoTastypieSerializer,init:function(){var a,b;this._super();b=get(this,'namespace');Em.assert("tastypie namespace parameter is mandatory.",!!b);a=get(this,'serializer');set(a,'adapter',this);set(a,'namespace',b);},createRecord:function(c,a,b){var d,f=this.rootForType(a),e=this;d=b.serialize();return this.ajax(this.buildURL(f),"POST",{data:d}).then(function(d){e.didCreateRecord(c,a,b,d);},function(d){e.didError(c,a,b,d);throw d;}).then(null,rejectionHandler);},updateRecord:function(c,b,a){var d,e,g=this.rootForType(b),f=this;d=get(a,'id');e=a.serialize();return this.ajax(this.buildURL(g,d),"PUT",{data:e}).then(function(d){f.didUpdateRecord(c,b,a,d);},function(d){f.didError(c,b,a,d);throw d;}).then(null,rejectionHandler);},deleteRecord:function(c,a,b){var d,f=this.rootForType(a),e=this;d=get(b,'id');return this.ajax(this.buildURL(f,d),"DELETE").then(function(d){e.didDeleteRecord(c,a,b,d);},function(d){e.didError(c,a,b,d);throw d;}).then(null,rejectionHandler);},save:function(b,c){var d=this,a=Ember.Map.create();if(get(this,'bulkCommit')===false){return this._super(b,c);}['created','updated','deleted'].forEach(function(b){this.groupByType(c[b]).forEach(function(e,f){var c=a.get(e);if(!c){c={created:[],updated:[],deleted:[]};a.set(e,c);}f.forEach(function(a){if(d.shouldSave(a)){c[b].push(a);}});});},this);a.forEach(function(c,a){if(a.created.length||a.updated.length||a.deleted.length){d.patchRecords(b,c,a.created,a.updated,a.deleted);}});},patchRecords:function(c,a,b,e,f){var i=get(this,'serializer'),j=this.rootForType(a),d=this,g={objects:[],deleted_objects:[]};b.forEach(function(a){g.objects.push(a.serialize());});e.forEach(function(b){var c=b.serialize();c.resource_uri=i.getItemUrl({type:a},get(b,'id'));g.objects.push(c);});f.forEach(function(b){g.deleted_objects.push(i.getItemUrl({type:a},get(b,'id')));});function h(i){var g=(i&&i.objects)||[];if(b.length){d.didCreateRecords(c,a,b,g.length?{objects:g.slice(0,b.length)}:null);}if(e.length){d.didUpdateRecords(c,a,e,g.length?{objects:g.slice(b.length)}:null);}if(f.length){d.didDeleteRecords(c,a,f);}}return this.ajax(this.buildURL(j),"PATCH",{data:g}).then(h,function(g){if(g&&g.status===202){b.forEach(function(b){d.didError(c,a,b,g);});b=[];return h(null);}b.concat(e,f).forEach(function(b){d.didError(c,a,b,g);});throw g;}).then(null,rejectionHandler);},find:function(c,a,b){var d=this.isPartial(a,b);if(d){delete this.partialIds(a)[b];}if(this.loadPreloaded(c,a)&&!d&&c.recordIsLoaded(a,b)){return Ember.RSVP.resolve();}return this._super(c,a,b);},findAll:function(b,a,f){var e=this.buildURL(this.rootForType(a)),g=this.fieldsQuery(a,this.sinceQuery(f)),d=this.loadPreloaded(b,a),h=this,c;if(d){c=this.nextFor(a,d);if(c&&this.shouldPaginate(a)){return this.fetchPages(b,a,b.all(a),{},c);}b.didUpdateAll(a);return Ember.RSVP.resolve();}if(this.shouldPaginate(a)){return this.fetchPages(b,a,b.all(a),{});}return this.fetchList(a,e,g).then(function(c){if(c){h.didFindAll(b,a,c);}else{b.didUpdateAll(a);}}).then(null,rejectionHandler);},findQuery:function(b,a,e,c){var d=this.buildURL(this.rootForType(a)),f=this.fieldsQuery(a,e),g=this;if(this.shouldPaginate(a)){return this.fetchPages(b,a,c,e);}return this.fetchList(a,d,f).then(function(e){if(e){g.didFindQuery(b,a,e,c);}else{c.load(g.freshReferences(b,a,d,f));}}).then(null,rejectionHandler);},shouldPaginate:function(b){var a=get(this,'serializer').configOption(b,'paginate');return Ember.isNone(a)?get(this,'paginate'):a;},pageSizeFor:function(b){var a=get(this,'serializer').configOption(b,'pageSize');return Ember.isNone(a)?get(this,'pageSize'):a;},fetchPages:function(i,b,a,d,k){var j=this.pageSizeFor(b),g=this._pageCursors||(this._pageCursors=Ember.Map.create()),h={cancelled:false},c=this;this.cancelPages(a);g.set(a,h);set(a,'isUpdating',true);d=this.fieldsQuery(b,d);if(j){d.limit=j;}function f(){if(g.get(a)===h){g.remove(a);set(a,'isUpdating',false);}}function e(d,j,g){return c.fetchList(b,d,j).then(function(l){var k,m;if(h.cancelled){return;}if(l){c.didFindPage(i,b,l,a,g);k=c.nextFor(b,l);}else{m=c.freshList(d,j);c.didFindFreshPage(i,b,m.ids,a,g);k=m.next;}if(k){return e(c.nextURL(k),null,false);}f();});}var l=k?e(this.nextURL(k),null,false):e(this.buildURL(this.rootForType(b)),d,true);return l.then(null,function(a){f();throw a;}).then(null,rejectionHandler);},cancelPages:function(a){var b=this._pageCursors,c=b&&b.get(a);if(c){c.cancelled=true;b.remove(a);set(a,'isUpdating',false);}},didFindPage:function(d,c,e,a,f){var b=DS.loaderFor(d);if(a instanceof DS.AdapterPopulatedRecordArray){b.populateArray=function(b){if(f){a.load(b);}else{get(a,'content').pushObjects(b);}};}get(this,'serializer').extractMany(b,e,c);},didFindFreshPage:function(d,c,e,b,f){var a;if(b instanceof DS.AdapterPopulatedRecordArray){a=e.map(function(a){return d.referenceForId(c,a);});if(f){b.load(a);}else{get(b,'content').pushObjects(a);}}},nextFor:function(c,b){var d=get(this,'serializer'),a=d.configOption(c,'meta'),e=a&&b[a]?b[a]:b;return e[d.configOption(c,'since')];},nextURL:function(a){if(!!this.serverDomain&&a.charAt(0)==='/'){return this.removeTrailingSlash(this.serverDomain)+a;}return a;},readPreloaded:function(){var a={};Ember.$('script[type="application/json"][data-tastypie-preload]').each(function(){a[this.getAttribute('data-tastypie-preload')]=JSON.parse(this.text);});return a;},loadPreloaded:function(e,b){var d=this._preloaded||(this._preloaded=this.readPreloaded()),c=this.rootForType(b),a=d[c];if(!a){return null;}delete d[c];get(this,'serializer').extractMany(DS.loaderFor(e),a,b);return a;},fieldsQuery:function(c,b){var d=get(this,'serializer'),a=d.configOption(c,'fields'),f=d.configOption(c,'fieldsParam'),e=d._primaryKey(c);b=Ember.merge({},b);if(a&&a.length&&f){a=Ember.A(a.slice());if(!a.contains(e)){a.unshift(e);}b[f]=a.join(',');}return b;},fetchList:function(c,e,d){var h=get(this,'serializer'),i=this._freshLists||(this._freshLists={}),j=this.listKey(e,d),b=i[j],f={},g=this,a;if(!h.configOption(c,'conditional')){return this.ajax(e,"GET",{data:d}).then(function(a){g.didFetchFields(c,d,a);return a;});}if(b&&b.etag){f['If-None-Match']=b.etag;}if(b&&b.lastModified){f['If-Modified-Since']=b.lastModified;}return this.ajax(e,"GET",{data:d,headers:f,beforeSend:function(b,d){var c=Ember.$.ajaxSettings.beforeSend;a=b;return c?c.call(this,b,d):undefined;}}).then(function(b){var f=a&&a.getResponseHeader('ETag'),e=a&&a.getResponseHeader('Last-Modified');if(a&&a.status===304){return null;}if(f||e){i[j]={etag:f,lastModified:e,ids:(b.objects||[]).map(function(a){return h.extractId(c,a);}),next:g.nextFor(c,b)};}g.didFetchFields(c,d,b);return b;});},didFetchFields:function(a,f,e){var b=get(this,'serializer'),d=b.configOption(a,'fieldsParam'),c;if(!e||!f||!d||!f[d]){return;}c=this.partialIds(a);(e.objects||[]).forEach(function(d){c[b.extractId(a,d)]=true;});},partialIds:function(a){var b=this._partialIds||(this._partialIds=Ember.Map.create());if(!b.get(a)){b.set(a,{});}return b.get(a);},isPartial:function(b,c){var a=this._partialIds&&this._partialIds.get(b);return!!(a&&a[c]);},freshList:function(a,b){return(this._freshLists||{})[this.listKey(a,b)];},freshReferences:function(c,b,a,d){return this.freshList(a,d).ids.map(function(a){return c.referenceForId(b,a);});},listKey:function(a,b){return b?a+'?'+Ember.$.param(b):a;},findMany:function(d,b,e){var c=this._pendingFindMany||(this._pendingFindMany=Ember.Map.create()),a=c.get(b);if(!a){a={store:d,ids:[],deferred:Ember.RSVP.defer()};c.set(b,a);}a.ids.push.apply(a.ids,this.serializeIds(e));Ember.run.scheduleOnce('actions',this,this.flushFindMany);return a.deferred.promise.then(null,rejectionHandler);},flushFindMany:function(){var b=this._pendingFindMany,a=this;this._pendingFindMany=null;if(!b){return;}b.forEach(function(b,c){var d=a.fieldsQuery(b),e;e=a.setURLs(b,c.ids,Ember.$.param(d).length).map(function(e){return a.ajax(e,"GET",{data:d}).then(function(e){a.didFetchFields(b,d,e);a.didFindMany(c.store,b,e);});});Ember.RSVP.all(e).then(c.deferred.resolve,c.deferred.reject);});},setURLs:function(g,i,f){var b=this.buildURL(this.rootForType(g))+'set/',h=get(this,'maxURLLength')-(f?f+1:0),c=[],a=[],d=b.length,e={};i.forEach(function(f){var g=String(f).length+1;if(e[f]){return;}e[f]=true;if(a.length&&d+g>h){c.push(b+a.join(';')+'/');a=[];d=b.length;}a.push(f);d+=g;});if(a.length){c.push(b+a.join(';')+'/');}return c;},buildURL:function(c,b){var a=this._super(c,b);if(a.charAt(a.length-1)!=='/'){a+='/';}if(!!this.serverDomain){a=this.removeTrailingSlash(this.serverDomain)+a;}return a;},sinceQuery:function(c){var a,b;b={};if(!!c){a=c.match(/offset=(\d+)/);a=(!!a&&!!a[1])?a[1]:null;b.offset=a;}return a?b:null;},removeTrailingSlash:function(a){if(a.charAt(a.length-1)==='/'){return a.slice(0,-1);}return a;},pluralize:function(a){return a;}});DS.Store.reopen({findById:function(b,c){var a=this._super(b,c),d=this.adapterForType(b);if(d.isPartial&&d.isPartial(b,c)&&get(a,'isLoaded')&&!get(a,'isDirty')){a.reload();}return a;}});
@@ -0,0 +1,40 @@
+describe("Ember.LazyTemplates", function(){
+
+    afterEach(function(){
+        delete Ember.TEMPLATES['test-collected'];
+        Ember.LazyTemplates.requested = {};
+    });
+
+    it('should be configured with the Django URLs', function(){
+        expect(Ember.LazyTemplates.get('templatesUrl')).toBe('/ember/templates/{names}.js');
+        expect(Ember.LazyTemplates.get('groupUrl')).toBe('/ember/groups/{group}.js');
+    });
+
+    it('should load missing templates', function(){
+        Ember.LazyTemplates.load(['test-collected'], false);
+
+        expect(Ember.TEMPLATES['test-collected']).toBeDefined();
+    });
+
+    it('should load a templates group', function(){
+        Ember.LazyTemplates.loadGroup('test-collected', false);
+
+        expect(Ember.TEMPLATES['test-collected']).toBeDefined();
+    });
+
+    it('should not request already loaded templates', function(){
+        Ember.TEMPLATES['test-collected'] = function() {};
+        spyOn(jQuery, 'ajax');
+
+        Ember.LazyTemplates.load(['test-collected'], false);
+
+        expect(jQuery.ajax).not.toHaveBeenCalled();
+    });
+
+    it('should resolve missing templates', function(){
+        var resolver = Ember.LazyTemplates.Resolver.create({namespace: Ember.Namespace.create()});
+
+        expect(resolver.resolve('template:test-collected')).toBeDefined();
+    });
+
+});
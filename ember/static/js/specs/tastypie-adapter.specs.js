@@ -0,0 +1,510 @@
+describe("DS.DjangoTastypieAdapter", function(){
+
+    var Person = DS.Model.extend({
+        name: DS.attr('string')
+    });
+    Person.toString = function() { return 'App.Person'; };
+
+    function createStore(properties) {
+        return DS.Store.create({
+            adapter: DS.DjangoTastypieAdapter.create(properties || {})
+        });
+    }
+
+    function lastRequest() {
+        return jQuery.ajax.mostRecentCall.args[0];
+    }
+
+    beforeEach(function(){
+        spyOn(jQuery, 'ajax');
+    });
+
+    describe('bulk commits', function(){
+
+        it('should send all the dirty records of a type in a single PATCH', function(){
+            var store = createStore({bulkCommit: true}), data;
+
+            Ember.run(function(){
+                store.load(Person, {id: 1, name: 'updated'});
+                store.load(Person, {id: 2, name: 'deleted'});
+            });
+            Ember.run(function(){
+                store.find(Person, 1).set('name', 'Updated');
+                store.find(Person, 2).deleteRecord();
+                store.createRecord(Person, {name: 'created'});
+                store.commit();
+            });
+
+            expect(jQuery.ajax.callCount).toBe(1);
+            expect(lastRequest().type).toBe('PATCH');
+            expect(lastRequest().url).toBe('/api/v1/person/');
+
+            data = JSON.parse(lastRequest().data);
+            expect(data.objects.length).toBe(2);
+            expect(data.objects[0].resource_uri).toBeUndefined();
+            expect(data.objects[1].resource_uri).toBe('/api/v1/person/1/');
+            expect(data.deleted_objects).toEqual(['/api/v1/person/2/']);
+        });
+
+        it('should update the created records ids', function(){
+            var store = createStore({bulkCommit: true}), created;
+
+            Ember.run(function(){
+                created = store.createRecord(Person, {name: 'created'});
+                store.commit();
+            });
+            Ember.run(function(){
+                lastRequest().success({objects: [{id: 3, name: 'created', resource_uri: '/api/v1/person/3/'}]});
+            });
+
+            expect(created.get('id')).toBe('3');
+            expect(created.get('isDirty')).toBe(false);
+        });
+
+        it('should not save the created records without the returned objects', function(){
+            var store = createStore({bulkCommit: true}), created;
+
+            Ember.run(function(){
+                created = store.createRecord(Person, {name: 'created'});
+                store.commit();
+            });
+            Ember.run(function(){
+                lastRequest().error({status: 202, responseText: ''});
+            });
+
+            expect(created.get('id')).toBeNull();
+            expect(created.get('isError')).toBe(true);
+        });
+
+        it('should send a request per record by default', function(){
+            var store = createStore();
+
+            Ember.run(function(){
+                store.createRecord(Person, {name: 'first'});
+                store.createRecord(Person, {name: 'second'});
+                store.commit();
+            });
+
+            expect(jQuery.ajax.callCount).toBe(2);
+            expect(lastRequest().type).toBe('POST');
+        });
+    });
+
+    describe('findMany', function(){
+
+        it('should coalesce the requests of a run loop into the set endpoint', function(){
+            var store = createStore(),
+                adapter = store.get('_adapter');
+
+            Ember.run(function(){
+                adapter.findMany(store, Person, [1, 2]);
+                adapter.findMany(store, Person, [2, 3]);
+            });
+
+            expect(jQuery.ajax.callCount).toBe(1);
+            expect(lastRequest().url).toBe('/api/v1/person/set/1;2;3/');
+        });
+
+        it('should split the requests into URL-length-safe chunks', function(){
+            var store = createStore({maxURLLength: 24}),
+                adapter = store.get('_adapter');
+
+            Ember.run(function(){
+                adapter.findMany(store, Person, [1, 2, 3, 4]);
+            });
+
+            expect(jQuery.ajax.callCount).toBe(2);
+            expect(jQuery.ajax.calls[0].args[0].url).toBe('/api/v1/person/set/1;2/');
+            expect(jQuery.ajax.calls[1].args[0].url).toBe('/api/v1/person/set/3;4/');
+        });
+
+        it('should load the set endpoint objects', function(){
+            var store = createStore(),
+                adapter = store.get('_adapter');
+
+            Ember.run(function(){
+                adapter.findMany(store, Person, [1, 2]);
+            });
+            Ember.run(function(){
+                lastRequest().success({objects: [{id: 1, name: 'first'}, {id: 2, name: 'second'}]});
+            });
+
+            Ember.run(function(){
+                expect(store.recordIsLoaded(Person, 1)).toBe(true);
+                expect(store.find(Person, 2).get('name')).toBe('second');
+            });
+        });
+        it('should resolve once all the coalesced requests completed', function(){
+            var store = createStore({maxURLLength: 24}),
+                adapter = store.get('_adapter'),
+                first, second, resolved = [];
+
+            Ember.run(function(){
+                first = adapter.findMany(store, Person, [1, 2]);
+                second = adapter.findMany(store, Person, [3, 4]);
+                first.then(function(){ resolved.push('first'); });
+                second.then(function(){ resolved.push('second'); });
+            });
+            expect(first).toBeDefined();
+            expect(jQuery.ajax.callCount).toBe(2);
+
+            Ember.run(function(){
+                jQuery.ajax.calls[0].args[0].success({objects: [{id: 1}, {id: 2}]});
+            });
+            expect(resolved).toEqual([]);
+
+            Ember.run(function(){
+                jQuery.ajax.calls[1].args[0].success({objects: [{id: 3}, {id: 4}]});
+            });
+            expect(resolved).toEqual(['first', 'second']);
+        });
+    });
+
+    describe('embedded records', function(){
+
+        var User = DS.Model.extend({
+                name: DS.attr('string')
+            }),
+            Tag = DS.Model.extend({
+                name: DS.attr('string')
+            }),
+            Post = DS.Model.extend({
+                author: DS.belongsTo(User),
+                tags: DS.hasMany(Tag)
+            });
+        User.toString = function() { return 'App.User'; };
+        Tag.toString = function() { return 'App.Tag'; };
+        Post.toString = function() { return 'App.Post'; };
+
+        it('should load the related records embedded by Tastypie', function(){
+            var store = createStore();
+
+            Ember.run(function(){
+                store.find(Post);
+            });
+            Ember.run(function(){
+                lastRequest().success({meta: {}, objects: [{
+                    id: 1,
+                    author: {resource_uri: '/api/v1/user/2/', name: 'Bob'},
+                    tags: [{id: 3, name: 'ember'}, '/api/v1/tag/4/']
+                }]});
+            });
+
+            Ember.run(function(){
+                var post = store.find(Post, 1);
+                expect(post.get('author.name')).toBe('Bob');
+                expect(store.recordIsLoaded(Tag, 3)).toBe(true);
+                expect(post.get('tags').mapProperty('id')).toEqual(['3', '4']);
+            });
+        });
+
+        it('should read the "_id" and the Tastypie relationships keys', function(){
+            var store = createStore();
+
+            Ember.run(function(){
+                store.load(Post, {id: 1, author_id: '/api/v1/user/2/'});
+                store.load(Post, {id: 2, author: '/api/v1/user/3/'});
+            });
+
+            Ember.run(function(){
+                expect(store.find(Post, 1).get('author.id')).toBe('2');
+                expect(store.find(Post, 2).get('author.id')).toBe('3');
+            });
+        });
+    });
+
+    describe('pagination', function(){
+
+        it('should follow the next pages and load them progressively', function(){
+            var store = createStore({paginate: true, pageSize: 2}), people;
+
+            Ember.run(function(){
+                people = store.find(Person);
+            });
+            expect(lastRequest().data).toEqual({limit: 2});
+
+            Ember.run(function(){
+                lastRequest().success({
+                    meta: {next: '/api/v1/person/?limit=2&offset=2'},
+                    objects: [{id: 1, name: 'first'}, {id: 2, name: 'second'}]
+                });
+            });
+            expect(people.get('length')).toBe(2);
+            expect(people.get('isUpdating')).toBe(true);
+            expect(lastRequest().url).toBe('/api/v1/person/?limit=2&offset=2');
+
+            Ember.run(function(){
+                lastRequest().success({meta: {next: null}, objects: [{id: 3, name: 'third'}]});
+            });
+            expect(people.get('length')).toBe(3);
+            expect(people.get('isUpdating')).toBe(false);
+            expect(jQuery.ajax.callCount).toBe(2);
+        });
+
+        it('should append the next pages to the query results', function(){
+            var store = createStore({paginate: true}), people;
+
+            Ember.run(function(){
+                people = store.find(Person, {name: 'x'});
+            });
+            expect(lastRequest().data).toEqual({name: 'x'});
+
+            Ember.run(function(){
+                lastRequest().success({meta: {next: '/api/v1/person/?name=x&offset=1'}, objects: [{id: 1}]});
+            });
+            Ember.run(function(){
+                lastRequest().success({meta: {next: null}, objects: [{id: 2}]});
+            });
+            expect(people.mapProperty('id')).toEqual(['1', '2']);
+        });
+
+        it('should stop following the next pages when cancelled', function(){
+            var store = createStore({paginate: true}), people;
+
+            Ember.run(function(){
+                people = store.find(Person, {name: 'x'});
+            });
+            Ember.run(function(){
+                lastRequest().success({meta: {next: '/api/v1/person/?name=x&offset=1'}, objects: [{id: 1}]});
+            });
+            Ember.run(function(){
+                store.adapterForType(Person).cancelPages(people);
+            });
+            expect(people.get('isUpdating')).toBe(false);
+
+            Ember.run(function(){
+                lastRequest().success({meta: {next: '/api/v1/person/?name=x&offset=2'}, objects: [{id: 2}]});
+            });
+            expect(people.get('length')).toBe(1);
+            expect(jQuery.ajax.callCount).toBe(2);
+        });
+
+        it('should be configurable per type', function(){
+            var Adapter = DS.DjangoTastypieAdapter.extend(),
+                store;
+
+            Adapter.configure(Person, {paginate: true, pageSize: 500});
+            store = DS.Store.create({adapter: Adapter.create()});
+
+            Ember.run(function(){
+                store.find(Person);
+            });
+            expect(lastRequest().data).toEqual({limit: 500});
+        });
+    });
+
+    describe('sparse fieldsets', function(){
+
+        it('should select the configured fields of the lists', function(){
+            var Adapter = DS.DjangoTastypieAdapter.extend(),
+                store;
+
+            Adapter.configure(Person, {fields: ['name']});
+            store = DS.Store.create({adapter: Adapter.create()});
+
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            expect(lastRequest().data).toEqual({name: 'x', fields: 'id,name'});
+        });
+
+        it('should fetch in full the records loaded with selected fields when found', function(){
+            var Adapter = DS.DjangoTastypieAdapter.extend(),
+                store, person;
+
+            Adapter.configure(Person, {fields: ['name']});
+            store = DS.Store.create({adapter: Adapter.create()});
+
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            Ember.run(function(){
+                lastRequest().success({meta: {}, objects: [{id: 1, name: 'x'}]});
+            });
+            Ember.run(function(){
+                person = store.find(Person, 1);
+            });
+            expect(jQuery.ajax.callCount).toBe(2);
+            expect(lastRequest().url).toBe('/api/v1/person/1/');
+            expect(person.get('isReloading')).toBe(true);
+
+            Ember.run(function(){
+                lastRequest().success({id: 1, name: 'x'});
+            });
+            Ember.run(function(){
+                store.find(Person, 1);
+            });
+            expect(jQuery.ajax.callCount).toBe(2);
+            expect(person.get('isReloading')).toBe(false);
+        });
+
+        it('should not select fields by default', function(){
+            var store = createStore();
+
+            Ember.run(function(){
+                store.find(Person);
+            });
+            expect(lastRequest().data.fields).toBeUndefined();
+        });
+    });
+
+    describe('conditional requests', function(){
+
+        function response(status, headers) {
+            return {
+                status: status,
+                getResponseHeader: function(name) {
+                    return (headers || {})[name] || null;
+                }
+            };
+        }
+
+        function respond(json, status, xhr) {
+            var request = lastRequest();
+            request.beforeSend(xhr, request);
+            request.success(json, status, xhr);
+        }
+
+        function createConditionalStore() {
+            var Adapter = DS.DjangoTastypieAdapter.extend();
+
+            Adapter.configure(Person, {conditional: true});
+            return DS.Store.create({adapter: Adapter.create()});
+        }
+
+        it('should send the validators of the previous response', function(){
+            var store = createConditionalStore();
+
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            expect(lastRequest().headers).toEqual({});
+
+            Ember.run(function(){
+                respond({meta: {}, objects: [{id: 1}]}, 'success', response(200, {
+                    'ETag': '"abc"',
+                    'Last-Modified': 'Tue, 15 Nov 1994 12:45:26 GMT'
+                }));
+            });
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            expect(lastRequest().headers).toEqual({
+                'If-None-Match': '"abc"',
+                'If-Modified-Since': 'Tue, 15 Nov 1994 12:45:26 GMT'
+            });
+        });
+
+        it('should keep the store records when not modified', function(){
+            var store = createConditionalStore(), people;
+
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            Ember.run(function(){
+                respond({meta: {}, objects: [{id: 1, name: 'first'}, {id: 2, name: 'second'}]}, 'success',
+                    response(200, {'ETag': '"abc"'}));
+            });
+
+            Ember.run(function(){
+                people = store.find(Person, {name: 'x'});
+            });
+            Ember.run(function(){
+                respond(undefined, 'notmodified', response(304));
+            });
+            expect(people.get('isLoaded')).toBe(true);
+            expect(people.mapProperty('name')).toEqual(['first', 'second']);
+        });
+
+        it('should send the requests through the adapter ajax method', function(){
+            var Adapter = DS.DjangoTastypieAdapter.extend({
+                    ajax: function(url, type, hash) {
+                        hash.headers['X-Custom'] = 'yes';
+                        return this._super(url, type, hash);
+                    }
+                }),
+                store;
+
+            Adapter.configure(Person, {conditional: true});
+            store = DS.Store.create({adapter: Adapter.create()});
+
+            Ember.run(function(){
+                store.find(Person, {name: 'x'});
+            });
+            expect(lastRequest().headers).toEqual({'X-Custom': 'yes'});
+        });
+    });
+
+    describe('preloaded data', function(){
+
+        function createPreloadedStore() {
+            return createStore({
+                readPreloaded: function() {
+                    return {person: {meta: {next: null}, objects: [{id: 1, name: 'first'}, {id: 2, name: 'second'}]}};
+                }
+            });
+        }
+
+        it('should load the preloaded list without request', function(){
+            var store = createPreloadedStore(), people;
+
+            Ember.run(function(){
+                people = store.find(Person);
+            });
+            expect(jQuery.ajax).not.toHaveBeenCalled();
+            expect(people.mapProperty('name')).toEqual(['first', 'second']);
+            expect(people.get('isUpdating')).toBe(false);
+        });
+
+        it('should find the records from the preloaded list', function(){
+            var store = createPreloadedStore(), person;
+
+            Ember.run(function(){
+                person = store.find(Person, 2);
+            });
+            expect(jQuery.ajax).not.toHaveBeenCalled();
+            expect(person.get('name')).toBe('second');
+
+            Ember.run(function(){
+                store.find(Person, 3);
+            });
+            expect(jQuery.ajax).toHaveBeenCalled();
+        });
+
+        it('should fetch the next pages of the preloaded list', function(){
+            var store = createStore({
+                paginate: true,
+                readPreloaded: function() {
+                    return {person: {meta: {next: '/api/v1/person/?limit=1&offset=1'}, objects: [{id: 1, name: 'first'}]}};
+                }
+            }), people;
+
+            Ember.run(function(){
+                people = store.find(Person);
+            });
+            expect(people.get('length')).toBe(1);
+            expect(people.get('isUpdating')).toBe(true);
+            expect(lastRequest().url).toBe('/api/v1/person/?limit=1&offset=1');
+
+            Ember.run(function(){
+                lastRequest().success({meta: {next: null}, objects: [{id: 2, name: 'second'}]});
+            });
+            expect(people.mapProperty('name')).toEqual(['first', 'second']);
+            expect(people.get('isUpdating')).toBe(false);
+            expect(jQuery.ajax.callCount).toBe(1);
+        });
+
+        it('should only use the preloaded list once', function(){
+            var store = createPreloadedStore();
+
+            Ember.run(function(){
+                store.find(Person);
+            });
+            Ember.run(function(){
+                store.find(Person, {name: 'first'});
+            });
+            expect(jQuery.ajax.callCount).toBe(1);
+        });
+    });
+
+});
@@ -0,0 +1,75 @@
+describe("Ember.TemplatesCache", function(){
+
+    var prefix = Ember.TemplatesCache.get('prefix'),
+        manifest = Ember.TemplatesCache.get('manifest');
+
+    beforeEach(function(){
+        // Loading has been started by the {% ember_templates_manifest %} tag
+        Ember.TemplatesCache.loading = null;
+    });
+
+    afterEach(function(){
+        delete Ember.TEMPLATES['test-collected'];
+        localStorage.removeItem(prefix + 'test-collected');
+        Ember.TemplatesCache.set('manifest', manifest);
+    });
+
+    it('should be configured with the templates manifest', function(){
+        expect(Ember.TemplatesCache.get('manifest')['test-collected']).toMatch(/^[0-9a-f]{12}$/);
+        expect(Ember.TemplatesCache.get('sourcesUrl')).toBe('/ember/sources/{names}.json');
+        expect(Ember.TemplatesCache.get('allSourcesUrl')).toBe('/ember/sources.json');
+    });
+
+    it('should register the up to date stored templates without request', function(){
+        var hash = Ember.TemplatesCache.get('manifest')['test-collected'];
+        Ember.TemplatesCache.write('test-collected', {hash: hash, source: '<p>stored</p>', precompiled: Ember.TemplatesCache.get('precompiled')});
+        spyOn(Ember.TemplatesCache, 'urlsFor');
+
+        Ember.TemplatesCache.set('manifest', {'test-collected': hash});
+        Ember.TemplatesCache.load();
+
+        expect(Ember.TEMPLATES['test-collected']).toBeDefined();
+        expect(Ember.TemplatesCache.urlsFor).not.toHaveBeenCalled();
+    });
+
+    it('should fetch and store the changed templates', function(){
+        Ember.TemplatesCache.write('test-collected', {hash: 'outdated', source: '<p>stored</p>', precompiled: false});
+        var done = false;
+
+        runs(function(){
+            Ember.TemplatesCache.load().then(function(){
+                done = true;
+            });
+        });
+
+        waitsFor(function(){
+            return done;
+        }, 'templates to be fetched', 1000);
+
+        runs(function(){
+            expect(Ember.TEMPLATES['test-collected']).toBeDefined();
+            expect(Ember.TemplatesCache.read('test-collected').hash).toBe(Ember.TemplatesCache.get('manifest')['test-collected']);
+        });
+    });
+
+    it('should request only the stale templates', function(){
+        Ember.TemplatesCache.set('manifest', {'test-collected': 'a', 'test-translated': 'b', 'test-dependent': 'c'});
+
+        expect(Ember.TemplatesCache.urlsFor(['test-collected'])).toEqual(['/ember/sources/test-collected.json']);
+        expect(Ember.TemplatesCache.urlsFor(['test-collected', 'test-translated'])).toEqual(['/ember/sources.json']);
+    });
+
+    it('should split the sources URLs', function(){
+        Ember.TemplatesCache.setProperties({
+            manifest: {'test-collected': 'a', 'test-translated': 'b', 'test-dependent': 'c', '_test-partial': 'd'},
+            maxURLLength: 50
+        });
+
+        expect(Ember.TemplatesCache.urlsFor(['test-collected', 'test-translated'])).toEqual([
+            '/ember/sources/test-collected.json',
+            '/ember/sources/test-translated.json'
+        ]);
+        Ember.TemplatesCache.set('maxURLLength', 2000);
+    });
+
+});
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+'''
+Streamed templates rendering.
+
+Pages are rendered as generators so the first bytes can be sent
+before all the ``{% handlebars %}`` blocks are rendered.
+
+Top-level nodes, ``{% extends %}`` and ``{% block %}`` nodes are streamed,
+any other node is rendered as a single chunk.
+'''
+from __future__ import unicode_literals
+
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context, RequestContext
+from django.template.loader import get_template
+from django.template.loader_tags import BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+from django.template.base import TextNode
+from django.utils import six
+from django.utils.encoding import force_text
+
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:     # Django < 1.5
+    StreamingHttpResponse = None
+
+
+def stream_template(template, context):
+    '''
+    Render ``template`` (a template name or instance) with ``context`` as a generator of text chunks.
+    '''
+    if isinstance(template, six.string_types):
+        template = get_template(template)
+    context.render_context.push()
+    try:
+        for chunk in stream_nodelist(template.nodelist, context):
+            yield chunk
+    finally:
+        context.render_context.pop()
+
+
+def stream_nodelist(nodelist, context):
+    '''Render a nodelist as a generator of text chunks'''
+    from ember.templatetags.ember import HandlebarsNode
+
+    for node in nodelist:
+        if isinstance(node, HandlebarsNode):
+            chunks = node.stream(context)
+        elif isinstance(node, ExtendsNode):
+            chunks = _stream_extends(node, context)
+        elif isinstance(node, BlockNode):
+            chunks = _stream_block(node, context)
+        else:
+            chunks = [node.render(context)]
+        for chunk in chunks:
+            yield force_text(chunk)
+
+
+def _stream_extends(node, context):
+    # Same as ExtendsNode.render() but streaming the parent template
+    compiled_parent = node.get_parent(context)
+
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+
+    # The root template block nodes also need to be added to the block context.
+    for parent_node in compiled_parent.nodelist:
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = dict((n.name, n) for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode))
+                block_context.add_blocks(blocks)
+            break
+
+    return stream_nodelist(compiled_parent.nodelist, context)
+
+
+def _stream_block(node, context):
+    # Same as BlockNode.render() but streaming the block nodelist
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+    context.push()
+    try:
+        if block_context is None:
+            context['block'] = node
+            for chunk in stream_nodelist(node.nodelist, context):
+                yield chunk
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            # Create new block so we can store context without thread-safety issues.
+            block = BlockNode(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+            for chunk in stream_nodelist(block.nodelist, context):
+                yield chunk
+            if push is not None:
+                block_context.push(node.name, push)
+    finally:
+        context.pop()
+
+
+def render_to_stream(template_name, dictionary=None, context_instance=None):
+    '''
+    Same as ``django.template.loader.render_to_string`` but returning a generator of text chunks.
+    '''
+    dictionary = dictionary or {}
+    if context_instance is None:
+        context = Context(dictionary)
+    else:
+        context = context_instance
+        context.update(dictionary)
+    return stream_template(template_name, context)
+
+
+def stream(request, template_name, dictionary=None, **kwargs):
+    '''
+    Same as ``django.shortcuts.render`` but returning a ``StreamingHttpResponse``.
+
+    Extra keyword arguments are given to the response (``content_type``, ``status``).
+    '''
+    if StreamingHttpResponse is None:
+        raise ImproperlyConfigured('Streaming responses require Django 1.5 or later')
+    chunks = render_to_stream(template_name, dictionary, RequestContext(request))
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -7,14 +7,36 @@ Inspired by:
  - Miguel Araujo: https://gist.github.com/893408
  - Makina Corpus: https://github.com/makinacorpus/django-templatetag-handlebars
 '''
+from __future__ import absolute_import
 
-from django import template
-from django.conf import settings
+import copy
+import hashlib
+import json
+import re
 
-from djangojs.templatetags.js import VerbatimNode, verbatim_tags, js_lib, jquery_js
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.urlresolvers import reverse
+from django.dispatch import receiver
+from django.templatetags.i18n import TranslateNode, BlockTranslateNode
+from django.test.signals import setting_changed
+from django.utils import six
+from django.utils.html import escape
+from django.utils.translation import get_language
+
+from djangojs.templatetags.js import VerbatimNode, verbatim_tags
+
+from ember import cache, collector, compiler, encoding, instrumentation, libs, minifier, preload, registry
+from ember.conf import settings
+from ember.instrumentation import instrumented
+from ember.utils import LRUCache
 
 register = template.Library()
 
+SCRIPT_TAIL = '''
+        </script>
+        '''
+
 
 class HandlebarsNode(VerbatimNode):
     '''
@@ -29,79 +51,620 @@ class HandlebarsNode(VerbatimNode):
             {{/ranges}}
         {% endhandlebars %}
 
+    When ``precompile`` is enabled (or ``settings.EMBER_PRECOMPILE`` if not specified),
+    the block is precompiled server-side into an ``Ember.TEMPLATES`` entry.
+    Only the blocks rendered once or cached (see below) are precompiled,
+    all together on the first render of one of them.
+    Blocks depending on the context would start the Javascript runtime
+    on each render so they are left for the client to compile.
+
+    When ``minify`` is enabled (or ``settings.EMBER_MINIFY`` if not specified),
+    Handlebars comments and insignificant whitespace are stripped (see :mod:`ember.minifier`).
+
+    Blocks without any Django tag are only rendered once.
+    Blocks whose Django tags only depend on the active language
+    are cached with ``settings.EMBER_CACHE``.
+
+    When ``settings.EMBER_INLINE_TEMPLATES`` is ``False``, nothing is rendered:
+    templates are expected to be served by the ``{% ember_templates_js %}`` bundle.
     '''
-    def __init__(self, template_id, text_and_nodes):
+    def __init__(self, template_id, text_and_nodes, precompile=None, minify=None, block_source=None, batch=None):
+        # Static nodes ({% ember %}, {% linkto %} with a static content) are flattened into text
+        text_and_nodes = [bit if _static_output(bit) is None else _static_output(bit) for bit in text_and_nodes]
         super(HandlebarsNode, self).__init__(text_and_nodes)
         self.template_id = template_id
-
+        self.precompile = precompile
+        self.minify = minify
+        self.block_source = block_source
+        self.static = all(isinstance(bit, six.string_types) for bit in text_and_nodes)
+        self.cacheable = block_source is not None and all(_language_only(bit) for bit in text_and_nodes)
+        # Cached renders are keyed by the source digest, computed once
+        self.source_digest = hashlib.sha1(block_source.encode('utf-8')).hexdigest() if self.cacheable else None
+        self.batch = batch if batch is not None else PrecompileBatch()
+        self.batch.nodes.append(self)
+        self._static_output = {}
+
+    @property
+    def name(self):
+        '''The Ember.js template name (Ember registers unnamed templates as the application template)'''
+        return self.template_id or 'application'
+
+    def references(self):
+        '''The ``(kind, name)`` templates and routes references (see :mod:`ember.registry`)'''
+        parts = []
+        for bit in self.text_and_nodes:
+            if isinstance(bit, six.string_types):
+                parts.append(bit)
+            else:
+                parts.extend(node.prefix for node in bit.get_nodes_by_type(LinkToNode))
+                parts.extend(node.static_output for node in bit.get_nodes_by_type(EmberTagNode))
+        return registry.parse_references(''.join(parts))
+
+    def should_precompile(self):
+        '''Whether the block is precompiled: only blocks rendered once or cached are'''
+        precompile = settings.EMBER_PRECOMPILE if self.precompile is None else self.precompile
+        return precompile and (self.static or self.cacheable)
+
+    def should_minify(self):
+        return settings.EMBER_MINIFY if self.minify is None else self.minify
+
+    @instrumented('handlebars', lambda node: node.name)
     def render(self, context):
-        output = super(HandlebarsNode, self).render(context)
-
-        if self.template_id:
-            head_script = '<script type="text/x-handlebars" data-template-name="%s">' % self.template_id
+        if not settings.EMBER_INLINE_TEMPLATES:
+            return ''
+
+        precompile = self.should_precompile()
+
+        if self.static:
+            key = (precompile, self.should_minify())
+            if key not in self._static_output:
+                self._static_output[key] = self.render_block(context, precompile)
+            return self._static_output[key]
+
+        if self.cacheable:
+            # Precompiled outputs depend on the precompiler version
+            key = cache.make_key('handlebars', self.template_id or '', self.source_digest, get_language() or '',
+                                 compiler.version() if precompile else '', str(self.should_minify()))
+            return cache.get_or_render(key, lambda: self.render_block(context, precompile))
+
+        return self.render_block(context, precompile)
+
+    def stream(self, context):
+        '''
+        Render the block as a generator yielding the script head,
+        each verbatim chunk and the closing tag.
+
+        Static, cached, precompiled and minified blocks are yielded as a single chunk.
+        Both paths are recorded by the instrumentation.
+        '''
+        if self.static or self.cacheable or self.should_precompile() or self.should_minify():
+            output = self.render(context)
+            if output:
+                yield output
+            return
+        for chunk in instrumentation.measure_stream('handlebars', self.name, self.stream_chunks(context)):
+            yield chunk
+
+    def stream_chunks(self, context):
+        if not settings.EMBER_INLINE_TEMPLATES:
+            return
+
+        yield self.script_head()
+        for bit in self.text_and_nodes:
+            yield bit if isinstance(bit, six.string_types) else bit.render(context)
+        yield SCRIPT_TAIL
+
+    def render_block(self, context, precompile):
+        return self.wrap(self.render_source(context), precompile)
+
+    def render_source(self, context):
+        '''Render the Handlebars template source, without the script wrapper'''
+        if self.static:
+            source = ''.join(self.text_and_nodes)
         else:
-            head_script = '<script type="text/x-handlebars">'
+            source = super(HandlebarsNode, self).render(context)
+        if self.should_minify():
+            source = minifier.minify(source, self.name)
+        return source
+
+    def wrap(self, output, precompile):
+        if precompile:
+            self.batch.precompile()
+            return self.wrap_precompiled(output)
+        if self.should_minify():
+            return '%s%s</script>' % (self.script_tag(), output)
+        return ''.join((self.script_head(), output, SCRIPT_TAIL))
+
+    def script_tag(self):
+        if self.template_id:
+            return '<script type="text/x-handlebars" data-template-name="%s">' % self.template_id
+        return '<script type="text/x-handlebars">'
 
+    def script_head(self):
         return '''
         %s
-        %s
+        ''' % self.script_tag()
+
+    def wrap_precompiled(self, output):
+        template_id = json.dumps(self.name)
+        if self.should_minify():
+            return '<script type="text/javascript">Ember.TEMPLATES[%s] = Ember.Handlebars.template(%s);</script>' % (
+                template_id, compiler.precompile(output)
+            )
+        return '''
+        <script type="text/javascript">
+        Ember.TEMPLATES[%s] = Ember.Handlebars.template(%s);
         </script>
-        ''' % (head_script, output)
+        ''' % (template_id, compiler.precompile(output))
+
+
+class PrecompileBatch(object):
+    '''
+    The ``{% handlebars %}`` blocks of a template, precompiled in a single batch
+    (one Javascript runtime call) on the first precompiled render of one of them
+    for each language and blocks precompile and minify options.
+    '''
+    def __init__(self):
+        self.nodes = []
+        self.done = set()
+
+    def precompile(self):
+        # Each block sources depend on its own minify option
+        flags = [(node.should_precompile(), node.should_minify()) for node in self.nodes]
+        key = (get_language(), tuple(flags))
+        if key in self.done:
+            return
+        self.done.add(key)
+        # Their sources only depend on the active language
+        context = template.Context()
+        compiler.precompile_many([node.render_source(context)
+                                  for node, (precompile, minify) in zip(self.nodes, flags) if precompile])
+
+
+def _language_only(bit):
+    '''Whether a verbatim bit output only depends on the active language'''
+    if isinstance(bit, six.string_types):
+        return True
+    elif isinstance(bit, (template.TextNode, EmberTagNode)):
+        return True
+    elif isinstance(bit, TranslateNode):
+        return (bit.filter_expression.var.literal is not None and not bit.filter_expression.filters
+                and not bit.asvar and not bit.message_context)
+    elif isinstance(bit, BlockTranslateNode):
+        return (not bit.extra_context and not bit.countervar and not bit.message_context
+                and all(token.token_type == template.TOKEN_TEXT for token in bit.singular))
+    elif isinstance(bit, LinkToNode):
+        return all(_language_only(node) for node in bit.nodelist)
+    return False
+
+
+_TOKEN_FORMATS = {
+    template.TOKEN_TEXT: '%s',
+    template.TOKEN_VAR: '{{%s}}',
+    template.TOKEN_BLOCK: '{%%%s%%}',
+    template.TOKEN_COMMENT: '{#%s#}',
+}
+
+
+def _scan_block(parser, tagname, endtagname):
+    '''
+    Rebuild the source of the ``tagname`` block ending with ``endtagname`` from the pending tokens.
+
+    Nested ``tagname`` blocks are skipped with their own end tag.
+
+    :returns: the block source, the names of the tags it uses
+              and its number of tokens (``None`` if the end tag is missing).
+    '''
+    source = []
+    tags = set()
+    depth = 0
+    for length, token in enumerate(parser.tokens):
+        if token.token_type == template.TOKEN_BLOCK:
+            name = token.contents.split()[0] if token.contents else ''
+            if token.contents == endtagname:
+                if not depth:
+                    return ''.join(source), tags, length
+                depth -= 1
+            elif name == tagname:
+                depth += 1
+            tags.add(name)
+        source.append(_TOKEN_FORMATS[token.token_type] % token.contents)
+    return ''.join(source), tags, None
+
+
+def _copyable(node):
+    '''Whether a node and its children can be copied by :func:`_copy_node`'''
+    return all(attr in node.__dict__ and all(_copyable(child) for child in node.__dict__[attr] or ())
+               for attr in node.child_nodelists if hasattr(node, attr))
+
+
+def _copy_node(node):
+    '''
+    A new instance of a parsed node, sharing its compiled arguments
+    but not its identity: nodes keep their render state (``{% cycle %}``...) per instance.
+    '''
+    clone = copy.copy(node)
+    for attr in node.child_nodelists:
+        nodelist = node.__dict__.get(attr)
+        if nodelist is not None:
+            copied = template.NodeList(_copy_node(child) for child in nodelist)
+            copied.contains_nontext = getattr(nodelist, 'contains_nontext', False)
+            setattr(clone, attr, copied)
+    return clone
+
+
+#: Tags with parse side effects (loaded libraries, defined blocks, registered templates...):
+#: blocks using them are always parsed so these changes happen.
+PARSER_STATE_TAGS = ('load', 'block', 'extends', 'handlebars')
+
+# Parsed blocks bits prototypes indexed by source hash and tags, see _parse_verbatim()
+_parsed = LRUCache(settings.EMBER_PARSE_CACHE_SIZE)
+
+
+@receiver(setting_changed)
+def _resize_parsed(setting, **kwargs):
+    if setting == 'EMBER_PARSE_CACHE_SIZE':
+        _parsed.clear()
+        _parsed.maxsize = settings.EMBER_PARSE_CACHE_SIZE
+
+
+def _parse_verbatim(parser, token, endtagname):
+    '''
+    Same as ``verbatim_tags()`` but memoizing the parsed bits
+    so identical blocks are only parsed once per process.
+
+    Bits are indexed by the block source hash, the parser class
+    and the compile functions of the tags used by the block (which depend on the loaded libraries).
+    The memoized bits are a prototype: each block gets its own copy of the nodes.
+    Blocks using a tag with parse side effects (see ``PARSER_STATE_TAGS``)
+    or nodes which can not be copied are not memoized.
+
+    :returns: the block source and its bits.
+    '''
+    block_source, tags, length = _scan_block(parser, token.contents.split()[0], endtagname)
+    if length is None or tags.intersection(PARSER_STATE_TAGS):
+        return block_source, verbatim_tags(parser, token, endtagname=endtagname)
+
+    key = (hashlib.sha1(block_source.encode('utf-8')).hexdigest(), type(parser),
+           tuple(sorted((name, parser.tags.get(name)) for name in tags)))
+    prototype = _parsed.get(key)
+    if prototype is None:
+        text_and_nodes = verbatim_tags(parser, token, endtagname=endtagname)
+        if all(isinstance(bit, six.string_types) or _copyable(bit) for bit in text_and_nodes):
+            _parsed.set(key, [bit if isinstance(bit, six.string_types) else _copy_node(bit)
+                              for bit in text_and_nodes])
+        return block_source, text_and_nodes
+
+    # Consume the block and its end tag tokens
+    del parser.tokens[:length + 1]
+    return block_source, [bit if isinstance(bit, six.string_types) else _copy_node(bit) for bit in prototype]
+
+
+def _boolean(value):
+    '''Parse a boolean tag option'''
+    if isinstance(value, six.string_types):
+        return value.strip('"\'').lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+#: Options accepted by the libraries tags
+SCRIPT_OPTIONS = ('defer', 'async', 'preload')
+
+#: Options accepted by the tags of the scripts depending on the libraries
+#: (``async`` gives no execution order)
+DEPENDENT_OPTIONS = ('defer', 'preload')
+
+RE_OPTION = re.compile(r'^(\w+)=(.+)$')
+
+# Boolean literals, parsed with the template as Django < 1.5 has none
+BOOLEAN_LITERALS = ('true', 'false', '1', '0', 'yes', 'no')
+
+
+class OptionsNode(template.Node):
+    '''Render a tag function with its arguments and options resolved'''
+    def __init__(self, func, args, options):
+        self.func = func
+        self.args = args
+        self.options = options
+
+    def render(self, context):
+        resolve = lambda value: value.resolve(context) if hasattr(value, 'resolve') else value
+        return self.func(*[resolve(arg) for arg in self.args],
+                         **dict((name, resolve(value)) for name, value in self.options.items()))
+
+
+def options_tag(*names):
+    '''
+    Register a tag accepting positional arguments and the ``names`` keyword options.
+
+    Unknown options raise ``TemplateSyntaxError`` when the template is parsed.
+    '''
+    def decorator(func):
+        def compile_tag(parser, token):
+            bits = token.split_contents()
+            args, options = [], {}
+            for bit in bits[1:]:
+                match = RE_OPTION.match(bit)
+                if not match:
+                    if options:
+                        raise template.TemplateSyntaxError('%s tag arguments must precede its options' % bits[0])
+                    args.append(parser.compile_filter(bit))
+                    continue
+                name, value = match.groups()
+                if name not in names:
+                    raise template.TemplateSyntaxError('Unknown %s tag option: %s' % (bits[0], name))
+                if value.strip('"\'').lower() in BOOLEAN_LITERALS:
+                    options[name] = _boolean(value)
+                else:
+                    options[name] = parser.compile_filter(value)
+            return OptionsNode(func, args, options)
+
+        compile_tag.__doc__ = func.__doc__
+        register.tag(func.__name__, compile_tag)
+        return func
+    return decorator
 
 
 @register.tag
 def handlebars(parser, token):
-    text_and_nodes = verbatim_tags(parser, token, endtagname='endhandlebars')
-    # Extract template id from token
+    block_source, text_and_nodes = _parse_verbatim(parser, token, 'endhandlebars')
+    # Extract template id and options from token
     tokens = token.split_contents()
+    stripquote = lambda s: s[1:-1] if s[:1] == '"' else s
+
+    template_id = None
+    options = {}
+    for bit in tokens[1:]:
+        if '=' in bit:
+            name, value = bit.split('=', 1)
+            if name not in ('precompile', 'minify'):
+                raise template.TemplateSyntaxError('%s tag got an unknown option: %s' % (tokens[0], name))
+            options[name] = _boolean(value)
+        elif template_id is None:
+            template_id = stripquote(bit)
+        else:
+            raise template.TemplateSyntaxError('%s tag accepts at most one template id' % tokens[0])
+
+    # The blocks of a template are precompiled together
+    if not hasattr(parser, 'ember_precompile_batch'):
+        parser.ember_precompile_batch = PrecompileBatch()
+    node = HandlebarsNode(template_id, text_and_nodes, block_source=block_source,
+                          batch=parser.ember_precompile_batch, **options)
+    registry.register(node.name, node.references())
+    return node
+
+
+@options_tag(*DEPENDENT_OPTIONS)
+def ember_templates_js(**options):
+    '''
+    Include the templates bundle built by the ``ember_collect_templates`` command
+    for the active language.
+
+    Render nothing if templates have not been collected.
+    '''
+    name = collector.bundle_name()
+    return _dependent_tags(name, options) if name else ''
+
+
+@options_tag(*DEPENDENT_OPTIONS)
+def ember_lazy_templates_js(**options):
+    '''
+    Include the lazy templates loader configured with the ``ember.urls`` URLs.
 
-    if len(tokens) > 1:
-        stripquote = lambda s: s[1:-1] if s[:1] == '"' else s
+    Templates missing from ``Ember.TEMPLATES`` are then fetched on demand.
+    '''
+    urls = {
+        'templatesUrl': reverse('ember_templates', kwargs={'names': 'NAMES'}).replace('NAMES', '{names}'),
+        'groupUrl': reverse('ember_templates_group', kwargs={'group': 'GROUP'}).replace('GROUP', '{group}'),
+    }
+    return _dependent_tags('js/ember-lazy-templates.js', options,
+                           'Ember.LazyTemplates.setProperties(%s);' % json.dumps(urls, sort_keys=True))
+
+
+@options_tag(*DEPENDENT_OPTIONS)
+def ember_templates_manifest(**options):
+    '''
+    Include the templates cache loader with the manifest of the templates content hashes
+    written by the ``ember_collect_templates`` command for the active language.
+
+    Templates whose hash did not change are loaded from the browser ``localStorage``,
+    the others are fetched from the ``ember.urls`` sources URLs then stored.
+
+    Render nothing if templates have not been collected.
+    '''
+    hashes = collector.template_hashes()
+    if hashes is None:
+        return ''
+    config = {
+        'manifest': hashes,
+        'precompiled': settings.EMBER_PRECOMPILE,
+        'sourcesUrl': reverse('ember_templates_sources', kwargs={'names': 'NAMES'}).replace('NAMES', '{names}'),
+        'allSourcesUrl': reverse('ember_templates_sources_all'),
+    }
+    script = 'Ember.TemplatesCache.setProperties(%s);Ember.TemplatesCache.load();' % (
+        encoding.escape(json.dumps(config, sort_keys=True))
+    )
+    return _dependent_tags('js/ember-templates-cache.js', options, script)
+
+
+# Libraries tags output indexed by settings state and arguments
+_rendered = {}
+
+
+@receiver(setting_changed)
+def _clear_rendered(**kwargs):
+    _rendered.clear()
+
+
+def _memoized(render, *key):
+    '''
+    Memoize a libraries tag output per process.
 
-        try:
-            tag_name, template_id = map(stripquote, tokens[:2])
-        except ValueError:
-            raise template.TemplateSyntaxError('%s tag requires exactly one argument' % token.split_contents()[0])
-        return HandlebarsNode(template_id, text_and_nodes)
+    Static URLs resolution only depends on ``settings.DEBUG``, ``settings.STATIC_URL``
+    and ``settings.EMBER_BUNDLE_LIBS`` so they are part of the key with the tag arguments.
+    '''
+    key = (settings.DEBUG, settings.STATIC_URL, settings.EMBER_BUNDLE_LIBS) + key
+    if key not in _rendered:
+        _rendered[key] = render()
+    return _rendered[key]
+
+
+def _options_key(options):
+    return tuple(sorted((name, _boolean(value)) for name, value in options.items()))
+
+
+def _preload_tag(path):
+    return '<link rel="preload" href="%s" as="script">' % staticfiles_storage.url(path)
+
+
+def _script_tags(paths, options, standalone=False):
+    '''
+    Render the script tags loading ``paths`` in order.
+
+    ``async`` would break the execution order so it is only honored for
+    a ``standalone`` script (ie. a bundle) and downgraded to ``defer`` otherwise.
+    '''
+    defer, is_async, preload = [_boolean(options.get(name, False)) for name in SCRIPT_OPTIONS]
+
+    if is_async and standalone:
+        attributes = ' async'
+    elif is_async or defer:
+        attributes = ' defer'
     else:
-        return HandlebarsNode(None, text_and_nodes)
+        attributes = ''
+
+    tags = [_preload_tag(path) for path in paths] if preload else []
+    tags.extend('<script type="text/javascript" src="%s"%s></script>' % (staticfiles_storage.url(path), attributes)
+                for path in paths)
+    return '\n'.join(tags)
 
 
-@register.simple_tag
-def handlebars_js():
-    return js_lib('handlebars.js' if settings.DEBUG else 'handlebars.min.js')
+def _dependent_tags(path, options, script=None):
+    '''
+    Render the script tag of ``path``, which depends on the libraries,
+    followed by the inline ``script`` if any.
 
+    With ``defer``, ``path`` is executed after the deferred libraries and ``script``,
+    as inline scripts can not be deferred, waits for ``DOMContentLoaded``
+    which is fired once all the deferred scripts have been executed.
+    ``async`` gives no execution order so the tags reject it (see ``DEPENDENT_OPTIONS``).
+    '''
+    tags = _script_tags([path], options)
+    if script:
+        if _boolean(options.get('defer', False)):
+            script = "document.addEventListener('DOMContentLoaded', function() {%s});" % script
+        tags += '\n<script type="text/javascript">%s</script>' % script
+    return tags
 
-@register.simple_tag
-def ember_js():
-    return js_lib('ember.js' if settings.DEBUG else 'ember.min.js')
 
+def _stack_paths(stack, jquery):
+    '''
+    The static paths of a libraries stack: the bundle
+    if ``settings.EMBER_BUNDLE_LIBS`` is enabled and bundles are built,
+    the separate libraries otherwise.
 
-@register.simple_tag
-def ember_data_js():
-    return js_lib('ember-data.js' if settings.DEBUG else 'ember-data.min.js')
+    :returns: a ``(paths, standalone)`` tuple.
+    '''
+    if stack not in libs.STACKS:
+        raise template.TemplateSyntaxError('Unknown libraries stack: %s' % stack)
+    minified = not settings.DEBUG
+    if settings.EMBER_BUNDLE_LIBS:
+        name = libs.bundle_name(stack, jquery, minified)
+        if name:
+            return [name], True
+    return libs.lib_paths(stack, jquery, minified), False
 
 
-@register.simple_tag
-def tastypie_adapter_js():
-    return js_lib('tastypie_adapter.js' if settings.DEBUG else 'tastypie_adapter.min.js')
+def _lib_tag(lib, options):
+    return instrumentation.measure('libs', lib, _memoized,
+                                   lambda: _script_tags([libs.lib_path(lib, not settings.DEBUG)], options),
+                                   lib, _options_key(options))
 
 
-@register.simple_tag
-def ember_full_js(jquery=True):
-    libs = (handlebars_js(), ember_js())
-    if jquery:
-        libs = (jquery_js(),) + libs
-    return '\n'.join(libs)
+def _stack_tag(stack, jquery, options):
+    jquery = _boolean(jquery)
 
+    def render():
+        paths, standalone = _stack_paths(stack, jquery)
+        return _script_tags(paths, options, standalone)
 
-@register.simple_tag
-def emberpie_js(jquery=True):
-    return '\n'.join((
-            ember_full_js(jquery),
-            ember_data_js(),
-            tastypie_adapter_js()
-        ))
+    return instrumentation.measure('libs', stack, _memoized, render, stack, jquery, _options_key(options))
+
+
+@options_tag(*SCRIPT_OPTIONS)
+def handlebars_js(**options):
+    return _lib_tag('handlebars', options)
+
+
+@options_tag(*SCRIPT_OPTIONS)
+def ember_js(**options):
+    return _lib_tag('ember', options)
+
+
+@options_tag(*SCRIPT_OPTIONS)
+def ember_data_js(**options):
+    return _lib_tag('ember-data', options)
+
+
+@options_tag(*SCRIPT_OPTIONS)
+def tastypie_adapter_js(**options):
+    return _lib_tag('tastypie_adapter', options)
+
+
+@options_tag('jquery', *SCRIPT_OPTIONS)
+def ember_full_js(jquery=True, **options):
+    return _stack_tag('ember_full', jquery, options)
+
+
+@options_tag('jquery', *SCRIPT_OPTIONS)
+def emberpie_js(jquery=True, **options):
+    return _stack_tag('emberpie', jquery, options)
+
+
+@options_tag('stack', 'jquery', 'templates')
+def ember_preload(stack='emberpie', jquery=True, templates=True):
+    '''
+    Render ``<link rel="preload">`` hints for a libraries stack
+    and, if ``templates`` is true, the collected templates bundle.
+    '''
+    jquery, templates = _boolean(jquery), _boolean(templates)
+
+    bundle = collector.bundle_name() if templates else None
+
+    def render():
+        paths, standalone = _stack_paths(stack, jquery)
+        if bundle:
+            paths.append(bundle)
+        return '\n'.join(_preload_tag(path) for path in paths)
+
+    # The templates bundle hashed name depends on the active language and changes with the manifest
+    return _memoized(render, 'preload', stack, jquery, bundle)
+
+
+@register.simple_tag(takes_context=True)
+def ember_preload_data(context, resource, objects=None):
+    '''
+    Inline a Tastypie resource list for ``DS.DjangoTastypieAdapter``
+    to load it into the store without request.
+
+    :param resource: a Tastypie resource instance, class or class dotted path.
+    :param objects: the objects to preload (default to the first page of the resource objects list).
+        The rows of a ``values()`` queryset are encoded by chunks, without dehydration
+        (only the fields exposed by the resource are kept).
+
+    Render nothing if the request is not authorized to read the list.
+    '''
+    resource = preload.get_resource(resource)
+
+    def render():
+        chunks = preload.serialize(resource, objects, context.get('request'))
+        if chunks is None:
+            return ''
+        return '<script type="application/json" data-tastypie-preload="%s">%s</script>' % (
+            escape(resource._meta.resource_name), ''.join(encoding.escape(chunk) for chunk in chunks)
+        )
+
+    return instrumentation.measure('ember_preload_data', resource._meta.resource_name, render)
 
 
 @register.inclusion_tag('ember/django_ember_js_tag.html')
@@ -132,14 +695,26 @@ class LinkToNode(template.Node):
     
     If you need a Handlebars.js tag or variable use ``{% ember varname %}``, this will
     be rendered as ``{{ varname }}``.
+
+    The wrapping Handlebars tags are computed once at parse time
+    and the whole output too if the content is static.
     '''
     def __init__(self, nodelist, *args):
         self.args = args
         self.nodelist = nodelist
+        self.prefix = "{{#linkTo " + " ".join(args) + '}}'
+        self.suffix = "{{/linkTo}}"
+        content = [_static_output(node) for node in nodelist]
+        if all(bit is not None for bit in content):
+            self.static_output = self.prefix + ''.join(content) + self.suffix
+        else:
+            self.static_output = None
 
+    @instrumented('linkto', lambda node: node.args[0])
     def render(self, context):
-        output = self.nodelist.render(context)
-        return "{{#linkTo " + " ".join(self.args) + '}}' + output + "{{/linkTo}}"
+        if self.static_output is not None:
+            return self.static_output
+        return self.prefix + self.nodelist.render(context) + self.suffix
 
 
 @register.tag(name='ember')
@@ -174,6 +749,17 @@ class EmberTagNode(template.Node):
     '''
     def __init__(self, args):
         self.args = args
+        self.static_output = "{{" + args + "}}"
 
+    @instrumented('ember')
     def render(self, context):
-        return "{{" + self.args + "}}"
+        return self.static_output
+
+
+def _static_output(node):
+    '''The output of a node not depending on the context or ``None``'''
+    if isinstance(node, six.string_types):
+        return node
+    elif isinstance(node, template.TextNode):
+        return node.s
+    return getattr(node, 'static_output', None)
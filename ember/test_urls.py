@@ -10,4 +10,5 @@ class JasmineTestView(JasmineView):
 urlpatterns = patterns('',
     url(r'^$', JasmineTestView.as_view(), name='django_ember_tests'),
     url(r'^js/', include('djangojs.urls')),
+    url(r'^ember/', include('ember.urls')),
 )
@@ -1,16 +1,90 @@
+import datetime
+import decimal
+import gzip
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+
+from io import BytesIO
+
+from distutils.spawn import find_executable
+
 from django.conf import settings
-from django.template import Context, Template
+from django.conf.urls import patterns, include, url
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.sites.models import Site
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.template import Context, Template, TemplateSyntaxError
 from django.test import TestCase
+from django.test.client import RequestFactory
 from django.test.utils import override_settings
+from django.utils import six, timezone, translation
+from django.utils.functional import empty
+from django.utils.unittest import skipUnless
 
 from djangojs.runners import JsTestCase, JasmineSuite
 
+try:
+    from tastypie import fields
+    from tastypie.api import Api
+    from tastypie.authorization import ReadOnlyAuthorization
+    from tastypie.exceptions import Unauthorized
+    from tastypie.resources import ModelResource
+except ImportError:
+    ModelResource = None
+
+from ember import budget, cache, collector, compiler, compression, encoding, instrumentation, libs, minifier, preload, registry, streaming
+from ember.utils import LRUCache
+from ember.management.commands import ember_check_budget, ember_collect_templates
+from ember.middleware import PayloadBudgetMiddleware
+from ember.signals import tag_rendered
+from ember.views import serve
+from ember.templatetags import ember as ember_tags
+from ember.templatetags.ember import HandlebarsNode, LinkToNode
+
+
+#: The ``{% handlebars %}`` blocks collected by the tests, not shipped with the application templates
+TEST_TEMPLATE_DIRS = (os.path.join(os.path.dirname(__file__), 'test_templates'),)
+
+
+class StaticRootMixin(object):
+    '''Collect static files into a temporary STATIC_ROOT'''
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.override = override_settings(STATIC_ROOT=self.static_root)
+        self.override.enable()
+        staticfiles_storage._wrapped = empty
+        collector._manifests.clear()
+        libs._manifests.clear()
 
-class JsTests(JasmineSuite, JsTestCase):
+    def tearDown(self):
+        self.override.disable()
+        staticfiles_storage._wrapped = empty
+        collector._manifests.clear()
+        libs._manifests.clear()
+        shutil.rmtree(self.static_root)
+
+
+@override_settings(TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+class JsTests(StaticRootMixin, JasmineSuite, JsTestCase):
     urls = 'ember.test_urls'
     url_name = 'django_ember_tests'
     title = 'Django Ember Jasmine Test Suite'
 
+    def setUp(self):
+        super(JsTests, self).setUp()
+        call_command('ember_collect_templates', verbosity=0)
+
 
 class TemplateTagsTest(TestCase):
     def test_rendering(self):
@@ -270,3 +344,1735 @@ class TemplateTagsTest(TestCase):
         self.assertIn('<script type="text/javascript" src="%sjs/libs/ember.js">' % settings.STATIC_URL, rendered)
         self.assertIn('<script type="text/javascript" src="%sjs/libs/ember-data.js">' % settings.STATIC_URL, rendered)
         self.assertIn('<script type="text/javascript" src="%sjs/libs/tastypie_adapter.js">' % settings.STATIC_URL, rendered)
+
+
+@skipUnless(find_executable('node'), 'A Javascript runtime is required')
+class PrecompileTest(TestCase):
+    def test_precompile(self):
+        '''Should precompile the block into an Ember.TEMPLATES entry'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" precompile=true %}
+                <p>{{name}}</p>
+            {% endhandlebars %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('Ember.TEMPLATES["test-template"] = Ember.Handlebars.template(function', rendered)
+        self.assertIn('"name"', rendered)
+        self.assertNotIn('text/x-handlebars', rendered)
+        self.assertNotIn('{{name}}', rendered)
+
+    def test_precompile_without_template_id(self):
+        '''Should precompile unnamed block as the application template'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars precompile=true %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('Ember.TEMPLATES["application"] = Ember.Handlebars.template(function', rendered)
+
+    @override_settings(EMBER_PRECOMPILE=True)
+    def test_precompile_setting(self):
+        '''Should precompile all blocks when settings.EMBER_PRECOMPILE=True'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{{name}}</p>{% endhandlebars %}
+            {% handlebars "raw-template" precompile=false %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('Ember.TEMPLATES["test-template"]', rendered)
+        self.assertIn('<script type="text/x-handlebars" data-template-name="raw-template">', rendered)
+
+    def test_precompile_with_tags(self):
+        '''Should precompile the rendered block'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" precompile=true %}
+                <p>{% trans "with translation" %} {{name}}</p>
+            {% endhandlebars %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('with translation', rendered)
+        self.assertNotIn('{% trans', rendered)
+
+    def test_precompile_batch(self):
+        '''Should precompile all the blocks of a template in a single batch'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "first" precompile=true %}<p>{{first}}</p>{% endhandlebars %}
+            {% handlebars "second" precompile=true %}<p>{% trans "Yes" %} {{second}}</p>{% endhandlebars %}
+            ''')
+        compiler._precompiled.clear()
+        calls = []
+        precompile_many = compiler.precompile_many
+
+        def counting(sources):
+            calls.append(len(sources))
+            return precompile_many(sources)
+
+        compiler.precompile_many = counting
+        try:
+            rendered = t.render(Context())
+        finally:
+            compiler.precompile_many = precompile_many
+
+        self.assertEqual(calls[0], 2)
+        self.assertEqual(rendered.count('Ember.Handlebars.template(function'), 2)
+
+    @override_settings(EMBER_MINIFY=False)
+    def test_precompile_batch_minify(self):
+        '''Should batch each block source with its own minify option'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "first" precompile=true minify=true %}
+                <p>{{first}}</p>
+            {% endhandlebars %}
+            {% handlebars "second" precompile=true %}<p>{{second}}</p>{% endhandlebars %}
+            ''')
+        compiler._precompiled.clear()
+        calls = []
+        popen = compiler.Popen
+
+        def counting(*args, **kwargs):
+            calls.append(args)
+            return popen(*args, **kwargs)
+
+        compiler.Popen = counting
+        try:
+            rendered = t.render(Context())
+        finally:
+            compiler.Popen = popen
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(rendered.count('Ember.Handlebars.template(function'), 2)
+
+    def test_context_dependent_not_precompiled(self):
+        '''Should leave the blocks depending on the context for the client to compile'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" precompile=true %}<p>{% firstof value %}</p>{% endhandlebars %}
+            ''')
+        rendered = t.render(Context({'value': 'dynamic'}))
+
+        self.assertIn('<script type="text/x-handlebars" data-template-name="test-template">', rendered)
+        self.assertIn('dynamic', rendered)
+
+    @override_settings(EMBER_PRECOMPILE_CACHE_SIZE=1)
+    def test_precompile_cache_size(self):
+        '''Should only keep the last precompiled templates in memory'''
+        compiler.precompile_many(['<p>{{first}}</p>', '<p>{{second}}</p>'])
+
+        self.assertEqual(len(compiler._precompiled), 1)
+
+    def test_precompile_cache(self):
+        '''Should precompile a given source only once'''
+        source = '<p>{{cached}}</p>'
+        compiled = compiler.precompile(source)
+        self.assertIn(compiler.source_hash(source), compiler._precompiled)
+
+        with self.settings(EMBER_JS_RUNTIME='missing-runtime'):
+            self.assertEqual(compiler.precompile(source), compiled)
+
+    def test_precompile_error(self):
+        '''Should raise PrecompilationError on invalid template'''
+        with self.assertRaises(compiler.PrecompilationError):
+            compiler.precompile('{{#if unclosed}}')
+
+    def test_unknown_option(self):
+        '''Should raise TemplateSyntaxError on unknown option'''
+        with self.assertRaises(TemplateSyntaxError):
+            Template('''
+                {% load ember %}
+                {% handlebars "test-template" unknown=true %}{% endhandlebars %}
+                ''')
+
+
+@override_settings(EMBER_CACHE='default')
+class CacheTest(TestCase):
+    def setUp(self):
+        cache.get_backend().clear()
+        cache.reset_stats()
+
+    def test_static_block(self):
+        '''Should render static blocks only once'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        self.assertTrue(node.static)
+
+        first = t.render(Context())
+        node.text_and_nodes = []
+        self.assertEqual(t.render(Context()), first)
+        self.assertIn('<p>{{name}}</p>', first)
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0})
+
+    def test_language_only_block(self):
+        '''Should cache blocks depending only on the active language'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}
+                <p>{% trans "with translation" %} {{name}}</p>
+                {% blocktrans %}block translation{% endblocktrans %}
+                {% linkto "about" %}{% trans "About" %}{% endlinkto %}
+            {% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        self.assertFalse(node.static)
+        self.assertTrue(node.cacheable)
+
+        first = t.render(Context())
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 1})
+        self.assertEqual(t.render(Context()), first)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+        self.assertIn('with translation', first)
+
+    def test_source_digest(self):
+        '''Should key the cached blocks by the source digest computed at parse time'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}{% trans "with translation" %}{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        self.assertEqual(len(node.source_digest), 40)
+
+        first = t.render(Context())
+        node.block_source = None
+        self.assertEqual(t.render(Context()), first)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_cache_per_language(self):
+        '''Should cache blocks per active language'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}{% trans "with translation" %}{% endhandlebars %}
+            ''')
+        with translation.override('en'):
+            t.render(Context())
+        with translation.override('fr'):
+            t.render(Context())
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 2})
+
+    def test_context_dependent_block(self):
+        '''Should not cache blocks depending on the context'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}{% trans message %}{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        self.assertFalse(node.cacheable)
+
+        self.assertIn('first', t.render(Context({'message': 'first'})))
+        self.assertIn('second', t.render(Context({'message': 'second'})))
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0})
+
+    @override_settings(EMBER_CACHE=None)
+    def test_cache_disabled(self):
+        '''Should render every time without cache'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}{% trans "with translation" %}{% endhandlebars %}
+            ''')
+        t.render(Context())
+        t.render(Context())
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0})
+
+    @skipUnless(find_executable('node'), 'A Javascript runtime is required')
+    def test_precompiled_cache(self):
+        '''Should store precompiled templates in cache'''
+        source = '<p>{{shared}}</p>'
+        compiled = compiler.precompile(source)
+        compiler._precompiled.clear()
+
+        with self.settings(EMBER_JS_RUNTIME='missing-runtime'):
+            self.assertEqual(compiler.precompile(source), compiled)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_precompiled_version(self):
+        '''Should not use the templates precompiled by another precompiler version'''
+        source = '<p>{{versioned}}</p>'
+        cache.get_backend().set(cache.make_key('precompiled', compiler.version(), compiler.source_hash(source)),
+                                'function() {}')
+        compiler._precompiled.clear()
+        self.assertEqual(compiler.precompile(source), 'function() {}')
+
+        version = compiler._version[:]
+        compiler._version[:] = ['upgraded']
+        compiler._precompiled.clear()
+        try:
+            with self.settings(EMBER_JS_RUNTIME='missing-runtime'):
+                self.assertRaises(compiler.PrecompilationError, compiler.precompile, source)
+        finally:
+            compiler._version[:] = version
+
+
+@override_settings(TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+class CollectTemplatesTest(StaticRootMixin, TestCase):
+
+    def test_collect_templates(self):
+        '''Should find handlebars blocks in all templates directories'''
+        templates = dict(collector.collect_templates(['en'])['en'])
+
+        self.assertEqual(sorted(templates), ['_test-partial', 'test-collected', 'test-dependent', 'test-translated'])
+
+        self.assertIn('test-collected', templates)
+        self.assertIn('<p>{{name}}</p>', templates['test-collected'])
+        self.assertIn('<p>Yes</p>', templates['test-translated'])
+
+    def test_no_application_templates(self):
+        '''Should not ship any handlebars block with the application templates'''
+        with self.settings(TEMPLATE_DIRS=()):
+            self.assertEqual(collector.collect_templates(['en']), {'en': []})
+
+    def test_collect_templates_per_language(self):
+        '''Should render handlebars blocks once per language'''
+        collected = collector.collect_templates(['en', 'fr'])
+
+        self.assertIn('<p>Yes</p>', dict(collected['en'])['test-translated'])
+        self.assertIn('<p>Oui</p>', dict(collected['fr'])['test-translated'])
+
+    def test_context_dependent(self):
+        '''Should not collect the blocks depending on the request context and report them'''
+        templates_dir = tempfile.mkdtemp()
+        with open(os.path.join(templates_dir, 'user.html'), 'w') as template_file:
+            template_file.write('''{% load ember %}
+                {% handlebars "user" %}<p>{% firstof user.name %}</p>{% endhandlebars %}
+                {% handlebars "about" %}<p>{{about}}</p>{% endhandlebars %}''')
+        stderr = six.StringIO()
+
+        try:
+            with self.settings(TEMPLATE_DIRS=(templates_dir,)):
+                skipped = []
+                self.assertEqual([name for name, source in collector.collect_templates(['en'], skipped)['en']],
+                                 ['about'])
+                call_command('ember_collect_templates', languages=['en'], verbosity=0, stderr=stderr)
+        finally:
+            shutil.rmtree(templates_dir)
+
+        self.assertEqual(skipped, [('user.html', 'user')])
+        self.assertEqual(stderr.getvalue(),
+                         'Template "user" from user.html depends on the request context and is not collected\n')
+
+    def test_build_bundle(self):
+        '''Should register templates into Ember.TEMPLATES'''
+        bundle = collector.build_bundle([('test-template', '<p>{{name}}</p>')])
+
+        self.assertEqual(bundle, 'Ember.TEMPLATES["test-template"] = Ember.Handlebars.compile("<p>{{name}}</p>");\n')
+
+    @override_settings(LANGUAGES=(('en', 'English'), ('fr', 'French')))
+    def test_command(self):
+        '''Should write a hashed bundle per language and their manifest'''
+        call_command('ember_collect_templates', verbosity=0)
+
+        for language, translated in (('en', b'Yes'), ('fr', b'Oui')):
+            name = collector.bundle_name(language)
+            self.assertRegexpMatches(name, r'^js/templates\.%s\.[0-9a-f]{12}\.js$' % language)
+            self.assertTrue(staticfiles_storage.exists(name))
+            with staticfiles_storage.open(name) as bundle:
+                content = bundle.read()
+                self.assertIn(b'Ember.TEMPLATES["test-collected"]', content)
+                self.assertIn(translated, content)
+
+    def test_command_language(self):
+        '''Should keep the other languages bundles when building a single language'''
+        call_command('ember_collect_templates', languages=['en', 'fr'], verbosity=0)
+        english = collector.bundle_name('en')
+
+        call_command('ember_collect_templates', languages=['fr'], verbosity=0)
+
+        self.assertEqual(collector.bundle_name('en'), english)
+        self.assertRegexpMatches(collector.bundle_name('fr'), r'^js/templates\.fr\.[0-9a-f]{12}\.js$')
+
+    @override_settings(LANGUAGE_CODE='en')
+    def test_bundle_name_fallback(self):
+        '''Should fallback on generic language then on default language bundles'''
+        call_command('ember_collect_templates', languages=['en', 'fr'], verbosity=0)
+
+        self.assertEqual(collector.bundle_name('fr-ca'), collector.bundle_name('fr'))
+        self.assertEqual(collector.bundle_name('de'), collector.bundle_name('en'))
+
+    @override_settings(LANGUAGES=(('en', 'English'), ('fr', 'French')))
+    def test_ember_templates_js(self):
+        '''Should include the collected templates bundle for the active language'''
+        call_command('ember_collect_templates', verbosity=0)
+        t = Template('''
+            {% load ember %}
+            {% ember_templates_js %}
+            ''')
+        for language in ('en', 'fr'):
+            with translation.override(language):
+                rendered = t.render(Context())
+            bundle = collector.bundle_name(language)
+            self.assertIn('<script type="text/javascript" src="%s%s">' % (settings.STATIC_URL, bundle), rendered)
+
+    def test_ember_templates_js_not_collected(self):
+        '''Should render nothing if templates have not been collected'''
+        t = Template('''
+            {% load ember %}
+            {% ember_templates_js %}
+            ''')
+
+        self.assertEqual(t.render(Context()).strip(), '')
+
+    @override_settings(EMBER_INLINE_TEMPLATES=False)
+    def test_no_inline_templates(self):
+        '''Should not render handlebars blocks when EMBER_INLINE_TEMPLATES=False'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+
+        self.assertEqual(t.render(Context()).strip(), '')
+
+
+@override_settings(EMBER_BUNDLE_LIBS=True)
+class LibsBundleTest(StaticRootMixin, TestCase):
+    def test_collectstatic(self):
+        '''Should build the libraries bundles on collectstatic'''
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        for stack, jquery, minified, pattern in (
+                ('ember_full', True, False, r'^js/libs/ember_full\.[0-9a-f]{12}\.js$'),
+                ('ember_full', True, True, r'^js/libs/ember_full\.min\.[0-9a-f]{12}\.js$'),
+                ('emberpie', False, False, r'^js/libs/emberpie-nojquery\.[0-9a-f]{12}\.js$'),
+                ('emberpie', False, True, r'^js/libs/emberpie-nojquery\.min\.[0-9a-f]{12}\.js$')):
+            name = libs.bundle_name(stack, jquery, minified)
+            self.assertRegexpMatches(name, pattern)
+            self.assertTrue(staticfiles_storage.exists(name))
+
+    @override_settings(EMBER_BUNDLE_LIBS=False)
+    def test_collectstatic_disabled(self):
+        '''Should not build the libraries bundles if EMBER_BUNDLE_LIBS=False'''
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        self.assertFalse(staticfiles_storage.exists(libs.MANIFEST))
+
+    def test_build_bundle(self):
+        '''Should concatenate the stack libraries in loading order'''
+        bundle = libs.build_bundle('emberpie', True, False)
+
+        positions = [bundle.index(marker) for marker in (
+            'jQuery JavaScript Library', 'Copyright (C) 2011 by Yehuda Katz',
+            'DS.DjangoTastypieSerializer = DS.JSONSerializer.extend',
+            'DS.DjangoTastypieAdapter = DS.RESTAdapter.extend')]
+        self.assertEqual(positions, sorted(positions))
+
+    @override_settings(DEBUG=False)
+    def test_emberpie_js_bundle(self):
+        '''Should include a single bundle script'''
+        libs.save_bundles()
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(rendered.count('<script'), 1)
+        self.assertIn('<script type="text/javascript" src="%s%s">' % (settings.STATIC_URL, libs.bundle_name('emberpie', True, True)), rendered)
+
+    @override_settings(DEBUG=True)
+    def test_ember_full_js_bundle_without_jquery(self):
+        '''Should include a single bundle script without jQuery'''
+        libs.save_bundles()
+        t = Template('''
+            {% load ember %}
+            {% ember_full_js jquery=false %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(rendered.count('<script'), 1)
+        self.assertIn('<script type="text/javascript" src="%s%s">' % (settings.STATIC_URL, libs.bundle_name('ember_full', False, False)), rendered)
+
+    def test_fallback_without_bundles(self):
+        '''Should include the libraries separately if bundles are not built'''
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(rendered.count('<script'), 5)
+
+    def test_serve_fingerprinted(self):
+        '''Should serve fingerprinted files with far-future cache headers'''
+        name = libs.save_bundles()['ember_full.min']
+        response = serve(RequestFactory().get('/static/' + name), name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000')
+        self.assertIn('Expires', response)
+
+    @override_settings(DEBUG=True)
+    def test_serve_not_fingerprinted(self):
+        '''Should serve other files without far-future cache headers'''
+        response = serve(RequestFactory().get('/static/js/libs/ember.js'), 'js/libs/ember.js')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Cache-Control', response)
+
+
+class PrecompressTest(StaticRootMixin, TestCase):
+    def test_compress_file(self):
+        '''Should write a gzip variant beside the file'''
+        name = libs.save_bundles()['ember_full.min']
+        compressed = compression.compress_file(staticfiles_storage, name)
+
+        self.assertIn(name + '.gz', compressed)
+        with staticfiles_storage.open(name) as original:
+            with staticfiles_storage.open(name + '.gz') as variant:
+                self.assertEqual(gzip.GzipFile(fileobj=BytesIO(variant.read())).read(), original.read())
+
+    def test_gzip_reproducible(self):
+        '''Should write the same gzip file for the same content'''
+        content = b'Ember.TEMPLATES = {};' * 100
+        compressed = compression.gzip_compress(content)
+
+        self.assertEqual(compression.gzip_compress(content), compressed)
+        self.assertEqual(compressed[4:8], b'\x00\x00\x00\x00')
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(compressed)).read(), content)
+
+    @override_settings(EMBER_PRECOMPRESS=True, EMBER_BUNDLE_LIBS=True)
+    def test_collectstatic(self):
+        '''Should precompress libraries and their bundles on collectstatic'''
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        self.assertTrue(staticfiles_storage.exists('js/libs/ember.min.js.gz'))
+        self.assertTrue(staticfiles_storage.exists(libs.bundle_name('emberpie', True, True) + '.gz'))
+        self.assertFalse(staticfiles_storage.exists('js/libs/bundles.json.gz'))
+
+    @override_settings(EMBER_PRECOMPRESS=True)
+    def test_collect_templates(self):
+        '''Should precompress templates bundles'''
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+
+        self.assertTrue(staticfiles_storage.exists(collector.bundle_name('en') + '.gz'))
+
+    def test_accepted_encodings(self):
+        '''Should parse the Accept-Encoding header'''
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, br , deflate;q=0.5, identity; q=0.0')
+
+        self.assertEqual(compression.accepted_encodings(request), set(['br', 'deflate']))
+
+    def test_serve_precompressed(self):
+        '''Should serve the gzip variant to clients accepting it'''
+        name = libs.save_bundles()['ember_full.min']
+        compression.compress_file(staticfiles_storage, name)
+        response = serve(RequestFactory().get('/static/' + name, HTTP_ACCEPT_ENCODING='gzip, deflate'), name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], mimetypes.guess_type(name)[0])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        with staticfiles_storage.open(name + '.gz') as variant:
+            self.assertEqual(b''.join(response), variant.read())
+
+    def test_serve_uncompressed(self):
+        '''Should serve the original file to clients not accepting compression'''
+        name = libs.save_bundles()['ember_full.min']
+        compression.compress_file(staticfiles_storage, name)
+        response = serve(RequestFactory().get('/static/' + name, HTTP_ACCEPT_ENCODING='gzip;q=0'), name)
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
+        with staticfiles_storage.open(name) as original:
+            self.assertEqual(b''.join(response), original.read())
+
+
+@override_settings(DEBUG=True)
+class ScriptOptionsTest(StaticRootMixin, TestCase):
+    def test_defer(self):
+        '''Should add the defer attribute'''
+        t = Template('''
+            {% load ember %}
+            {% ember_js defer=True %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%sjs/libs/ember.js" defer></script>' % settings.STATIC_URL, rendered)
+
+    def test_defer_string(self):
+        '''Should accept boolean strings'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars_js defer="true" %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%sjs/libs/handlebars.js" defer></script>' % settings.STATIC_URL, rendered)
+
+    def test_async_downgraded(self):
+        '''Should downgrade async to defer to keep the libraries execution order'''
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js async=True %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(rendered.count(' defer></script>'), 5)
+        self.assertNotIn('async', rendered)
+
+    @override_settings(EMBER_BUNDLE_LIBS=True)
+    def test_async_bundle(self):
+        '''Should honor async for a standalone bundle'''
+        libs.save_bundles()
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js async=True %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%s%s" async></script>' % (
+            settings.STATIC_URL, libs.bundle_name('emberpie', True, False)), rendered)
+
+    def test_preload(self):
+        '''Should add preload hints before the scripts'''
+        t = Template('''
+            {% load ember %}
+            {% ember_full_js jquery=false preload=True %}
+            ''')
+        rendered = t.render(Context())
+
+        preload = '<link rel="preload" href="%sjs/libs/ember.js" as="script">' % settings.STATIC_URL
+        script = '<script type="text/javascript" src="%sjs/libs/handlebars.js">' % settings.STATIC_URL
+        self.assertIn(preload, rendered)
+        self.assertLess(rendered.index(preload), rendered.index(script))
+
+    def test_unknown_option(self):
+        '''Should raise TemplateSyntaxError on unknown option when parsing the template'''
+        with self.assertRaises(TemplateSyntaxError):
+            Template('''
+                {% load ember %}
+                {% ember_js unknown=True %}
+                ''')
+
+    def test_option_variable(self):
+        '''Should resolve the options variables'''
+        t = Template('''
+            {% load ember %}
+            {% ember_js defer=deferred %}
+            ''')
+
+        self.assertIn(' defer></script>', t.render(Context({'deferred': True})))
+        self.assertNotIn(' defer></script>', t.render(Context({'deferred': False})))
+
+    def test_ember_preload(self):
+        '''Should render preload hints for the stack libraries in order'''
+        t = Template('''
+            {% load ember %}
+            {% ember_preload %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(rendered.count('<link rel="preload"'), 5)
+        self.assertNotIn('<script', rendered)
+        self.assertLess(rendered.index('js/libs/jquery'), rendered.index('js/libs/tastypie_adapter.js'))
+
+    @override_settings(EMBER_BUNDLE_LIBS=True)
+    def test_ember_preload_bundles(self):
+        '''Should render preload hints for the libraries and templates bundles'''
+        libs.save_bundles()
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+        t = Template('''
+            {% load ember %}
+            {% ember_preload "ember_full" jquery=false %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<link rel="preload" href="%s%s" as="script">' % (
+            settings.STATIC_URL, libs.bundle_name('ember_full', False, False)), rendered)
+        self.assertIn('<link rel="preload" href="%s%s" as="script">' % (
+            settings.STATIC_URL, collector.bundle_name('en')), rendered)
+
+    def test_ember_preload_rebuilt(self):
+        '''Should preload the templates bundle of the current manifest'''
+        collector.save_bundles({'en': 'Ember.TEMPLATES = {};'})
+        t = Template('''
+            {% load ember %}
+            {% ember_preload %}
+            ''')
+        with translation.override('en'):
+            first = t.render(Context())
+            collector.save_bundles({'en': 'Ember.TEMPLATES = {"rebuilt": null};'})
+            rendered = t.render(Context())
+
+        self.assertNotEqual(rendered, first)
+        self.assertIn('href="%s%s"' % (settings.STATIC_URL, collector.bundle_name('en')), rendered)
+
+    @override_settings(TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+    def test_templates_defer(self):
+        '''Should defer the templates bundle after the deferred libraries'''
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js defer=True %}
+            {% ember_templates_js defer=True %}
+            ''')
+        rendered = t.render(Context())
+
+        bundle = '<script type="text/javascript" src="%s%s" defer></script>' % (
+            settings.STATIC_URL, collector.bundle_name('en'))
+        self.assertIn(bundle, rendered)
+        self.assertLess(rendered.index('js/libs/tastypie_adapter.js'), rendered.index(bundle))
+
+    def test_loader_defer(self):
+        '''Should run the loader configuration once the deferred scripts are executed'''
+        t = Template('''
+            {% load ember %}
+            {% ember_lazy_templates_js defer=True %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%sjs/ember-lazy-templates.js" defer></script>' % (
+            settings.STATIC_URL), rendered)
+        self.assertIn("document.addEventListener('DOMContentLoaded', function() {Ember.LazyTemplates.setProperties(",
+                      rendered)
+
+    def test_dependent_async(self):
+        '''Should reject async for scripts depending on the libraries'''
+        with self.assertRaises(TemplateSyntaxError):
+            Template('''
+                {% load ember %}
+                {% ember_lazy_templates_js async=True %}
+                ''')
+
+
+class LibsTagsMemoizationTest(TestCase):
+    def setUp(self):
+        ember_tags._rendered.clear()
+
+    def test_memoized(self):
+        '''Should only resolve libraries static URLs once'''
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js %}
+            ''')
+        first = t.render(Context())
+        self.assertEqual(len(ember_tags._rendered), 1)
+
+        key = list(ember_tags._rendered.keys())[0]
+        ember_tags._rendered[key] = 'memoized'
+        self.assertIn('memoized', t.render(Context()))
+
+    def test_memoized_per_arguments(self):
+        '''Should memoize per tag arguments'''
+        t = Template('''
+            {% load ember %}
+            {% emberpie_js %}
+            {% emberpie_js jquery=false %}
+            {% emberpie_js defer=True %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertEqual(len(ember_tags._rendered), 3)
+        self.assertEqual(rendered.count('<script'), 14)
+
+    def test_settings_changed(self):
+        '''Should be invalidated when settings change'''
+        t = Template('''
+            {% load ember %}
+            {% ember_js %}
+            ''')
+        t.render(Context())
+        with self.settings(STATIC_URL='/assets/'):
+            staticfiles_storage._wrapped = empty
+            self.assertIn('<script type="text/javascript" src="/assets/js/libs/ember', t.render(Context()))
+        staticfiles_storage._wrapped = empty
+        self.assertIn('<script type="text/javascript" src="%sjs/libs/ember' % settings.STATIC_URL, t.render(Context()))
+
+
+class FlatteningTest(TestCase):
+    def test_static_linkto(self):
+        '''Should precompute static linkto output at parse time'''
+        t = Template('''
+            {% load ember %}
+            {% linkto "post" post.id %}<b>{% ember post.title %}</b>{% endlinkto %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(LinkToNode)[0]
+
+        self.assertEqual(node.static_output, '{{#linkTo "post" post.id}}<b>{{post.title}}</b>{{/linkTo}}')
+        self.assertIn(node.static_output, t.render(Context()))
+
+    def test_dynamic_linkto(self):
+        '''Should render linkto content depending on the context'''
+        t = Template('''
+            {% load ember %}
+            {% linkto "about" %}{{ label }}{% endlinkto %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(LinkToNode)[0]
+
+        self.assertIsNone(node.static_output)
+        self.assertIn('{{#linkTo "about"}}About{{/linkTo}}', t.render(Context({'label': 'About'})))
+
+    def test_flattened_handlebars(self):
+        '''Should flatten static nodes inside handlebars blocks'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}
+                {% ember #if isAuthenticated %}
+                    {% linkto "profile" %}{% ember user.name %}{% endlinkto %}
+                {% ember /if %}
+            {% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+
+        self.assertTrue(node.static)
+        rendered = t.render(Context())
+        self.assertIn('{{#if isAuthenticated}}', rendered)
+        self.assertIn('{{#linkTo "profile"}}{{user.name}}{{/linkTo}}', rendered)
+
+
+class StreamingTest(TestCase):
+    BASE = Template('''
+        {% load ember %}
+        <html><body>{% block content %}{% endblock %}</body></html>
+        ''')
+
+    PAGE = '''
+        {% extends base %}
+        {% load ember %}
+        {% block content %}
+        {% handlebars "static" %}<p>{{name}}</p>{% endhandlebars %}
+        {% handlebars "dynamic" %}<p>{% firstof value %}</p>{% endhandlebars %}
+        {% endblock %}
+        '''
+
+    def test_stream_node(self):
+        '''Should stream the head, the verbatim chunks and the tail of a dynamic block'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{% firstof value %}</p>{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        context = Context({'value': 'streamed'})
+
+        chunks = list(node.stream(context))
+
+        self.assertGreater(len(chunks), 2)
+        self.assertIn('<script type="text/x-handlebars" data-template-name="test-template">', chunks[0])
+        self.assertIn('</script>', chunks[-1])
+        self.assertEqual(''.join(chunks), node.render(context))
+
+    def test_stream_static_node(self):
+        '''Should stream static blocks as a single chunk'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+
+        self.assertEqual(list(node.stream(Context())), [node.render(Context())])
+
+    @override_settings(EMBER_INLINE_TEMPLATES=False)
+    def test_stream_not_inlined(self):
+        '''Should not stream anything if templates are not inlined'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" %}<p>{% firstof value %}</p>{% endhandlebars %}
+            ''')
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+
+        self.assertEqual(list(node.stream(Context())), [])
+
+    def test_render_to_stream(self):
+        '''Should stream the same output as the regular rendering, including inherited templates'''
+        page = Template(self.PAGE)
+
+        streamed = streaming.render_to_stream(page, {'base': self.BASE, 'value': 'streamed'})
+
+        self.assertEqual(''.join(streamed), page.render(Context({'base': self.BASE, 'value': 'streamed'})))
+
+    @skipUnless(streaming.StreamingHttpResponse, 'Django 1.5+ is required')
+    def test_stream_response(self):
+        '''Should return a streaming response'''
+        request = RequestFactory().get('/')
+
+        response = streaming.stream(request, Template(self.PAGE), {'base': self.BASE, 'value': 'streamed'})
+
+        self.assertTrue(response.streaming)
+        content = ''.join(chunk.decode('utf-8') for chunk in response.streaming_content)
+        self.assertIn('<html><body>', content)
+        self.assertIn('<p>streamed</p>', content)
+        self.assertIn('data-template-name="static"', content)
+
+
+class MinifierTest(TestCase):
+    def setUp(self):
+        minifier.reset_saved_bytes()
+
+    def test_collapse_whitespace(self):
+        '''Should collapse whitespace runs'''
+        source = '''
+            <ul>
+                {{#each item in items}}
+                    <li>{{item.name}}</li>
+                {{/each}}
+            </ul>
+            '''
+        self.assertEqual(minifier.minify(source), '<ul> {{#each item in items}} <li>{{item.name}}</li> {{/each}} </ul>')
+
+    def test_strip_comments(self):
+        '''Should strip Handlebars comments'''
+        source = '<p>{{! A comment }}{{name}}{{!-- A {{block}} comment --}}</p>'
+        self.assertEqual(minifier.minify(source), '<p>{{name}}</p>')
+
+    def test_protected_content(self):
+        '''Should not change mustaches, pre and textarea content'''
+        source = '''<div>
+            {{{raw   content}}}
+            {{t "two  spaces"}}
+            <pre>
+                indented  {{code}}
+            </pre>
+            <TEXTAREA>  value  </TEXTAREA>
+        </div>'''
+        self.assertEqual(minifier.minify(source), '''<div> {{{raw   content}}} {{t "two  spaces"}} <pre>
+                indented  {{code}}
+            </pre> <TEXTAREA>  value  </TEXTAREA> </div>''')
+
+    def test_attributes_values(self):
+        '''Should not change quoted attributes values'''
+        source = '''<div title="a   b"  class='x  {{if active "is  active"}}'>
+            <input value="  value  ">
+        </div>'''
+        self.assertEqual(minifier.minify(source),
+                         '''<div title="a   b" class='x  {{if active "is  active"}}'> <input value="  value  "> </div>''')
+
+    def test_saved_bytes(self):
+        '''Should report the saved bytes per template'''
+        minifier.minify('<p>  {{! comment }}  </p>', 'test-template')
+        self.assertEqual(minifier.saved_bytes(), {'test-template': 17})
+
+    def test_minify_option(self):
+        '''Should minify the block and its wrapper'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "test-template" minify=true %}
+                {{! comment }}
+                <p>{{name}}</p>
+            {% endhandlebars %}
+            ''')
+        rendered = t.render(Context())
+
+        self.assertIn('<script type="text/x-handlebars" data-template-name="test-template"><p>{{name}}</p></script>', rendered)
+        self.assertIn('test-template', minifier.saved_bytes())
+
+    @override_settings(EMBER_MINIFY=True)
+    def test_minify_setting(self):
+        '''Should minify blocks with settings.EMBER_MINIFY'''
+        t = Template('''
+            {% load i18n ember %}
+            {% handlebars "test-template" %}
+                <p>{% firstof value %}</p>
+            {% endhandlebars %}
+            {% handlebars "not-minified" minify=false %}
+                <p>{{name}}</p>
+            {% endhandlebars %}
+            ''')
+        rendered = t.render(Context({'value': 'minified'}))
+
+        self.assertIn('<script type="text/x-handlebars" data-template-name="test-template"><p>minified</p></script>', rendered)
+        self.assertNotIn('<p>{{name}}</p></script>', rendered)
+
+
+@override_settings(TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+class LazyTemplatesTest(StaticRootMixin, TestCase):
+    def setUp(self):
+        super(LazyTemplatesTest, self).setUp()
+        call_command('ember_collect_templates', languages=['en', 'fr'], verbosity=0)
+
+    def test_templates(self):
+        '''Should serve the requested templates as Javascript'''
+        response = self.client.get('/ember/templates/test-collected,test-translated,unknown.js')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertIn('Ember.TEMPLATES["test-collected"] = Ember.Handlebars.compile(', response.content.decode('utf-8'))
+        self.assertIn('Ember.TEMPLATES["test-translated"]', response.content.decode('utf-8'))
+        self.assertNotIn('unknown', response.content.decode('utf-8'))
+        self.assertTrue(response.has_header('ETag'))
+        self.assertIn('must-revalidate', response['Cache-Control'])
+
+    def test_group(self):
+        '''Should serve a route group templates'''
+        response = self.client.get('/ember/groups/test-collected.js')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Ember.TEMPLATES["test-collected"]', response.content.decode('utf-8'))
+        self.assertNotIn('test-translated', response.content.decode('utf-8'))
+
+    def test_dependencies(self):
+        '''Should serve the templates dependencies too'''
+        response = self.client.get('/ember/templates/test-dependent.js')
+
+        self.assertIn('Ember.TEMPLATES["test-dependent"]', response.content.decode('utf-8'))
+        self.assertIn('Ember.TEMPLATES["_test-partial"]', response.content.decode('utf-8'))
+
+    def test_not_found(self):
+        '''Should return a 404 if no template is found'''
+        self.assertEqual(self.client.get('/ember/templates/unknown.js').status_code, 404)
+        self.assertEqual(self.client.get('/ember/groups/unknown.js').status_code, 404)
+
+    def test_not_modified(self):
+        '''Should return a 304 if the ETag matches'''
+        etag = self.client.get('/ember/templates/test-collected.js')['ETag']
+
+        response = self.client.get('/ember/templates/test-collected.js', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    @skipUnless(find_executable('node'), 'A Javascript runtime is required')
+    def test_precompiled(self):
+        '''Should serve the templates precompiled by the command'''
+        call_command('ember_collect_templates', languages=['en'], precompile=True, verbosity=0)
+
+        response = self.client.get('/ember/templates/test-collected.js')
+
+        self.assertIn('Ember.TEMPLATES["test-collected"] = Ember.Handlebars.template(function', response.content.decode('utf-8'))
+
+    @skipUnless(find_executable('node'), 'A Javascript runtime is required')
+    @override_settings(EMBER_PRECOMPILE_CACHE_SIZE=1)
+    def test_precompiled_once(self):
+        '''Should precompile the collected templates in a single runtime call'''
+        compiler._precompiled.clear()
+        calls = []
+        popen = compiler.Popen
+
+        def counting(*args, **kwargs):
+            calls.append(args)
+            return popen(*args, **kwargs)
+
+        compiler.Popen = counting
+        try:
+            call_command('ember_collect_templates', languages=['en', 'fr'], precompile=True, verbosity=0)
+        finally:
+            compiler.Popen = popen
+
+        self.assertEqual(len(calls), 1)
+
+    def test_not_collected(self):
+        '''Should return a 404 if templates have not been collected'''
+        staticfiles_storage.delete(collector.manifest_name())
+        collector._manifests.clear()
+
+        self.assertEqual(self.client.get('/ember/templates/test-collected.js').status_code, 404)
+        self.assertEqual(self.client.get('/ember/sources.json').status_code, 404)
+
+    def test_not_parsed(self):
+        '''Should serve the dependencies without parsing the templates'''
+        registry.clear()
+
+        response = self.client.get('/ember/templates/test-dependent.js')
+
+        self.assertIn('Ember.TEMPLATES["_test-partial"]', response.content.decode('utf-8'))
+
+    def test_translated(self):
+        '''Should serve the templates for the active language'''
+        with translation.override('fr'):
+            response = self.client.get('/ember/templates/test-translated.js')
+
+        self.assertIn('Oui', response.content.decode('utf-8'))
+
+    def test_lazy_templates_tag(self):
+        '''Should include the lazy templates loader with its URLs'''
+        rendered = Template('''
+            {% load ember %}
+            {% ember_lazy_templates_js %}
+            ''').render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%sjs/ember-lazy-templates.js">' % settings.STATIC_URL, rendered)
+        self.assertIn('"templatesUrl": "/ember/templates/{names}.js"', rendered)
+        self.assertIn('"groupUrl": "/ember/groups/{group}.js"', rendered)
+
+
+@override_settings(TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+class TemplatesManifestTest(StaticRootMixin, TestCase):
+    def collect(self):
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+
+    def test_template_hashes(self):
+        '''Should write the collected templates hashes into the manifest'''
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+        hashes = collector.template_hashes('en')
+
+        self.assertEqual(set(hashes), set(['_test-partial', 'test-collected', 'test-dependent', 'test-translated']))
+        self.assertRegexpMatches(hashes['test-collected'], r'^[0-9a-f]{12}$')
+
+    def test_template_hashes_per_language(self):
+        '''Should only change the hashes of the templates whose source differs'''
+        call_command('ember_collect_templates', languages=['en', 'fr'], verbosity=0)
+        en, fr = collector.template_hashes('en'), collector.template_hashes('fr')
+
+        self.assertEqual(en['test-collected'], fr['test-collected'])
+        self.assertNotEqual(en['test-translated'], fr['test-translated'])
+
+    def test_template_hashes_not_collected(self):
+        '''Should not have any hash if templates have not been collected'''
+        self.assertIsNone(collector.template_hashes('en'))
+
+    def test_sources(self):
+        '''Should serve the requested templates sources and hashes as JSON'''
+        self.collect()
+        response = self.client.get('/ember/sources/test-collected,unknown.json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertFalse(data['precompiled'])
+        self.assertEqual(list(data['templates']), ['test-collected'])
+        self.assertIn('<p>{{name}}</p>', data['templates']['test-collected']['source'])
+        self.assertEqual(data['templates']['test-collected']['hash'], collector.template_hashes('en')['test-collected'])
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_all_sources(self):
+        '''Should serve all the templates sources'''
+        self.collect()
+        data = json.loads(self.client.get('/ember/sources.json').content.decode('utf-8'))
+
+        self.assertEqual(set(data['templates']), set(collector.template_hashes('en')))
+
+    def test_sources_not_found(self):
+        '''Should return a 404 if no template is found'''
+        self.collect()
+        self.assertEqual(self.client.get('/ember/sources/unknown.json').status_code, 404)
+
+    def test_sources_not_modified(self):
+        '''Should return a 304 if the ETag matches'''
+        self.collect()
+        etag = self.client.get('/ember/sources/test-collected.json')['ETag']
+
+        response = self.client.get('/ember/sources/test-collected.json', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    @skipUnless(find_executable('node'), 'A Javascript runtime is required')
+    @override_settings(EMBER_PRECOMPILE=True)
+    def test_precompiled_sources(self):
+        '''Should serve precompiled template functions'''
+        self.collect()
+        data = json.loads(self.client.get('/ember/sources/test-collected.json').content.decode('utf-8'))
+
+        self.assertTrue(data['precompiled'])
+        self.assertTrue(data['templates']['test-collected']['source'].startswith('function'))
+
+    def test_manifest_tag(self):
+        '''Should include the templates cache loader with the collected templates hashes'''
+        call_command('ember_collect_templates', languages=['en'], verbosity=0)
+        rendered = Template('''
+            {% load ember %}
+            {% ember_templates_manifest %}
+            ''').render(Context())
+
+        self.assertIn('<script type="text/javascript" src="%sjs/ember-templates-cache.js">' % settings.STATIC_URL, rendered)
+        self.assertIn('"test-collected": "%s"' % collector.template_hashes('en')['test-collected'], rendered)
+        self.assertIn('"sourcesUrl": "/ember/sources/{names}.json"', rendered)
+        self.assertIn('"allSourcesUrl": "/ember/sources.json"', rendered)
+        self.assertIn('Ember.TemplatesCache.load();', rendered)
+
+    def test_manifest_tag_not_collected(self):
+        '''Should render nothing if templates have not been collected'''
+        rendered = Template('''
+            {% load ember %}
+            {% ember_templates_manifest %}
+            ''').render(Context())
+
+        self.assertEqual(rendered.strip(), '')
+
+
+class RegistryTest(StaticRootMixin, TestCase):
+    def setUp(self):
+        super(RegistryTest, self).setUp()
+        registry.clear()
+
+    def tearDown(self):
+        super(RegistryTest, self).tearDown()
+        registry.clear()
+
+    def test_references(self):
+        '''Should register the templates and routes references at parse time'''
+        Template('''
+            {% load i18n ember %}
+            {% handlebars "posts" %}
+                {{partial "posts/summary"}}
+                {{template "footer"}}
+                {% ember render "author" %}
+                {% linkto "post" post.id %}{% trans "Read" %}{% endlinkto %}
+                {% linkto "about" %}{% trans message %}{% endlinkto %}
+                {{#linkTo "posts.index"}}All{{/linkTo}}
+                {{#linkTo archives}}Archives{{/linkTo}}
+                {{render comments}}
+            {% endhandlebars %}
+            ''')
+
+        self.assertEqual(registry.references('posts'), set([
+            ('partial', 'posts/summary'),
+            ('template', 'footer'),
+            ('render', 'author'),
+            ('render', 'comments'),
+            ('linkto', 'post'),
+            ('linkto', 'about'),
+            ('linkto', 'posts.index'),
+            ('linkto', 'archives'),
+        ]))
+
+    def test_references_replaced(self):
+        '''Should replace the references of a template parsed again'''
+        Template('{% load ember %}{% handlebars "posts" %}{{partial "old"}}{% endhandlebars %}')
+        Template('{% load ember %}{% handlebars "posts" %}{{partial "new"}}{% endhandlebars %}')
+
+        self.assertEqual(registry.references('posts'), set([('partial', 'new')]))
+
+    def test_closure(self):
+        '''Should compute the transitive closure of the templates dependencies'''
+        Template('''
+            {% load ember %}
+            {% handlebars "posts" %}{{partial "posts/summary"}}{% linkto "post" %}Post{% endlinkto %}{% endhandlebars %}
+            {% handlebars "posts/_summary" %}{{render "author"}}{% endhandlebars %}
+            {% handlebars "author" %}{{name}}{% endhandlebars %}
+            {% handlebars "post" %}{{title}}{% endhandlebars %}
+            {% handlebars "unrelated" %}{{title}}{% endhandlebars %}
+            ''')
+
+        self.assertEqual(registry.closure(['posts']), set(['posts', 'posts/_summary', 'author']))
+        self.assertEqual(registry.closure(['posts'], links=True), set(['posts', 'posts/_summary', 'author', 'post']))
+
+    def test_dangling(self):
+        '''Should report the unresolved references'''
+        Template('''
+            {% load ember %}
+            {% handlebars "posts" %}{{partial "summary"}}{{template "missing"}}{% linkto "nowhere" %}x{% endlinkto %}{% endhandlebars %}
+            {% handlebars "summary" %}{{name}}{% endhandlebars %}
+            ''')
+
+        self.assertEqual(registry.dangling(), [('posts', 'template', 'missing')])
+        self.assertEqual(registry.dangling(links=True), [
+            ('posts', 'linkto', 'nowhere'),
+            ('posts', 'template', 'missing'),
+        ])
+
+    def test_collect_reports_dangling(self):
+        '''Should report the dangling references when collecting templates'''
+        Template('''
+            {% load ember %}
+            {% handlebars "not-collected" %}{{template "missing"}}{% endhandlebars %}
+            ''')
+        templates_dir = tempfile.mkdtemp()
+        with open(os.path.join(templates_dir, 'posts.html'), 'w') as template_file:
+            template_file.write('{% load ember %}{% handlebars "posts" %}{{template "missing"}}{% endhandlebars %}')
+        # Not through call_command() which exits on Django 1.4 errors
+        command = ember_collect_templates.Command()
+        command.stdout, command.stderr = six.StringIO(), six.StringIO()
+
+        try:
+            with self.settings(TEMPLATE_DIRS=(templates_dir,)):
+                command.handle(verbosity=0)
+        finally:
+            shutil.rmtree(templates_dir)
+
+        self.assertEqual(command.stderr.getvalue(), 'Template "posts" references an unknown template: "missing"\n')
+
+
+class ParseCacheTest(TestCase):
+    SOURCE = '''
+        {% load i18n ember %}
+        {% handlebars "test-template" %}
+            <p>{% trans "Yes" %} {{name}}</p>
+        {% endhandlebars %}
+        '''
+
+    def setUp(self):
+        ember_tags._parsed.clear()
+
+    def translate_node(self, source):
+        node = Template(source).nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        return [bit for bit in node.text_and_nodes if not isinstance(bit, six.string_types)][0]
+
+    def test_lru_cache(self):
+        '''Should discard the least recently used entries'''
+        lru = LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        self.assertEqual(lru.get('a'), 1)
+        lru.set('c', 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertIn('a', lru)
+        self.assertNotIn('b', lru)
+        self.assertEqual(lru.get('b', 'missing'), 'missing')
+
+    def test_identical_blocks(self):
+        '''Should parse identical blocks only once but give each block its own nodes'''
+        first = self.translate_node(self.SOURCE)
+        second = self.translate_node(self.SOURCE.replace('test-template', 'other-template'))
+
+        self.assertIsNot(first, second)
+        self.assertIs(first.filter_expression, second.filter_expression)
+        self.assertEqual(len(ember_tags._parsed), 1)
+
+    def test_nodes_state(self):
+        '''Should not share the nodes render state between identical blocks'''
+        block = '{% handlebars %}<p>{% cycle "a" "b" %}</p>{% endhandlebars %}'
+        rendered = Template('{% load ember %}' + block + block).render(Context())
+
+        self.assertEqual(rendered.count('<p>a</p>'), 2)
+
+    def test_nested_block(self):
+        '''Should scan a block up to its own end tag'''
+        source = '''
+            {% load ember %}
+            {% handlebars "outer" %}<div>{% handlebars "inner" %}<p></p>{% endhandlebars %}</div>{% endhandlebars %}
+            <footer>{{ value }}</footer>
+            '''
+        Template(source)
+        t = Template(source)
+        node = t.nodelist.get_nodes_by_type(HandlebarsNode)[0]
+        rendered = t.render(Context({'value': 'after'}))
+
+        self.assertTrue(node.block_source.endswith('</div>'))
+        self.assertIn('<footer>after</footer>', rendered)
+        self.assertEqual(rendered.count('</script>'), 2)
+
+    def test_parsed_rendering(self):
+        '''Should render memoized blocks and the following nodes'''
+        Template(self.SOURCE).render(Context())
+        rendered = Template(self.SOURCE + '<footer>{{ value }}</footer>').render(Context({'value': 'after'}))
+
+        self.assertIn('<p>Yes {{name}}</p>', rendered)
+        self.assertIn('<footer>after</footer>', rendered)
+        self.assertEqual(rendered.count('</script>'), 1)
+
+    def test_different_libraries(self):
+        '''Should not share blocks between different tags libraries'''
+        source = '''
+            {% load ember %}
+            {% handlebars "test-template" %}{% ember_templates_js %}{% endhandlebars %}
+            '''
+        Template(source)
+        self.assertRaises(TemplateSyntaxError, Template, source.replace('{% load ember %}', '{% load handlebars from ember %}'))
+
+    def test_parser_state_tags(self):
+        '''Should always parse the blocks changing the parser state'''
+        source = '''
+            {% load ember %}
+            {% handlebars "test-template" %}{% load i18n %}<p>{{name}}</p>{% endhandlebars %}
+            {% trans "Yes" %}
+            '''
+        Template(source)
+        rendered = Template(source).render(Context())
+
+        self.assertIn('Yes', rendered)
+        self.assertEqual(len(ember_tags._parsed), 0)
+
+    @override_settings(EMBER_PARSE_CACHE_SIZE=0)
+    def test_disabled(self):
+        '''Should not memoize anything if the cache size is 0'''
+        first = self.translate_node(self.SOURCE)
+        second = self.translate_node(self.SOURCE)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(len(ember_tags._parsed), 0)
+
+
+class InstrumentationTest(TestCase):
+    SOURCE = '''
+        {% load ember %}
+        {% handlebars "test-template" %}<p>{% firstof value %}</p>{% endhandlebars %}
+        {% linkto "post" post.id %}{{ value }}{% endlinkto %}
+        {% ember name %}
+        {% ember_js %}
+        '''
+
+    def setUp(self):
+        instrumentation.reset_stats()
+
+    def render(self):
+        return Template(self.SOURCE).render(Context({'value': 'value'}))
+
+    def counters(self):
+        return dict(((item['tag'], item['name']), item) for item in instrumentation.stats())
+
+    def test_disabled(self):
+        '''Should not record anything by default'''
+        self.render()
+
+        self.assertEqual(instrumentation.stats(), [])
+
+    @override_settings(EMBER_INSTRUMENTATION=True)
+    def test_stats(self):
+        '''Should record the renders count, time and size per tag and name'''
+        self.render()
+        self.render()
+
+        counters = self.counters()
+        self.assertEqual(set(counters), set([
+            ('handlebars', 'test-template'), ('linkto', '"post"'), ('ember', None), ('libs', 'ember'),
+        ]))
+        handlebars = counters['handlebars', 'test-template']
+        self.assertEqual(handlebars['count'], 2)
+        self.assertGreater(handlebars['time'], 0)
+        self.assertGreater(handlebars['bytes'], 2 * len('<p>value</p>'))
+        self.assertEqual(counters['ember', None]['bytes'], 2 * len('{{name}}'))
+        # Sorted by decreasing size
+        sizes = [item['bytes'] for item in instrumentation.stats()]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+    @override_settings(EMBER_INSTRUMENTATION=True)
+    def test_stream(self):
+        '''Should record the streamed blocks once, whether chunked or not'''
+        t = Template('''
+            {% load ember %}
+            {% handlebars "dynamic" %}<p>{% firstof value %}</p>{% endhandlebars %}
+            {% handlebars "static" %}<p>{{name}}</p>{% endhandlebars %}
+            ''')
+        dynamic, static = t.nodelist.get_nodes_by_type(HandlebarsNode)
+        context = Context({'value': 'value'})
+
+        chunks = list(dynamic.stream(context)) + list(static.stream(context))
+
+        counters = self.counters()
+        self.assertEqual(counters['handlebars', 'dynamic']['count'], 1)
+        self.assertEqual(counters['handlebars', 'static']['count'], 1)
+        self.assertEqual(counters['handlebars', 'dynamic']['bytes'] + counters['handlebars', 'static']['bytes'],
+                         len(''.join(chunks)))
+
+    @override_settings(EMBER_INSTRUMENTATION=True)
+    def test_signal(self):
+        '''Should send the tag_rendered signal'''
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append((sender, kwargs['name'], kwargs['size']))
+
+        tag_rendered.connect(receiver)
+        try:
+            Template('{% load ember %}{% ember name %}').render(Context())
+        finally:
+            tag_rendered.disconnect(receiver)
+
+        self.assertEqual(received, [('ember', None, len('{{name}}'))])
+
+
+class PayloadBudgetTest(TestCase):
+    SOURCE = '''
+        {% load ember %}
+        {% ember_js %}
+        {% handlebars "small" %}<p>{{name}}</p>{% endhandlebars %}
+        {% handlebars "large" %}<div>{{content}}</div>{{#each item in items}}<p>{{item}}</p>{{/each}}{% endhandlebars %}
+        {% handlebars %}{{outlet}}{% endhandlebars %}
+        '''
+
+    def render(self):
+        return Template(self.SOURCE).render(Context())
+
+    def response(self):
+        return PayloadBudgetMiddleware().process_response(RequestFactory().get('/posts/'), HttpResponse(self.render()))
+
+    def test_measure(self):
+        '''Should measure the inline templates and the libraries files'''
+        templates, scripts = budget.measure(self.render())
+
+        self.assertEqual([name for name, size in templates], ['small', 'large', 'application'])
+        self.assertGreater(dict(templates)['large'], dict(templates)['small'])
+        path = libs.lib_path('ember', not settings.DEBUG)
+        self.assertEqual(scripts, [(path, os.path.getsize(finders.find(path)))])
+
+    def test_measure_precompiled(self):
+        '''Should measure the precompiled templates'''
+        content = '''<script type="text/javascript">Ember.TEMPLATES["posts"] = Ember.Handlebars.template(function() {});</script>'''
+
+        self.assertEqual(budget.measure(content), ([('posts', len('function() {}'))], []))
+
+    def test_same_measure(self):
+        '''Should measure a template in a page as the ember_check_budget command does'''
+        templates, scripts = budget.measure(self.render())
+
+        self.assertEqual(dict(templates)['small'], budget.template_size('<p>{{name}}</p>'))
+        self.assertEqual(dict(templates)['application'], len('{{outlet}}'))
+
+    @override_settings(EMBER_TEMPLATE_BUDGET=50, EMBER_RESPONSE_BUDGET=1000)
+    def test_check_response(self):
+        '''Should report the templates and the response exceeding their budget'''
+        errors = budget.check_response(*budget.measure(self.render()))
+
+        self.assertEqual(len(errors), 2)
+        self.assertTrue(errors[0].startswith('Template "large" is '))
+        self.assertTrue(errors[1].startswith('Ember payload is '))
+        self.assertIn('"%s"' % libs.lib_path('ember', not settings.DEBUG), errors[1])
+
+    def test_middleware_disabled(self):
+        '''Should not check anything without budget'''
+        self.assertFalse(self.response().has_header('X-Ember-Payload'))
+
+    @override_settings(EMBER_RESPONSE_BUDGET=10 ** 9)
+    def test_middleware_header(self):
+        '''Should add the payload size header'''
+        templates, scripts = budget.measure(self.render())
+
+        self.assertEqual(int(self.response()['X-Ember-Payload']), sum(size for name, size in templates + scripts))
+
+    @override_settings(EMBER_TEMPLATE_BUDGET=50, EMBER_BUDGET_ACTION='fail')
+    def test_middleware_fail(self):
+        '''Should raise PayloadBudgetExceeded with the exceeding templates'''
+        with six.assertRaisesRegex(self, budget.PayloadBudgetExceeded, r'^/posts/: Template "large" is \d+ bytes'):
+            self.response()
+
+    @override_settings(EMBER_TEMPLATE_BUDGET=50)
+    def test_middleware_warn(self):
+        '''Should only log the exceeded budgets by default'''
+        stream = six.StringIO()
+        handler = logging.StreamHandler(stream)
+        budget.logger.addHandler(handler)
+        try:
+            self.assertTrue(self.response().has_header('X-Ember-Payload'))
+        finally:
+            budget.logger.removeHandler(handler)
+
+        self.assertIn('/posts/: Template "large" is ', stream.getvalue())
+
+    @override_settings(EMBER_TEMPLATE_BUDGET=20, EMBER_BUDGET_ACTION='fail', TEMPLATE_DIRS=TEST_TEMPLATE_DIRS)
+    def test_command(self):
+        '''Should report the collected templates sizes and fail if a template exceeds the budget'''
+        # call_command() exits instead of raising CommandError on Django 1.4
+        command = ember_check_budget.Command()
+        command.stdout, command.stderr = six.StringIO(), six.StringIO()
+
+        self.assertRaises(CommandError, command.handle, languages=['en'], verbosity=2)
+        self.assertIn('Template "test-collected" (en): ', command.stdout.getvalue())
+        self.assertIn('bytes with its dependencies', command.stdout.getvalue())
+        self.assertIn('Template "test-dependent" is 26 bytes (budget: 20 bytes) (en)', command.stderr.getvalue())
+
+
+def dumps_sorted(obj):
+    return json.dumps(obj, sort_keys=True)
+
+
+class EncodingTest(TestCase):
+    def tearDown(self):
+        encoding._encoders.clear()
+
+    def test_default_encoder(self):
+        '''Should fallback on an installed backend'''
+        self.assertEqual(json.loads(encoding.dumps({'a': [1, 'b']})), {'a': [1, 'b']})
+
+    @override_settings(EMBER_JSON_ENCODER='json')
+    def test_django_types(self):
+        '''Should encode the values not handled natively like DjangoJSONEncoder'''
+        value = {'date': datetime.date(2013, 7, 14), 'price': decimal.Decimal('1.50')}
+
+        self.assertEqual(json.loads(encoding.dumps(value)), {'date': '2013-07-14', 'price': '1.50'})
+
+    def test_backends_datetimes(self):
+        '''Should encode the datetimes the same way with all the installed backends'''
+        value = {'created': datetime.datetime(2013, 7, 14, 12, 30, 0, 123456, tzinfo=timezone.utc)}
+        expected = json.dumps(value, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+        for backend in encoding.BACKENDS:
+            try:
+                dumps = encoding.get_encoder(backend)
+            except ImproperlyConfigured:
+                continue
+            self.assertEqual(dumps(value), expected)
+
+    @override_settings(EMBER_JSON_ENCODER='ember.tests.dumps_sorted')
+    def test_custom_encoder(self):
+        '''Should use the encoder dotted path'''
+        self.assertEqual(encoding.dumps({'b': 1, 'a': 2}), '{"a": 2, "b": 1}')
+
+    @override_settings(EMBER_JSON_ENCODER='ember.tests.unknown')
+    def test_unknown_encoder(self):
+        '''Should raise ImproperlyConfigured for an unknown encoder'''
+        self.assertRaises(ImproperlyConfigured, encoding.dumps, {})
+
+    @override_settings(EMBER_JSON_ENCODER='json')
+    def test_iterencode_list(self):
+        '''Should encode a JSON array by chunks'''
+        chunks = list(encoding.iterencode_list(({'id': i} for i in range(5)), chunk_size=2))
+
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(json.loads(''.join(chunks)), [{'id': i} for i in range(5)])
+        self.assertEqual(''.join(encoding.iterencode_list([])), '[]')
+
+    def test_escape(self):
+        '''Should escape the characters closing a script element'''
+        value = six.text_type('</script><!-- & ') + six.unichr(0x2028)
+        escaped = encoding.escape(json.dumps(value, ensure_ascii=False))
+
+        self.assertNotIn('</', escaped)
+        self.assertNotIn('<!--', escaped)
+        self.assertNotIn('&', escaped)
+        self.assertNotIn(six.unichr(0x2028), escaped)
+        self.assertEqual(json.loads(escaped), value)
+
+
+if ModelResource:
+    class SiteResource(ModelResource):
+        class Meta:
+            queryset = Site.objects.all()
+            resource_name = 'site'
+
+    class DenyAuthorization(ReadOnlyAuthorization):
+        def read_list(self, object_list, bundle):
+            raise Unauthorized()
+
+    class PrivateSiteResource(SiteResource):
+        class Meta(SiteResource.Meta):
+            authorization = DenyAuthorization()
+
+    class DomainResource(SiteResource):
+        class Meta(SiteResource.Meta):
+            excludes = ['name']
+
+    class PagedSiteResource(SiteResource):
+        class Meta(SiteResource.Meta):
+            limit = 1
+
+    class PagedSiteRowsResource(PagedSiteResource):
+        def get_object_list(self, request):
+            return super(PagedSiteRowsResource, self).get_object_list(request).values()
+
+    class ContentTypeResource(ModelResource):
+        class Meta:
+            queryset = ContentType.objects.all()
+            resource_name = 'contenttype'
+
+    class PermissionResource(ModelResource):
+        content_type = fields.ToOneField(ContentTypeResource, 'content_type')
+
+        class Meta:
+            queryset = Permission.objects.all()
+            resource_name = 'permission'
+            fields = ['id', 'codename']
+
+    api = Api(api_name='v1')
+    api.register(ContentTypeResource())
+    api.register(PermissionResource())
+
+    urlpatterns = patterns('',
+        url(r'^api/', include(api.urls)),
+    )
+
+
+@skipUnless(ModelResource, 'Tastypie is required')
+class PreloadDataTest(TestCase):
+    def render(self, source, **context):
+        return Template('{% load ember %}' + source).render(Context(context))
+
+    def preloaded(self, rendered):
+        start = rendered.index('>') + 1
+        return json.loads(rendered[start:rendered.rindex('</script>')])
+
+    def test_preload(self):
+        '''Should inline the resource list as the Tastypie list endpoint does'''
+        rendered = self.render('{% ember_preload_data resource %}', resource=SiteResource())
+
+        self.assertTrue(rendered.startswith('<script type="application/json" data-tastypie-preload="site">'))
+        data = self.preloaded(rendered)
+        self.assertEqual(data['meta']['total_count'], Site.objects.count())
+        self.assertIsNone(data['meta']['next'])
+        self.assertEqual(data['objects'][0]['domain'], 'example.com')
+        self.assertIn('id', data['objects'][0])
+
+    def test_preload_objects(self):
+        '''Should only inline the given objects'''
+        Site.objects.create(domain='other.com', name='other')
+        rendered = self.render('{% ember_preload_data resource sites %}',
+                               resource=SiteResource, sites=Site.objects.filter(domain='other.com'))
+
+        self.assertEqual([site['domain'] for site in self.preloaded(rendered)['objects']], ['other.com'])
+
+    def test_preload_paginated(self):
+        '''Should only inline the first page of the resource list with the next page URI'''
+        Site.objects.create(domain='other.com', name='other')
+        data = self.preloaded(self.render('{% ember_preload_data resource %}', resource=PagedSiteResource))
+
+        self.assertEqual(len(data['objects']), 1)
+        self.assertEqual(data['meta']['total_count'], 2)
+        self.assertEqual(data['meta']['limit'], 1)
+        self.assertIn('offset=1', data['meta']['next'])
+
+    def test_preload_objects_not_paginated(self):
+        '''Should inline all the given objects'''
+        Site.objects.create(domain='other.com', name='other')
+        data = self.preloaded(self.render('{% ember_preload_data resource sites %}',
+                                          resource=PagedSiteResource, sites=Site.objects.all()))
+
+        self.assertEqual(len(data['objects']), 2)
+        self.assertIsNone(data['meta']['next'])
+
+    def test_preload_dotted_path(self):
+        '''Should import the resource from a dotted path'''
+        rendered = self.render('{% ember_preload_data "ember.tests.SiteResource" %}')
+
+        self.assertIn('example.com', rendered)
+
+    def test_escaping(self):
+        '''Should not let the data close the script element'''
+        Site.objects.create(domain='evil.com', name='</script><script>alert("&")</script>')
+        rendered = self.render('{% ember_preload_data resource %}', resource=SiteResource)
+
+        self.assertEqual(rendered.count('</script>'), 1)
+        self.assertNotIn('&', rendered)
+        self.assertIn('</script><script>alert("&")</script>', [site['name'] for site in self.preloaded(rendered)['objects']])
+
+    @override_settings(EMBER_JSON_CHUNK_SIZE=1)
+    def test_preload_rows(self):
+        '''Should encode the values() rows without dehydrating them'''
+        Site.objects.create(domain='other.com', name='</script>')
+        rendered = self.render('{% ember_preload_data resource sites %}',
+                               resource=SiteResource, sites=Site.objects.values('id', 'name').order_by('id'))
+
+        data = self.preloaded(rendered)
+        self.assertEqual(data['meta']['total_count'], 2)
+        self.assertEqual([sorted(site) for site in data['objects']], [['id', 'name', 'resource_uri']] * 2)
+        self.assertEqual(data['objects'][1]['name'], '</script>')
+        self.assertEqual(rendered.count('</script>'), 1)
+
+    def test_preload_rows_fields(self):
+        '''Should only encode the row values of the fields exposed by the resource'''
+        rendered = self.render('{% ember_preload_data resource sites %}',
+                               resource=DomainResource, sites=Site.objects.values())
+
+        self.assertEqual(sorted(self.preloaded(rendered)['objects'][0]), ['domain', 'id', 'resource_uri'])
+
+    def test_preload_rows_paginated(self):
+        '''Should keep the paginator meta of the values() rows of the resource list'''
+        Site.objects.create(domain='other.com', name='other')
+        data = self.preloaded(self.render('{% ember_preload_data resource %}', resource=PagedSiteRowsResource))
+
+        self.assertEqual(len(data['objects']), 1)
+        self.assertEqual(data['meta']['total_count'], 2)
+        self.assertIn('offset=1', data['meta']['next'])
+
+    def test_unauthorized(self):
+        '''Should render nothing if the list is not readable'''
+        self.assertEqual(self.render('{% ember_preload_data resource %}', resource=PrivateSiteResource), '')
+
+    def test_not_a_resource(self):
+        '''Should only accept Tastypie resources'''
+        self.assertRaises(ImproperlyConfigured, preload.get_resource, Site)
+        self.assertRaises(ImproperlyConfigured, preload.get_resource, 'ember.tests.Unknown')
+
+
+@skipUnless(ModelResource, 'Tastypie is required')
+class PreloadRelatedTest(TestCase):
+    urls = 'ember.tests'
+
+    def preloaded(self, resource, objects):
+        rendered = Template('{% load ember %}{% ember_preload_data resource objects %}').render(
+            Context({'resource': resource, 'objects': objects}))
+        return json.loads(rendered[rendered.index('>') + 1:rendered.rindex('</script>')])
+
+    def test_preload_rows_related(self):
+        '''Should convert the values() rows foreign keys and primary keys to the resources URIs'''
+        permission = Permission.objects.get(codename='add_site')
+        expected = self.preloaded(PermissionResource, Permission.objects.filter(pk=permission.pk))
+
+        self.assertEqual(expected['objects'][0]['content_type'], '/api/v1/contenttype/%s/' % permission.content_type_id)
+        for rows in (Permission.objects.values(), Permission.objects.values('id', 'codename', 'content_type')):
+            self.assertEqual(self.preloaded(PermissionResource, rows.filter(pk=permission.pk))['objects'],
+                             expected['objects'])
@@ -0,0 +1,15 @@
+'''
+Lazy and cached templates delivery URLs.
+
+Include them into your URLconf::
+
+    url(r'^ember/', include('ember.urls')),
+'''
+from django.conf.urls import patterns, url
+
+urlpatterns = patterns('ember.views',
+    url(r'^templates/(?P<names>[\w\-/,]+)\.js$', 'templates', name='ember_templates'),
+    url(r'^groups/(?P<group>[\w\-/]+)\.js$', 'templates', name='ember_templates_group'),
+    url(r'^sources\.json$', 'sources', name='ember_templates_sources_all'),
+    url(r'^sources/(?P<names>[\w\-/,]+)\.json$', 'sources', name='ember_templates_sources'),
+)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+'''
+Helpers shared by the templates and libraries bundles and the template tags.
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+import threading
+
+try:
+    from collections import OrderedDict
+except ImportError:     # Python 2.6
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+from django.core.files.base import ContentFile
+
+HASH_LENGTH = 12
+
+
+def content_hash(content):
+    '''The short hash identifying a text ``content`` version'''
+    return hashlib.md5(content.encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(name, content):
+    '''Insert the ``content`` hash into the file ``name``'''
+    root, ext = os.path.splitext(name)
+    return '%s.%s%s' % (root, content_hash(content), ext)
+
+
+def is_fingerprinted(path):
+    '''Whether a file ``path`` contains a content hash'''
+    parts = os.path.basename(path).split('.')
+    return (len(parts) > 2 and len(parts[-2]) == HASH_LENGTH
+            and all(c in '0123456789abcdef' for c in parts[-2]))
+
+
+def save_file(storage, name, content):
+    '''Save ``content`` into ``storage``, replacing any existing file'''
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(content.encode('utf-8')))
+
+
+def load_json(storage, name):
+    '''Load a JSON file from ``storage`` or an empty dictionnary if it does not exists'''
+    if not storage.exists(name):
+        return {}
+    with storage.open(name) as json_file:
+        return json.loads(json_file.read().decode('utf-8'))
+
+
+class LRUCache(object):
+    '''
+    A thread-safe dictionnary-like cache
+    discarding the least recently used entries beyond ``maxsize`` entries.
+    '''
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            # Move the entry to the most recently used end
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                del self._data[next(iter(self._data))]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
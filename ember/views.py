@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+'''
+Static files and templates serving views.
+'''
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import time
+
+try:
+    from urllib.parse import unquote
+except ImportError:     # Python 2
+    from urllib import unquote
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.contrib.staticfiles.views import serve as staticfiles_serve
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.views import static
+
+from ember import collector, compression
+from ember.conf import settings
+from ember.utils import is_fingerprinted
+
+#: Cache duration of fingerprinted files (one year)
+FAR_FUTURE = 365 * 24 * 60 * 60
+
+
+def serve(request, path, insecure=False, **kwargs):
+    '''
+    Serve collected static files (including the bundles built by Django Ember),
+    falling back on ``django.contrib.staticfiles.views.serve`` for the others.
+
+    Fingerprinted files never change so they are served with far-future cache headers.
+
+    Precompressed variants (see :mod:`ember.compression`) are served
+    to the clients accepting their encoding.
+
+    To use, put a URL pattern such as::
+
+        (r'^static/(?P<path>.*)$', 'ember.views.serve')
+
+    in your URLconf.
+    '''
+    normalized_path = posixpath.normpath(unquote(path)).lstrip('/')
+    if settings.STATIC_ROOT and staticfiles_storage.exists(normalized_path):
+        name, encoding = _precompressed(request, normalized_path)
+        document_root, filename = os.path.split(staticfiles_storage.path(name))
+        response = static.serve(request, filename, document_root=document_root, **kwargs)
+        if encoding:
+            response['Content-Type'] = mimetypes.guess_type(normalized_path)[0] or 'application/octet-stream'
+            response['Content-Encoding'] = encoding
+        if encoding or _has_variants(normalized_path):
+            patch_vary_headers(response, ('Accept-Encoding',))
+    else:
+        response = staticfiles_serve(request, path, insecure=insecure, **kwargs)
+
+    if response.status_code == 200 and is_fingerprinted(normalized_path):
+        response['Cache-Control'] = 'public, max-age=%s' % FAR_FUTURE
+        response['Expires'] = http_date(time.time() + FAR_FUTURE)
+    return response
+
+
+def _has_variants(path):
+    return any(staticfiles_storage.exists(path + extension) for encoding, extension, _ in compression.ENCODINGS)
+
+
+def _precompressed(request, path):
+    '''The best precompressed variant of ``path`` accepted by the client and its encoding'''
+    accepted = compression.accepted_encodings(request)
+    for encoding, extension, _ in compression.ENCODINGS:
+        if encoding in accepted and staticfiles_storage.exists(path + extension):
+            return path + extension, encoding
+    return path, None
+
+
+def templates(request, names=None, group=None):
+    '''
+    Serve Handlebars templates as Javascript registering them into ``Ember.TEMPLATES``,
+    for the active language.
+
+    Templates are given either by a comma-separated list of ``names``
+    or by a route ``group``: the template named ``group`` and all the templates prefixed by ``group/``.
+    The templates they depend on (partials, ...) are served too (see :mod:`ember.registry`).
+
+    Templates are served from the ``ember_collect_templates`` command output.
+    Responses have an ``ETag`` so clients only download changed templates.
+    See ``ember.urls``.
+    '''
+    collected = _collected()
+    templates = collected['templates']
+    if group is not None:
+        requested = [name for name in templates if name == group or name.startswith(group + '/')]
+    else:
+        requested = names.split(',')
+    selected = sorted(collector.closure(templates, requested))
+    if not selected:
+        raise Http404('No template found')
+
+    content = collector.register_script([(name, templates[name]['source']) for name in selected],
+                                        collected['precompiled'])
+    return _revalidated(request, content, 'application/javascript')
+
+
+def sources(request, names=None):
+    '''
+    Serve Handlebars templates sources with their content hash as JSON, for the active language::
+
+        {"precompiled": false, "templates": {"posts": {"hash": "...", "source": "..."}}}
+
+    Sources are precompiled template functions if they have been collected with precompilation.
+    Templates are given by a comma-separated list of ``names`` (default to all templates).
+
+    Used by the ``{% ember_templates_manifest %}`` loader to refresh the templates
+    whose hash changed since they have been stored by the client.
+    '''
+    collected = _collected()
+    templates = collected['templates']
+    if names is None:
+        requested = set(templates)
+    else:
+        requested = set(name for name in names.split(',') if name in templates)
+    if not requested:
+        raise Http404('No template found')
+
+    content = json.dumps({
+        'precompiled': collected['precompiled'],
+        'templates': dict((name, {'hash': templates[name]['hash'], 'source': templates[name]['source']})
+                          for name in requested),
+    }, sort_keys=True)
+    return _revalidated(request, content, 'application/json')
+
+
+def _collected():
+    '''The collected templates for the active language, raise a 404 if they have not been collected'''
+    collected = collector.collected_sources()
+    if collected is None:
+        raise Http404('Templates have not been collected')
+    return collected
+
+
+def _revalidated(request, content, content_type):
+    '''A response with an ``ETag`` to be revalidated by clients on each use'''
+    etag = hashlib.md5(content.encode('utf-8')).hexdigest()
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = quote_etag(etag)
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    patch_vary_headers(response, ('Accept-Language',))
+    return response